@@ -0,0 +1,207 @@
+"""
+JSON and server-sent-event API over AIAssistantService.
+
+Endpoints (POST, body {"query": "...", "stream": false}):
+- /query/personal, /query/web, /query/hybrid: one system
+- /compare: all three systems in parallel
+- /admin/reindex (no body): pick up personal document changes now; only
+  served when API_ADMIN_TOKEN is set, and only to "Authorization: Bearer <token>"
+
+With "stream": true the response is text/event-stream with "status" events
+(warming up, queued), "token" events carrying the new text and the cumulative
+answer, and a final "done" event holding the complete result. Sources are
+returned structured (status, kinds, documents, urls) next to the display text.
+
+The async service methods bridge onto the synchronous query pipeline: every
+in-flight request, streamed or not, holds one of API_MAX_WORKERS threads
+until it finishes, so that is the concurrency limit per process. Further
+requests wait for a free thread. Add worker processes to go beyond it.
+
+The router is mounted next to the Gradio UI by app.py; run this file to serve
+the API on its own, optionally from several worker processes on one port:
+
+    python api.py --port 8000 --workers 4
+
+With more than one worker, the personal index is built once up front and
+memory-mapped read-only by every worker, and the result cache is shared
+through SQLite (see prepare_shared_state). The Gradio UI keeps its queue
+state in process, so it stays single-process in app.py.
+"""
+
+import argparse
+import asyncio
+import hmac
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from services.ai_assistant import AIAssistantService, COMPARE_SYSTEMS, prepare_shared_state
+from services.config import env_int, env_str
+from services.sources import describe_sources
+
+logger = logging.getLogger(__name__)
+
+class QueryRequest(BaseModel):
+    """Body of every query endpoint"""
+    query: str
+    stream: bool = False
+
+def _result(system: str, answer: str, sources: str, seconds: Optional[float] = None) -> Dict:
+    """Structured result for one system"""
+    result = {"system": system, "answer": answer, "sources": describe_sources(sources)}
+    if seconds is not None:
+        result["seconds"] = round(seconds, 3)
+    return result
+
+def _event(event: str, data: Dict) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _event_stream(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class _StreamTracker:
+    """Turns cumulative (answer, sources) updates for one system into SSE events"""
+    
+    def __init__(self, system: str):
+        self.system = system
+        self.answer = ""
+        self.sources = ""
+    
+    def update(self, answer: str, sources: str) -> Optional[str]:
+        if (answer, sources) == (self.answer, self.sources):
+            return None
+        if sources.startswith("⏳"):
+            self.answer, self.sources = "", sources
+            return _event("status", {"system": self.system, "message": answer, "sources": describe_sources(sources)})
+        
+        # Answers normally grow; anything else (e.g. a timeout marker) replaces the text
+        delta = answer[len(self.answer):] if answer.startswith(self.answer) else answer
+        self.answer, self.sources = answer, sources
+        return _event("token", {"system": self.system, "delta": delta, "answer": answer})
+
+def create_api_router(assistant_service: AIAssistantService) -> APIRouter:
+    """Routes for the single-system and comparison endpoints"""
+    router = APIRouter()
+    query_fns = {
+        "personal": (assistant_service.aquery_personal_rag, assistant_service.aquery_personal_rag_stream),
+        "web": (assistant_service.aquery_web_search, assistant_service.aquery_web_search_stream),
+        "hybrid": (assistant_service.aquery_hybrid_rag, assistant_service.aquery_hybrid_rag_stream),
+    }
+    
+    def validate(request: QueryRequest):
+        if not request.query.strip():
+            raise HTTPException(status_code=400, detail="Please enter a question")
+    
+    def add_query_route(system: str):
+        query_fn, stream_fn = query_fns[system]
+        
+        async def stream_events(query: str) -> AsyncIterator[str]:
+            started = time.perf_counter()
+            tracker = _StreamTracker(system)
+            async for answer, sources in stream_fn(query):
+                event = tracker.update(answer, sources)
+                if event:
+                    yield event
+            yield _event("done", _result(system, tracker.answer, tracker.sources, time.perf_counter() - started))
+        
+        @router.post(f"/query/{system}", name=f"query_{system}")
+        async def query_system(request: QueryRequest):
+            validate(request)
+            if request.stream:
+                return _event_stream(stream_events(request.query))
+            started = time.perf_counter()
+            answer, sources = await query_fn(request.query)
+            return _result(system, answer, sources, time.perf_counter() - started)
+    
+    for system in COMPARE_SYSTEMS:
+        add_query_route(system)
+    
+    async def compare_events(query: str) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        trackers = {system: _StreamTracker(system) for system in COMPARE_SYSTEMS}
+        async for columns in assistant_service.acompare_all_systems_stream(query):
+            for i, system in enumerate(COMPARE_SYSTEMS):
+                event = trackers[system].update(columns[2 * i], columns[2 * i + 1])
+                if event:
+                    yield event
+        yield _event("done", {
+            "results": {system: _result(system, t.answer, t.sources) for system, t in trackers.items()},
+            "seconds": round(time.perf_counter() - started, 3),
+        })
+    
+    # Re-scanning costs embedding calls and holds the index lock, so it is admin-only and off without a token
+    admin_token = env_str("API_ADMIN_TOKEN", "")
+    if admin_token:
+        @router.post("/admin/reindex")
+        async def reindex(authorization: Optional[str] = Header(None)):
+            if not hmac.compare_digest((authorization or "").encode(), f"Bearer {admin_token}".encode()):
+                raise HTTPException(status_code=401, detail="Admin token required")
+            message = await asyncio.get_running_loop().run_in_executor(None, assistant_service.refresh_personal_index)
+            return {"message": message, "last_refresh": getattr(assistant_service.personal_index, "last_refresh", None)}
+    
+    @router.post("/compare")
+    async def compare(request: QueryRequest):
+        validate(request)
+        if request.stream:
+            return _event_stream(compare_events(request.query))
+        started = time.perf_counter()
+        columns = await assistant_service.acompare_all_systems(request.query)
+        return {
+            "results": {
+                system: _result(system, columns[2 * i], columns[2 * i + 1])
+                for i, system in enumerate(COMPARE_SYSTEMS)
+            },
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+    
+    return router
+
+def create_api_app(assistant_service: AIAssistantService) -> FastAPI:
+    """Standalone API application (no Gradio UI)"""
+    app = FastAPI(title="AI Personal Assistant Suite API")
+    app.include_router(create_api_router(assistant_service))
+    return app
+
+def _start_assistant_service() -> AIAssistantService:
+    """Assistant service warming up in the background, with cache pre-warming started"""
+    assistant_service = AIAssistantService(background_init=True)
+    assistant_service.start_prewarm()
+    return assistant_service
+
+def create_worker_app() -> FastAPI:
+    """Application factory run inside each worker process"""
+    logging.basicConfig(level=logging.INFO)
+    return create_api_app(_start_assistant_service())
+
+def main():
+    """Serve the API without the Gradio UI"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Serve the JSON/SSE API")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=env_int("API_WORKERS", 1),
+                        help="Worker processes sharing the port")
+    args = parser.parse_args()
+    
+    import uvicorn  # Installed with gradio
+    
+    if args.workers <= 1:
+        uvicorn.run(create_api_app(_start_assistant_service()), host=args.host, port=args.port)
+        return
+    
+    # Workers are spawned fresh and inherit the environment set up here
+    prepare_shared_state()
+    uvicorn.run("api:create_worker_app", factory=True, host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,6 +1,7 @@
 import gradio as gr
 import logging
 from pathlib import Path
+from typing import Optional
 
 # Import our modular components
 from components.personal_rag_tab import create_personal_rag_tab
@@ -8,21 +9,31 @@ from components.web_search_tab import create_web_search_tab
 from components.hybrid_rag_tab import create_hybrid_rag_tab
 from components.comparison_tab import create_comparison_tab
 from services.ai_assistant import AIAssistantService
+from services.config import env_int
+from services.metrics import metrics
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_main_interface():
-    """Create the main Gradio interface with all tabs"""
-    
-    # Initialize the AI assistant service
+def create_assistant_service() -> Optional[AIAssistantService]:
+    """Initialize the AI assistant service (None if it cannot start)"""
+    # Backends warm up in the background so the interface can start serving right away
     try:
-        assistant_service = AIAssistantService()
+        assistant_service = AIAssistantService(background_init=True)
+        assistant_service.start_prewarm()
         logger.info("AI Assistant Service initialized successfully")
+        return assistant_service
     except Exception as e:
         logger.error(f"Failed to initialize AI Assistant Service: {e}")
-        assistant_service = None
+        return None
+
+def create_main_interface(assistant_service: Optional[AIAssistantService] = None):
+    """Create the main Gradio interface with all tabs"""
+    
+    # Initialize the AI assistant service unless one is shared with the API
+    if assistant_service is None:
+        assistant_service = create_assistant_service()
     
     # Create the main interface
     with gr.Blocks(
@@ -68,12 +79,26 @@ def create_main_interface():
         
         # System Status
         with gr.Accordion("🔧 System Status", open=False):
-            if assistant_service:
-                status_lines = assistant_service.get_system_status()
-            else:
-                status_lines = ["❌ AI Assistant Service: Not initialized"]
+            def get_status_markdown() -> str:
+                """Render the current system status"""
+                if assistant_service:
+                    status_lines = assistant_service.get_system_status()
+                else:
+                    status_lines = ["❌ AI Assistant Service: Not initialized"]
+                return "\n\n".join(status_lines)
+            
+            def reindex_documents() -> str:
+                """Pick up personal document changes now and show the updated status"""
+                if not assistant_service:
+                    return get_status_markdown()
+                return assistant_service.refresh_personal_index() + "\n\n" + get_status_markdown()
             
-            gr.Markdown("\n".join(status_lines))
+            status_display = gr.Markdown(get_status_markdown())
+            with gr.Row():
+                refresh_status_btn = gr.Button("🔄 Refresh Status", size="sm")
+                reindex_btn = gr.Button("📂 Reindex Documents", size="sm")
+            refresh_status_btn.click(fn=get_status_markdown, outputs=status_display)
+            reindex_btn.click(fn=reindex_documents, outputs=status_display)
         
         # Footer
         gr.Markdown("""
@@ -84,6 +109,27 @@ def create_main_interface():
     
     return demo
 
+def create_server(demo, assistant_service: Optional[AIAssistantService] = None):
+    """Mount the Gradio app on a FastAPI server that also exposes /metrics and the JSON API"""
+    from fastapi import FastAPI  # Installed with gradio
+    from fastapi.responses import PlainTextResponse
+    
+    server = FastAPI()
+    
+    # JSON and SSE endpoints share the UI's service, caches and admission control
+    if assistant_service is not None:
+        from api import create_api_router
+        
+        server.include_router(create_api_router(assistant_service))
+    
+    @server.get("/metrics", response_class=PlainTextResponse)
+    def prometheus_metrics():
+        """Per-stage latency, token and error metrics in Prometheus text format"""
+        return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+    
+    demo.show_error = True  # Show detailed errors
+    return gr.mount_gradio_app(server, demo, path="/")
+
 def main():
     """Launch the Gradio web interface"""
     print("🚀 Starting AI Personal Assistant Web UI...")
@@ -94,13 +140,23 @@ def main():
     print()
     
     try:
-        demo = create_main_interface()
-        demo.launch(
-            server_name="0.0.0.0",  # Allow external connections
-            server_port=7860,       # Default Gradio port
-            share=False,            # Set to True for public sharing
-            show_error=True,        # Show detailed errors
-            quiet=False             # Show startup info
+        assistant_service = create_assistant_service()
+        demo = create_main_interface(assistant_service)
+        # The queue is required for streaming (generator) event handlers. Its
+        # worker limit only bounds Gradio events; per-system admission control
+        # lives in the service layer scheduler.
+        demo.queue(
+            default_concurrency_limit=env_int("GRADIO_CONCURRENCY_LIMIT", 16),
+            max_size=env_int("GRADIO_MAX_QUEUE_SIZE", 64)
+        )
+        
+        # Serve the UI, the JSON API and the /metrics endpoint from one server
+        import uvicorn  # Installed with gradio
+        
+        uvicorn.run(
+            create_server(demo, assistant_service),
+            host="0.0.0.0",  # Allow external connections
+            port=7860        # Default Gradio port
         )
     except Exception as e:
         print(f"❌ Failed to launch web UI: {e}")
@@ -0,0 +1,196 @@
+"""
+Headless batch runner: send questions from a JSONL file through the AI systems
+without starting the Gradio UI.
+
+Each input line is {"id": ..., "question": ..., "systems": [...]} where "id"
+defaults to the line number and "systems" defaults to --systems. Results are
+appended to the output JSONL as they finish, one line per (id, system), and
+the output doubles as the checkpoint: re-running the same command skips
+everything already answered.
+
+    python batch.py questions.jsonl results.jsonl --workers 4 --rate 2
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from services.ai_assistant import AIAssistantService, COMPARE_SYSTEMS, UNCACHEABLE_SOURCES
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """Token bucket shared by all workers (rate is requests per second)"""
+    
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may start"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+def read_questions(path: Path, default_systems: List[str]) -> Iterator[Tuple[str, str, List[str]]]:
+    """Yield (id, question, systems) from a JSONL file, skipping blank and invalid lines"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                logger.warning(f"Skipping line {line_number}: {e}")
+                continue
+            question = record.get("question") or record.get("query")
+            if not question:
+                logger.warning(f"Skipping line {line_number}: no question")
+                continue
+            systems = record.get("systems") or default_systems
+            if isinstance(systems, str):
+                systems = list(COMPARE_SYSTEMS) if systems in ("all", "compare") else [systems]
+            unknown = [s for s in systems if s not in COMPARE_SYSTEMS]
+            if unknown:
+                logger.warning(f"Skipping unknown systems {unknown} on line {line_number}")
+            yield str(record.get("id", line_number)), question, [s for s in systems if s in COMPARE_SYSTEMS]
+
+def load_checkpoint(path: Path, retry_failed: bool) -> Set[Tuple[str, str]]:
+    """(id, system) pairs already present in the output file"""
+    done = set()
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by an interruption
+            if retry_failed and record.get("failed"):
+                continue
+            done.add((str(record["id"]), record["system"]))
+    return done
+
+def run_one(service: AIAssistantService, system: str, question: str, limiter: RateLimiter,
+            busy_retries: int) -> Dict:
+    """Answer one question on one system, backing off while the system is busy"""
+    query_fns = {
+        "personal": service.query_personal_rag,
+        "web": service.query_web_search,
+        "hybrid": service.query_hybrid_rag,
+    }
+    started = time.monotonic()
+    for attempt in range(busy_retries + 1):
+        limiter.acquire()
+        answer, sources = query_fns[system](question)
+        if not sources.startswith("🚦") or attempt == busy_retries:
+            break
+        time.sleep(2 ** attempt)
+    return {
+        "answer": answer,
+        "sources": sources,
+        "failed": sources.startswith(UNCACHEABLE_SOURCES),
+        "seconds": round(time.monotonic() - started, 3),
+    }
+
+def run_batch(service: AIAssistantService, input_path: Path, output_path: Path, systems: List[str],
+              workers: int = 4, rate: Optional[float] = None, busy_retries: int = 3,
+              retry_failed: bool = False) -> Dict[str, int]:
+    """Run every pending (question, system) pair, appending results as they finish"""
+    done = load_checkpoint(output_path, retry_failed)
+    jobs = [
+        (qid, question, system)
+        for qid, question, line_systems in read_questions(input_path, systems)
+        for system in line_systems
+        if (qid, system) not in done
+    ]
+    logger.info(f"{len(jobs)} queries to run ({len(done)} already in {output_path})")
+    
+    limiter = RateLimiter(rate, burst=workers)
+    counts = {"completed": 0, "failed": 0, "skipped": len(done)}
+    
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+    with open(output_path, "a", encoding="utf-8") as out:
+        futures = {
+            executor.submit(run_one, service, system, question, limiter, busy_retries): (qid, question, system)
+            for qid, question, system in jobs
+        }
+        try:
+            for future in as_completed(futures):
+                qid, question, system = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Query {qid} on {system} failed: {e}")
+                    result = {"answer": f"Error: {e}", "sources": "❌ Error", "failed": True, "seconds": None}
+                
+                # Only this thread writes, and each line is flushed so it survives an interruption
+                record = {"id": qid, "system": system, "question": question, **result}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                counts["failed" if result["failed"] else "completed"] += 1
+                finished = counts["completed"] + counts["failed"]
+                if finished % 50 == 0 or finished == len(jobs):
+                    logger.info(f"Progress: {finished}/{len(jobs)} ({counts['failed']} failed)")
+        except KeyboardInterrupt:
+            logger.warning("Interrupted; finished results are saved, re-run to resume")
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    return counts
+
+def main():
+    """Run questions from a JSONL file through the selected systems"""
+    parser = argparse.ArgumentParser(description="Run a JSONL file of questions through the AI systems")
+    parser.add_argument("input", type=Path, help="Questions JSONL")
+    parser.add_argument("output", type=Path, help="Results JSONL (appended; also the resume checkpoint)")
+    parser.add_argument("--systems", nargs="+", choices=COMPARE_SYSTEMS, default=list(COMPARE_SYSTEMS),
+                        help="Systems for lines that do not choose their own")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent queries")
+    parser.add_argument("--rate", type=float, default=None, help="Maximum queries started per second")
+    parser.add_argument("--busy-retries", type=int, default=3, help="Retries when a system rejects a query as busy")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run queries that failed in earlier runs")
+    parser.add_argument("--warmup-timeout", type=float, default=300.0, help="Longest wait for systems to warm up")
+    args = parser.parse_args()
+    
+    service = AIAssistantService(background_init=True, log_queries=False)
+    if not service.wait_until_ready(args.warmup_timeout):
+        logger.warning("Some systems are still warming up; their queries will wait for them")
+    
+    try:
+        counts = run_batch(
+            service, args.input, args.output, args.systems,
+            workers=args.workers, rate=args.rate, busy_retries=args.busy_retries,
+            retry_failed=args.retry_failed
+        )
+    except KeyboardInterrupt:
+        sys.exit(130)
+    
+    print(f"✅ {counts['completed']} completed, ❌ {counts['failed']} failed, "
+          f"⏭️ {counts['skipped']} already done -> {args.output}")
+    if counts["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Lexical retrieval microbenchmark for the personal index.
+
+Builds the BM25 inverted index over synthetic chunks at several corpus
+sizes and reports build time, memory footprint (traced allocations),
+per-query latency for the exact-match fast path and for ranked BM25
+search, and the time to re-index a small fraction of changed chunks.
+
+    python benchmarks/lexical_benchmark.py --sizes 1000 10000 100000 --output lexical.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Run from anywhere: make the web UI root importable
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from load_benchmark import percentile
+from services.bm25 import BM25Index
+
+def make_chunks(size: int, words_per_chunk: int, vocabulary: int, seed: int = 0) -> List[str]:
+    """Zipf-distributed pseudo-words, plus one distinctive name per chunk"""
+    rng = random.Random(seed)
+    words = [f"w{i}x" for i in range(vocabulary)]
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, vocabulary + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+    return [
+        " ".join(rng.choices(words, cum_weights=cum_weights, k=words_per_chunk)) + f" Name{i}corp"
+        for i in range(size)
+    ]
+
+def time_queries(search: Callable[[str], object], queries: List[str]) -> Dict:
+    """Per-query latency in milliseconds"""
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "queries": len(queries),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "mean": round(sum(latencies) / len(latencies), 3),
+        },
+    }
+
+def run_size(size: int, args) -> Dict:
+    """Benchmark building, querying and updating the index at one corpus size"""
+    chunks = make_chunks(size, args.words_per_chunk, args.vocabulary)
+    rng = random.Random(1)
+    
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = BM25Index()
+    for i, text in enumerate(chunks):
+        index.add(i, text)
+    build_seconds = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    k = args.k
+    exact_queries = [f"Name{rng.randrange(size)}corp" for _ in range(args.queries)]
+    ranked_queries = [
+        " ".join(f"w{rng.randrange(50, args.vocabulary // 4)}x" for _ in range(4)) for _ in range(args.queries)
+    ]
+    
+    def exact(query: str):
+        docs = index.containing_all(query)
+        return index.search(query, k, within=docs) if 0 < len(docs) <= k else []
+    
+    changed = rng.sample(range(size), max(1, int(size * args.update_fraction)))
+    started = time.perf_counter()
+    for i in changed:
+        index.add(i, chunks[(i + 1) % size])
+    update_seconds = time.perf_counter() - started
+    
+    return {
+        "build_seconds": round(build_seconds, 4),
+        "bytes": memory,
+        "bytes_per_chunk": round(memory / size),
+        "terms": len(index.postings),
+        "exact_match": time_queries(exact, exact_queries),
+        "bm25_top_k": time_queries(lambda q: index.search(q, k), ranked_queries),
+        "incremental_update": {"chunks": len(changed), "seconds": round(update_seconds, 4)},
+    }
+
+def main():
+    """Run the lexical retrieval microbenchmark and print JSON results"""
+    parser = argparse.ArgumentParser(description="Personal index BM25 microbenchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Corpus sizes (chunks)")
+    parser.add_argument("--words-per-chunk", type=int, default=120, help="Words per chunk (~800 characters)")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Distinct words in the corpus")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per search path")
+    parser.add_argument("--update-fraction", type=float, default=0.01, help="Fraction of chunks re-indexed")
+    parser.add_argument("--k", type=int, default=4, help="Chunks retrieved per query")
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+    
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = run_size(size, args)
+        row = results[str(size)]
+        print(f"{size} chunks: {row['bytes'] / 1e6:.1f} MB, exact p50 {row['exact_match']['latency_ms']['p50']:.3f}ms, "
+              f"bm25 p50 {row['bm25_top_k']['latency_ms']['p50']:.2f}ms", file=sys.stderr)
+    
+    output = json.dumps({"config": vars(args), "results": results}, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
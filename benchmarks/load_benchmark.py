@@ -0,0 +1,257 @@
+"""
+Offline load benchmark for the AI Personal Assistant Suite.
+
+Drives AIAssistantService (or the Gradio tab handlers with --via-handlers) at
+a fixed concurrency against local stand-ins for OpenAI, DuckDuckGo and the
+RAG systems, then reports requests per second and p50/p95/p99 latency for
+each system and for Compare. No network access or API key is needed. With
+--local-backends the real in-process local search and LLM backends answer
+instead of the latency stubs.
+
+    python benchmarks/load_benchmark.py --concurrency 8 --requests 200 --output results.json
+    python benchmarks/load_benchmark.py --baseline results.json --max-regression 0.2
+    python benchmarks/load_benchmark.py --local-backends --concurrency 32 --requests 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+# Run from anywhere: make the web UI root importable
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import stub_backends
+
+TARGETS = ("personal", "web", "hybrid", "compare")
+
+# Sources prefixes counted as failed requests
+FAILURE_SOURCES = ("❌", "⚠️", "🚦")
+
+QUESTION_TEMPLATES = (
+    "Tell me about my background {}",
+    "Latest developments in AI {}",
+    "My skills and current job market trends {}",
+    "Who is the CEO of OpenAI {}",
+)
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def _failed(update) -> bool:
+    """Whether a final stream update reports a failure (any column for Compare)"""
+    return any(str(sources).startswith(FAILURE_SOURCES) for sources in update[1::2])
+
+def run_load(target: Callable[[str], Iterator], queries: List[str], concurrency: int, requests: int) -> Dict:
+    """Run `requests` streamed queries with `concurrency` workers, consuming each stream fully"""
+    latencies = []
+    first_answers = []
+    failures = 0
+    lock = threading.Lock()
+    counter = iter(range(requests))
+    
+    def worker():
+        nonlocal failures
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            first_answer = None
+            update = None
+            try:
+                for update in target(queries[i % len(queries)]):
+                    # Placeholder updates ("⏳ ...") do not count as a first answer
+                    if first_answer is None and not any(str(s).startswith("⏳") for s in update[1::2]):
+                        first_answer = time.perf_counter() - started
+                failed = update is None or _failed(update)
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if first_answer is not None:
+                    first_answers.append(first_answer)
+                failures += failed
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    
+    return {
+        "requests": len(latencies),
+        "failures": failures,
+        "wall_seconds": round(wall, 4),
+        "requests_per_second": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 0.50), 4),
+            "p95": round(percentile(latencies, 0.95), 4),
+            "p99": round(percentile(latencies, 0.99), 4),
+            "max": round(max(latencies, default=0.0), 4),
+        },
+        "first_answer_seconds": {
+            "p50": round(percentile(first_answers, 0.50), 4),
+            "p95": round(percentile(first_answers, 0.95), 4),
+        },
+    }
+
+def configure_environment(args, workdir: Path):
+    """Point the services at stand-in documents and the requested caches"""
+    documents = workdir / "documents"
+    stub_backends.write_sample_documents(documents, copies=args.document_copies)
+    os.environ.update({
+        "OPENAI_API_KEY": "offline-benchmark",
+        "PERSONAL_DOCUMENTS_FOLDER": str(documents),
+        "PERSONAL_INDEX_DIR": str(workdir / "personal_index"),
+        "PERSONAL_INDEX_ENABLED": "false" if args.legacy_rag else "true",
+        "RESULT_CACHE_ENABLED": "true" if args.with_cache else "false",
+        "SEARCH_CACHE_ENABLED": "true" if args.with_cache else "false",
+        "SEARCH_CACHE_PATH": str(workdir / "search_cache.sqlite3"),
+        "EMBEDDING_CACHE_ENABLED": "true" if args.with_cache else "false",
+        "PREWARM_ENABLED": "false",
+    })
+    if args.local_backends:
+        # In-process BM25 search and extractive answers instead of the latency stubs
+        os.environ.update({
+            "LLM_BACKEND": "local",
+            "SEARCH_BACKEND": "local",
+            "LOCAL_SEARCH_CORPUS": str(documents),
+        })
+
+def build_targets(service, via_handlers: bool) -> Dict[str, Callable[[str], Iterator]]:
+    """Stream functions per target, either on the service or through the Gradio handlers"""
+    if not via_handlers:
+        return {
+            "personal": service.query_personal_rag_stream,
+            "web": service.query_web_search_stream,
+            "hybrid": service.query_hybrid_rag_stream,
+            "compare": service.compare_all_systems_stream,
+        }
+    
+    import gradio as gr
+    from components.personal_rag_tab import create_personal_rag_tab
+    from components.web_search_tab import create_web_search_tab
+    from components.hybrid_rag_tab import create_hybrid_rag_tab
+    from components.comparison_tab import create_comparison_tab
+    
+    with gr.Blocks() as demo:
+        with gr.Tabs():
+            create_personal_rag_tab(service)
+            create_web_search_tab(service)
+            create_hybrid_rag_tab(service)
+            create_comparison_tab(service)
+    
+    fns = demo.fns.values() if isinstance(demo.fns, dict) else demo.fns
+    handlers = {block_fn.fn.__name__: block_fn.fn for block_fn in fns if block_fn.fn is not None}
+    return {
+        "personal": handlers["safe_personal_query"],
+        "web": handlers["safe_web_query"],
+        "hybrid": handlers["safe_hybrid_query"],
+        "compare": handlers["safe_compare_query"],
+    }
+
+def check_regressions(summary: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Targets whose p95 latency or throughput regressed past the allowed fraction"""
+    problems = []
+    for name, result in summary["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        p95, old_p95 = result["latency_seconds"]["p95"], before["latency_seconds"]["p95"]
+        if old_p95 and p95 > old_p95 * (1 + max_regression):
+            problems.append(f"{name}: p95 {p95:.3f}s vs {old_p95:.3f}s baseline")
+        rps, old_rps = result["requests_per_second"], before["requests_per_second"]
+        if old_rps and rps < old_rps * (1 - max_regression):
+            problems.append(f"{name}: {rps:.1f} req/s vs {old_rps:.1f} req/s baseline")
+    return problems
+
+def main():
+    """Run the load benchmark and print JSON results"""
+    parser = argparse.ArgumentParser(description="Offline throughput and latency benchmark")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS), help="Systems to load")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per target")
+    parser.add_argument("--distinct-queries", type=int, default=50, help="Distinct questions cycled through")
+    parser.add_argument("--profile", choices=sorted(stub_backends.PROFILES), default="realistic",
+                        help="Latency preset for the stub backends")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply every preset latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of backend calls that fail")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the result, search and embedding caches enabled")
+    parser.add_argument("--local-backends", action="store_true",
+                        help="Use the in-process local search and LLM backends instead of the latency stubs")
+    parser.add_argument("--legacy-rag", action="store_true", help="Use the external RAG systems instead of the index")
+    parser.add_argument("--document-copies", type=int, default=1, help="Copies of the sample documents to index")
+    parser.add_argument("--via-handlers", action="store_true", help="Drive the Gradio tab handlers (requires gradio)")
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results to this file")
+    parser.add_argument("--baseline", type=str, default=None, help="Compare against a previous JSON result")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95/throughput regression")
+    args = parser.parse_args()
+    
+    profiles = stub_backends.build_profiles(args.profile, args.failure_rate, args.latency_scale)
+    stub_backends.install(profiles)
+    
+    with tempfile.TemporaryDirectory(prefix="load_benchmark_") as workdir:
+        configure_environment(args, Path(workdir))
+        
+        from services.ai_assistant import AIAssistantService
+        from services.metrics import metrics
+        
+        service = AIAssistantService(log_queries=False)
+        targets = build_targets(service, args.via_handlers)
+        queries = [
+            QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)].format(i)
+            for i in range(args.distinct_queries)
+        ]
+        
+        results = {}
+        for name in args.targets:
+            results[name] = run_load(targets[name], queries, args.concurrency, args.requests)
+            print(f"{name}: {results[name]['requests_per_second']} req/s, "
+                  f"p95 {results[name]['latency_seconds']['p95']:.3f}s", file=sys.stderr)
+    
+    summary = {
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "distinct_queries": args.distinct_queries,
+            "profile": args.profile,
+            "latency_scale": args.latency_scale,
+            "failure_rate": args.failure_rate,
+            "with_cache": args.with_cache,
+            "legacy_rag": args.legacy_rag,
+            "local_backends": args.local_backends,
+            "via_handlers": args.via_handlers,
+            "backends": {name: profile.to_dict() for name, profile in profiles.items()},
+        },
+        "results": results,
+        "stages": metrics.stage_summary(),
+    }
+    
+    output = json.dumps(summary, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+    
+    if args.baseline:
+        problems = check_regressions(summary, json.loads(Path(args.baseline).read_text()), args.max_regression)
+        if problems:
+            print("❌ Load regression:\n" + "\n".join(f"   • {p}" for p in problems))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Startup-time benchmark for the AI Personal Assistant Suite.
+
+Measures how long it takes before the UI can be served and how long each
+backend takes to finish warming up in the background. Use --max-ui-seconds
+to fail (exit code 1) when startup regresses past a budget. The backends are
+the offline stand-ins from stub_backends, so the check runs in CI without
+network access or an API key; --live measures the real backends instead.
+Every run is a cold start in a fresh subprocess with its own scratch
+directory, so no imports, shared indexes or persisted snapshots carry over.
+
+    python benchmarks/startup_benchmark.py --runs 3 --max-ui-seconds 2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Run from anywhere: make the web UI root importable
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import stub_backends
+
+def configure_environment(workdir: Path):
+    """Point the services at stand-in documents in a scratch directory"""
+    documents = workdir / "documents"
+    stub_backends.write_sample_documents(documents)
+    os.environ.update({
+        "OPENAI_API_KEY": "offline-benchmark",
+        "PERSONAL_DOCUMENTS_FOLDER": str(documents),
+        "PERSONAL_INDEX_DIR": str(workdir / "personal_index"),
+        "SEARCH_CACHE_PATH": str(workdir / "search_cache.sqlite3"),
+        "PREWARM_ENABLED": "false",
+    })
+
+def measure_startup(build_ui: bool) -> dict:
+    """Measure one start of the service in this process"""
+    started = time.perf_counter()
+    from services.ai_assistant import AIAssistantService, COMPARE_SYSTEMS
+    import_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    service = AIAssistantService(background_init=True, log_queries=False)
+    service_seconds = time.perf_counter() - started
+    
+    ui_seconds = None
+    if build_ui:
+        import app
+        
+        started = time.perf_counter()
+        app.create_main_interface()
+        ui_seconds = time.perf_counter() - started
+    
+    service.wait_until_ready()
+    ready = {system: round(service.warmup_seconds[system], 4) for system in COMPARE_SYSTEMS}
+    
+    return {
+        "import_seconds": round(import_seconds, 4),
+        "service_constructor_seconds": round(service_seconds, 4),
+        "build_ui_seconds": round(ui_seconds, 4) if ui_seconds is not None else None,
+        "time_to_ui_seconds": round(service_seconds + (ui_seconds or 0.0), 4),
+        "warmup_seconds": ready,
+    }
+
+def run_cold_start(args) -> dict:
+    """Measure one start in a fresh subprocess with a new scratch directory"""
+    command = [sys.executable, __file__, "--measure-once", "--profile", args.profile]
+    if args.build_ui:
+        command.append("--build-ui")
+    if args.live:
+        command.append("--live")
+    completed = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def measure_once(args):
+    """Child process: measure a single start and print it as one JSON line"""
+    if args.live:
+        result = measure_startup(args.build_ui)
+    else:
+        stub_backends.install(stub_backends.build_profiles(args.profile))
+        with tempfile.TemporaryDirectory(prefix="startup_benchmark_") as workdir:
+            configure_environment(Path(workdir))
+            result = measure_startup(args.build_ui)
+    print(json.dumps(result))
+
+def main():
+    """Run the startup benchmark and print JSON results"""
+    parser = argparse.ArgumentParser(description="Measure web UI startup time")
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold starts to measure")
+    parser.add_argument("--build-ui", action="store_true", help="Also build the Gradio Blocks (requires gradio)")
+    parser.add_argument("--max-ui-seconds", type=float, default=None, help="Fail if median time-to-UI exceeds this")
+    parser.add_argument("--profile", choices=sorted(stub_backends.PROFILES), default="realistic",
+                        help="Latency preset for the stub backends")
+    parser.add_argument("--live", action="store_true",
+                        help="Start the real backends (needs OPENAI_API_KEY and network access)")
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results to this file")
+    parser.add_argument("--measure-once", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure_once:
+        measure_once(args)
+        return
+    
+    runs = [run_cold_start(args) for _ in range(args.runs)]
+    summary = {
+        "backends": "live" if args.live else f"stub ({args.profile})",
+        "runs": runs,
+        "median_time_to_ui_seconds": round(statistics.median(r["time_to_ui_seconds"] for r in runs), 4),
+        "median_warmup_seconds": {
+            system: round(statistics.median(r["warmup_seconds"][system] for r in runs), 4)
+            for system in runs[0]["warmup_seconds"]
+        },
+    }
+    
+    output = json.dumps(summary, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+    
+    if args.max_ui_seconds is not None and summary["median_time_to_ui_seconds"] > args.max_ui_seconds:
+        print(f"❌ Startup regression: {summary['median_time_to_ui_seconds']:.2f}s > {args.max_ui_seconds:.2f}s budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Offline stand-ins for the OpenAI API (and the httpx client it is built on),
+DuckDuckGo search, result pages and the external RAG systems, used by the
+benchmarks so they run without network access or extra packages.
+
+Each backend sleeps according to a LatencyProfile and can fail randomly, so
+benchmarks can model slow or flaky dependencies. install() registers the
+stand-ins under the real module names before the services are imported.
+"""
+
+import hashlib
+import random
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+from typing import Dict, List, Optional
+
+class StubBackendError(Exception):
+    """Injected failure raised by a stub backend"""
+
+class LatencyProfile:
+    """Gaussian latency (seconds) with a random failure rate"""
+    
+    def __init__(self, mean: float, jitter: float = 0.0, failure_rate: float = 0.0):
+        self.mean = mean
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random()
+        self._lock = threading.Lock()
+    
+    def sample(self) -> float:
+        """Draw one delay, raising StubBackendError for an injected failure"""
+        with self._lock:
+            delay = max(0.0, self._random.gauss(self.mean, self.jitter)) if self.jitter else self.mean
+            failed = self._random.random() < self.failure_rate
+        if failed:
+            raise StubBackendError("injected backend failure")
+        return delay
+    
+    def wait(self):
+        """Sleep for one sampled delay"""
+        time.sleep(self.sample())
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {"mean": self.mean, "jitter": self.jitter, "failure_rate": self.failure_rate}
+
+# Named latency presets: llm is time to first token, token is per streamed token
+PROFILES = {
+    "instant": {
+        "llm": (0.0, 0.0), "token": (0.0, 0.0), "search": (0.0, 0.0),
+        "rag": (0.0, 0.0), "embedding": (0.0, 0.0), "page": (0.0, 0.0),
+    },
+    "realistic": {
+        "llm": (0.4, 0.15), "token": (0.01, 0.003), "search": (0.6, 0.25),
+        "rag": (0.15, 0.05), "embedding": (0.08, 0.02), "page": (0.3, 0.1),
+    },
+    "slow": {
+        "llm": (1.5, 0.5), "token": (0.03, 0.01), "search": (2.0, 1.0),
+        "rag": (0.5, 0.2), "embedding": (0.3, 0.1), "page": (1.0, 0.5),
+    },
+}
+
+def build_profiles(name: str = "realistic", failure_rate: float = 0.0,
+                   scale: float = 1.0) -> Dict[str, LatencyProfile]:
+    """Latency profiles for every stub backend from a named preset"""
+    return {
+        backend: LatencyProfile(mean * scale, jitter * scale, failure_rate if backend != "token" else 0.0)
+        for backend, (mean, jitter) in PROFILES[name].items()
+    }
+
+ANSWER_WORDS = (
+    "Based on the available context the answer draws on several sources and "
+    "summarizes the most relevant points see https://example.com/source for details"
+).split()
+
+def _usage(prompt: str, completion_tokens: int):
+    return types.SimpleNamespace(prompt_tokens=len(prompt.split()), completion_tokens=completion_tokens)
+
+def _prompt_text(messages: Optional[List[Dict]]) -> str:
+    return " ".join(message.get("content", "") for message in messages or [])
+
+class _ChatCompletions:
+    """Stand-in for client.chat.completions"""
+    
+    def __init__(self, profiles: Dict[str, LatencyProfile]):
+        self.profiles = profiles
+    
+    def create(self, model=None, messages=None, stream=False, stream_options=None, **_):
+        prompt = _prompt_text(messages)
+        self.profiles["llm"].wait()
+        if not stream:
+            message = types.SimpleNamespace(content=" ".join(ANSWER_WORDS))
+            return types.SimpleNamespace(
+                choices=[types.SimpleNamespace(message=message)],
+                usage=_usage(prompt, len(ANSWER_WORDS))
+            )
+        return self._stream(prompt, include_usage=bool(stream_options and stream_options.get("include_usage")))
+    
+    def _stream(self, prompt: str, include_usage: bool):
+        for word in ANSWER_WORDS:
+            self.profiles["token"].wait()
+            delta = types.SimpleNamespace(content=word + " ")
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=None)
+        if include_usage:
+            yield types.SimpleNamespace(choices=[], usage=_usage(prompt, len(ANSWER_WORDS)))
+
+def fake_embedding(text: str, dimensions: int = 64) -> List[float]:
+    """Deterministic bag-of-words embedding, so similar texts score higher"""
+    vector = [0.0] * dimensions
+    for word in text.lower().split():
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % dimensions] += 1.0
+    return vector
+
+class _Embeddings:
+    """Stand-in for client.embeddings"""
+    
+    def __init__(self, profiles: Dict[str, LatencyProfile]):
+        self.profiles = profiles
+    
+    def create(self, model=None, input=None, **_):
+        self.profiles["embedding"].wait()
+        texts = input if isinstance(input, list) else [input]
+        return types.SimpleNamespace(data=[types.SimpleNamespace(embedding=fake_embedding(t)) for t in texts])
+
+def make_openai_module(profiles: Dict[str, LatencyProfile]) -> types.ModuleType:
+    """Module exposing an OpenAI stand-in"""
+    module = types.ModuleType("openai")
+    
+    class OpenAI:
+        def __init__(self, api_key=None, **_):
+            self.chat = types.SimpleNamespace(completions=_ChatCompletions(profiles))
+            self.embeddings = _Embeddings(profiles)
+            self.models = types.SimpleNamespace(list=lambda: [])  # Health probe
+        
+        def close(self):
+            pass
+    
+    module.OpenAI = OpenAI
+    return module
+
+PAGE_HTML = (
+    "<html><head><title>{url}</title></head><body><nav>Home | About</nav>"
+    "<article><p>This page at {url} covers the topic in depth, with background, "
+    "recent developments and links to further reading.</p></article></body></html>"
+)
+
+class _PageResponse:
+    """Stand-in for a streamed httpx.Response"""
+    
+    def __init__(self, url: str):
+        self.status_code = 200
+        self.headers = {"content-type": "text/html; charset=utf-8"}
+        self.encoding = "utf-8"
+        self._body = PAGE_HTML.format(url=url).encode()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def iter_bytes(self):
+        yield self._body
+
+def make_httpx_module(profiles: Dict[str, LatencyProfile]) -> types.ModuleType:
+    """Module exposing the httpx pieces the client registry and page fetcher use"""
+    module = types.ModuleType("httpx")
+    
+    class Limits:
+        def __init__(self, max_connections=None, max_keepalive_connections=None, keepalive_expiry=None):
+            self.max_connections = max_connections
+            self.max_keepalive_connections = max_keepalive_connections
+            self.keepalive_expiry = keepalive_expiry
+    
+    class Client:
+        def __init__(self, limits=None, timeout=None, **_):
+            self.limits = limits
+            self.timeout = timeout
+        
+        def stream(self, method, url, headers=None):
+            profiles["page"].wait()
+            return _PageResponse(url)
+        
+        def close(self):
+            pass
+    
+    module.Limits = Limits
+    module.Client = Client
+    return module
+
+def make_ddgs_module(profiles: Dict[str, LatencyProfile]) -> types.ModuleType:
+    """Module exposing a DDGS stand-in"""
+    module = types.ModuleType("duckduckgo_search")
+    
+    class DDGS:
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc):
+            return False
+        
+        def text(self, query, region="wt-wt", safesearch="Moderate", max_results=3):
+            profiles["search"].wait()
+            return [
+                {
+                    "title": f"Result {i + 1} for {query}",
+                    "href": f"https://example.com/{i + 1}",
+                    "body": f"Snippet {i + 1} discussing {query} in some detail.",
+                }
+                for i in range(max_results)
+            ]
+    
+    module.DDGS = DDGS
+    return module
+
+def make_rag_modules(profiles: Dict[str, LatencyProfile]) -> Dict[str, types.ModuleType]:
+    """Modules standing in for the external personal and hybrid RAG systems"""
+    personal = types.ModuleType("rag_multi_docs")
+    hybrid = types.ModuleType("hybrid_rag")
+    
+    class PersonalRAGSystem:
+        def __init__(self, documents_folder):
+            self.documents_folder = documents_folder
+        
+        def load_personal_documents(self):
+            profiles["embedding"].wait()
+        
+        def query_personal_info(self, query):
+            profiles["rag"].wait()
+            profiles["llm"].wait()
+            return {"answer": " ".join(ANSWER_WORDS), "sources": ["background"], "files": ["profile.md"]}
+    
+    class HybridRAGSystem:
+        def __init__(self, documents_folder, min_context_length=300):
+            self.documents_folder = documents_folder
+            self.min_context_length = min_context_length
+        
+        def hybrid_query(self, query):
+            profiles["rag"].wait()
+            profiles["search"].wait()
+            profiles["llm"].wait()
+            metadata = {"sources_used": ["local", "web"], "local_context_length": 420, "web_context_length": 900}
+            return " ".join(ANSWER_WORDS), metadata
+    
+    personal.PersonalRAGSystem = PersonalRAGSystem
+    hybrid.HybridRAGSystem = HybridRAGSystem
+    return {"rag_multi_docs": personal, "hybrid_rag": hybrid}
+
+SAMPLE_DOCUMENTS = {
+    "background.md": "I am a software engineer with ten years of Python experience.\n\n"
+                     "I studied computer science and now work on search and retrieval systems.",
+    "skills.txt": "Skills: Python, distributed systems, information retrieval, machine learning.\n\n"
+                  "I enjoy mentoring and writing technical documentation.",
+    "goals.md": "This year I want to learn more about large language models and ship a personal assistant.",
+}
+
+def write_sample_documents(folder: Path, copies: int = 1):
+    """Write a small personal documents folder for the in-process index"""
+    folder.mkdir(parents=True, exist_ok=True)
+    for copy in range(copies):
+        for name, text in SAMPLE_DOCUMENTS.items():
+            stem, suffix = name.rsplit(".", 1)
+            (folder / f"{stem}_{copy}.{suffix}").write_text(text)
+
+def install(profiles: Dict[str, LatencyProfile]):
+    """Register the stand-ins under the real module names (call before importing services)"""
+    sys.modules["httpx"] = make_httpx_module(profiles)
+    sys.modules["openai"] = make_openai_module(profiles)
+    sys.modules["duckduckgo_search"] = make_ddgs_module(profiles)
+    sys.modules.update(make_rag_modules(profiles))
\ No newline at end of file
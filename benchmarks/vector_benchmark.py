@@ -0,0 +1,126 @@
+"""
+Retrieval microbenchmark for the personal index.
+
+Scores synthetic embeddings at several corpus sizes with the pure-Python
+cosine loop (the path used without numpy) and the vectorized NumPy index
+in float32 and int8, reporting build time, memory, per-query latency and
+int8 recall against exact float32 top-k. The external ChromaDB-backed
+system cannot run offline, so the pure-Python loop is the baseline.
+
+    python benchmarks/vector_benchmark.py --sizes 1000 10000 100000 --output vectors.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Run from anywhere: make the web UI root importable
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from load_benchmark import percentile
+from services.vector_index import VectorIndex, numpy_available
+
+def make_corpus(size: int, dim: int, queries: int, seed: int = 0):
+    """Clustered unit-scale embeddings plus queries near random rows"""
+    import numpy as np
+    
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, size // 50), dim), dtype=np.float32)
+    matrix = centers[rng.integers(0, len(centers), size)] + 0.5 * rng.standard_normal((size, dim), dtype=np.float32)
+    targets = matrix[rng.integers(0, size, queries)]
+    return matrix, targets + 0.3 * rng.standard_normal(targets.shape, dtype=np.float32)
+
+def python_top_k(vectors: List[List[float]], query: List[float], k: int) -> List[int]:
+    """The pure-Python cosine loop used when numpy is unavailable"""
+    query_norm = math.sqrt(sum(v * v for v in query)) or 1.0
+    scores = []
+    for vector in vectors:
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        scores.append(sum(a * b for a, b in zip(query, vector)) / (norm * query_norm))
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:k]
+
+def time_queries(search: Callable[[list], List[int]], queries: list) -> Dict:
+    """Latency of each query in milliseconds, plus the results"""
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(search(query))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "queries": len(queries),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "mean": round(sum(latencies) / len(latencies), 3),
+        },
+        "results": results,
+    }
+
+def recall(found: List[List[int]], exact: List[List[int]]) -> float:
+    """Mean fraction of the exact top-k rows that were found"""
+    return round(sum(len(set(f) & set(e)) / len(e) for f, e in zip(found, exact)) / len(exact), 4)
+
+def run_size(size: int, dim: int, queries: int, k: int, python_max_chunks: int, python_queries: int) -> Dict:
+    """Benchmark every scoring path at one corpus size"""
+    matrix, query_vectors = make_corpus(size, dim, queries)
+    result = {}
+    exact = None
+    for name, quantize in (("numpy_float32", False), ("numpy_int8", True)):
+        started = time.perf_counter()
+        index = VectorIndex.from_vectors(matrix, quantize=quantize)
+        build_seconds = time.perf_counter() - started
+        timing = time_queries(lambda q: [row for row, _ in index.top_k(q, k)], list(query_vectors))
+        found = timing.pop("results")
+        exact = found if exact is None else exact
+        result[name] = dict(timing, build_seconds=round(build_seconds, 4), bytes=index.nbytes,
+                            recall_at_k=recall(found, exact))
+    
+    if size <= python_max_chunks:
+        vectors = matrix.tolist()
+        timing = time_queries(lambda q: python_top_k(vectors, q, k), query_vectors[:python_queries].tolist())
+        found = timing.pop("results")
+        result["python"] = dict(timing, bytes=None, recall_at_k=recall(found, exact[:python_queries]))
+        result["speedup_float32_vs_python"] = round(
+            result["python"]["latency_ms"]["mean"] / result["numpy_float32"]["latency_ms"]["mean"], 1
+        )
+    else:
+        result["python"] = {"skipped": f"above --python-max-chunks {python_max_chunks}"}
+    return result
+
+def main():
+    """Run the retrieval microbenchmark and print JSON results"""
+    parser = argparse.ArgumentParser(description="Personal index retrieval microbenchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Corpus sizes (chunks)")
+    parser.add_argument("--dim", type=int, default=1536, help="Embedding dimensions (text-embedding-3-small: 1536)")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per vectorized path")
+    parser.add_argument("--python-queries", type=int, default=5, help="Queries for the pure-Python path")
+    parser.add_argument("--python-max-chunks", type=int, default=10000, help="Skip the pure-Python path above this")
+    parser.add_argument("--k", type=int, default=4, help="Chunks retrieved per query")
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+    
+    if not numpy_available():
+        print("❌ numpy is required: pip install numpy")
+        sys.exit(1)
+    
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = run_size(size, args.dim, args.queries, args.k, args.python_max_chunks,
+                                      args.python_queries)
+        row = results[str(size)]
+        print(f"{size} chunks: float32 p50 {row['numpy_float32']['latency_ms']['p50']:.2f}ms, "
+              f"int8 p50 {row['numpy_int8']['latency_ms']['p50']:.2f}ms "
+              f"(recall {row['numpy_int8']['recall_at_k']})", file=sys.stderr)
+    
+    output = json.dumps({"config": vars(args), "results": results}, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
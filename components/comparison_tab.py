@@ -1,20 +1,24 @@
 import gradio as gr
-from typing import Tuple
+from typing import Iterator, Tuple
+
+from services.examples import EXAMPLE_QUESTIONS
 
 def create_comparison_tab(assistant_service):
     """Create the System Comparison tab interface"""
     
-    def safe_compare_query(query: str) -> Tuple[str, str, str, str, str, str]:
-        """Safely execute comparison across all systems"""
+    def safe_compare_query(query: str) -> Iterator[Tuple[str, str, str, str, str, str]]:
+        """Safely execute comparison across all systems, filling columns as they finish"""
         if not assistant_service:
             error_msg = "AI Assistant not initialized"
-            return error_msg, "❌ Error", error_msg, "❌ Error", error_msg, "❌ Error"
+            yield error_msg, "❌ Error", error_msg, "❌ Error", error_msg, "❌ Error"
+            return
         
         if not query.strip():
             empty_msg = "Please enter a question"
-            return empty_msg, "❌ Empty", empty_msg, "❌ Empty", empty_msg, "❌ Empty"
+            yield empty_msg, "❌ Empty", empty_msg, "❌ Empty", empty_msg, "❌ Empty"
+            return
         
-        return assistant_service.compare_all_systems(query)
+        yield from assistant_service.compare_all_systems_stream(query)
     
     with gr.TabItem("⚖️ Compare All Systems"):
         gr.Markdown("Compare responses from all three systems side-by-side.")
@@ -71,12 +75,7 @@ def create_comparison_tab(assistant_service):
         
         # Example questions for comparison
         gr.Examples(
-            examples=[
-                "Tell me about my background",
-                "Latest developments in AI",
-                "Who is the CEO of OpenAI?",
-                "My skills and current job market trends"
-            ],
+            examples=EXAMPLE_QUESTIONS["compare"],
             inputs=compare_input
         )
         
@@ -1,18 +1,22 @@
 import gradio as gr
-from typing import Tuple
+from typing import Iterator, Tuple
+
+from services.examples import EXAMPLE_QUESTIONS
 
 def create_hybrid_rag_tab(assistant_service):
     """Create the Hybrid RAG tab interface"""
     
-    def safe_hybrid_query(query: str) -> Tuple[str, str]:
-        """Safely execute hybrid RAG query"""
+    def safe_hybrid_query(query: str) -> Iterator[Tuple[str, str]]:
+        """Safely execute hybrid RAG query, streaming the answer"""
         if not assistant_service:
-            return "AI Assistant not initialized", "❌ System Error"
+            yield "AI Assistant not initialized", "❌ System Error"
+            return
         
         if not query.strip():
-            return "Please enter a question", "❌ Empty Query"
+            yield "Please enter a question", "❌ Empty Query"
+            return
         
-        return assistant_service.query_hybrid_rag(query)
+        yield from assistant_service.query_hybrid_rag_stream(query)
     
     with gr.TabItem("🔄 Hybrid RAG System"):
         gr.Markdown("Intelligent system that automatically combines personal documents and web search.")
@@ -41,12 +45,7 @@ def create_hybrid_rag_tab(assistant_service):
         
         # Example questions
         gr.Examples(
-            examples=[
-                "Tell me about my background",
-                "Who is the CEO of OpenAI and what is their background?",
-                "What are the latest AI trends and how do they relate to my skills?",
-                "My food preferences and popular restaurants in San Francisco"
-            ],
+            examples=EXAMPLE_QUESTIONS["hybrid"],
             inputs=hybrid_input
         )
         
@@ -1,18 +1,22 @@
 import gradio as gr
-from typing import Tuple
+from typing import Iterator, Tuple
+
+from services.examples import EXAMPLE_QUESTIONS
 
 def create_personal_rag_tab(assistant_service):
     """Create the Personal RAG tab interface"""
     
-    def safe_personal_query(query: str) -> Tuple[str, str]:
-        """Safely execute personal RAG query"""
+    def safe_personal_query(query: str) -> Iterator[Tuple[str, str]]:
+        """Safely execute personal RAG query, streaming the answer"""
         if not assistant_service:
-            return "AI Assistant not initialized", "❌ System Error"
+            yield "AI Assistant not initialized", "❌ System Error"
+            return
         
         if not query.strip():
-            return "Please enter a question", "❌ Empty Query"
+            yield "Please enter a question", "❌ Empty Query"
+            return
         
-        return assistant_service.query_personal_rag(query)
+        yield from assistant_service.query_personal_rag_stream(query)
     
     with gr.TabItem("🏠 Personal RAG System"):
         gr.Markdown("Query your personal documents using advanced RAG technology.")
@@ -41,12 +45,7 @@ def create_personal_rag_tab(assistant_service):
         
         # Example questions
         gr.Examples(
-            examples=[
-                "Tell me about my background and where I'm from",
-                "What are my main technical skills?",
-                "What are my food preferences?",
-                "What is my education background?"
-            ],
+            examples=EXAMPLE_QUESTIONS["personal"],
             inputs=personal_input
         )
         
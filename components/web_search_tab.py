@@ -1,18 +1,22 @@
 import gradio as gr
-from typing import Tuple
+from typing import Iterator, Tuple
+
+from services.examples import EXAMPLE_QUESTIONS
 
 def create_web_search_tab(assistant_service):
     """Create the Web Search tab interface"""
     
-    def safe_web_query(query: str) -> Tuple[str, str]:
-        """Safely execute web search query"""
+    def safe_web_query(query: str) -> Iterator[Tuple[str, str]]:
+        """Safely execute web search query, streaming the answer"""
         if not assistant_service:
-            return "AI Assistant not initialized", "❌ System Error"
+            yield "AI Assistant not initialized", "❌ System Error"
+            return
         
         if not query.strip():
-            return "Please enter a question", "❌ Empty Query"
+            yield "Please enter a question", "❌ Empty Query"
+            return
         
-        return assistant_service.query_web_search(query)
+        yield from assistant_service.query_web_search_stream(query)
     
     with gr.TabItem("🌐 Web Search Agent"):
         gr.Markdown("Real-time web search with AI-powered analysis.")
@@ -41,12 +45,7 @@ def create_web_search_tab(assistant_service):
         
         # Example questions
         gr.Examples(
-            examples=[
-                "Latest developments in AI in 2025",
-                "Current trends in renewable energy",
-                "Who is the CEO of OpenAI?",
-                "Recent breakthroughs in quantum computing"
-            ],
+            examples=EXAMPLE_QUESTIONS["web"],
             inputs=web_input
         )
         
@@ -1,111 +1,849 @@
+import asyncio
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
-from typing import Tuple, List
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
 # Import service wrappers
 from .personal_rag_service import PersonalRAGService
 from .web_search_service import WebSearchService
 from .hybrid_rag_service import HybridRAGService
+from .result_cache import ResultCache, SQLiteCacheBackend, normalize_query
+from .embedding_cache import EmbeddingCache
+from .single_flight import SingleFlight
+from .personal_index import PersonalIndex, get_shared_index
+from .llm import embed_texts
+from .backends import backends
+from .context_packer import ContextPacker
+from .query_router import QueryRouter
+from .model_router import ModelRouter, parse_tiers
+from .scheduler import PRIORITY_BACKGROUND, PRIORITY_COMPARE, PRIORITY_INTERACTIVE, Scheduler, SystemBusyError
+from .query_log import QueryLog
+from .prewarmer import CachePrewarmer
+from .examples import EXAMPLE_QUESTIONS
+from .config import env_bool, env_float, env_int, env_str
+from .metrics import metrics
+from .resilience import CallPolicy, resilience
 
 logger = logging.getLogger(__name__)
 
+# Systems fanned out by compare_all_systems, in column order
+COMPARE_SYSTEMS = ("personal", "web", "hybrid")
+
+SYSTEM_LABELS = {
+    "personal": "Personal RAG",
+    "web": "Web Search",
+    "hybrid": "Hybrid RAG",
+}
+
+# Sources prefixes marking results that must never be cached
+UNCACHEABLE_SOURCES = ("❌", "⚠️", "⏳", "🚦")
+
+# Names used in the System Status panel
+STATUS_NAMES = {
+    "personal": "Personal RAG System",
+    "web": "Web Search Agent",
+    "hybrid": "Hybrid RAG System",
+}
+
+# Outbound backends each system cannot answer without ("search" is the configured search backend)
+SYSTEM_BACKENDS = {
+    "personal": ("openai",),
+    "web": ("openai", "search"),
+    "hybrid": ("openai",),  # Answers from personal documents alone while search is down
+}
+
+# AIAssistantService attribute holding each system's service wrapper
+SERVICE_ATTRS = {
+    "personal": "personal_rag",
+    "web": "web_search",
+    "hybrid": "hybrid_rag",
+}
+
+def _configure_clients():
+    """LLM clients for the configured backend (pooled OpenAI clients by default)"""
+    return backends.create("llm", env_str("LLM_BACKEND", "openai"))
+
+def _rag_backend() -> str:
+    """Configured RAG backend ("index" unless PERSONAL_INDEX_ENABLED=false selects the external systems)"""
+    return env_str("RAG_BACKEND", "index" if env_bool("PERSONAL_INDEX_ENABLED", True) else "external")
+
+def _open_personal_index(clients, read_only: bool = False,
+                         query_cache: Optional[EmbeddingCache] = None) -> PersonalIndex:
+    """Load (or incrementally refresh) the process-wide personal index and keep it refreshing"""
+    embedding_model = env_str("PERSONAL_EMBEDDING_MODEL", clients.embedding_model)
+    index = get_shared_index(
+        env_str("PERSONAL_DOCUMENTS_FOLDER", "../personal-rag-system/me"),
+        env_str("PERSONAL_INDEX_DIR", ".cache/personal_index"),
+        lambda texts: embed_texts(clients.get_client(), texts, model=embedding_model),
+        embedding_model=embedding_model,
+        read_only=read_only,
+        quantize=env_bool("PERSONAL_INDEX_QUANTIZE", False),
+        query_cache=query_cache,
+        retrieval_mode=env_str("PERSONAL_RETRIEVAL_MODE", "hybrid"),
+        exact_match=env_bool("PERSONAL_EXACT_MATCH", True),
+        rrf_k=env_int("PERSONAL_RRF_K", 60)
+    )
+    # Pick up document edits while running (read-only workers remap each new snapshot instead)
+    index.start_auto_refresh(env_float("PERSONAL_INDEX_REFRESH_INTERVAL", 60.0))
+    return index
+
+def prepare_shared_state():
+    """Build the on-disk state shared by worker processes, before they start.
+
+    The personal index is embedded once here and memory-mapped read-only by
+    every worker. The result and query-embedding caches move to shared SQLite
+    files (the search and page caches already live in one).
+    """
+    load_dotenv()
+    os.environ.setdefault("RESULT_CACHE_PATH", ".cache/result_cache.sqlite3")
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", ".cache/embedding_cache.sqlite3")
+    if _rag_backend() == "index" and not env_bool("PERSONAL_INDEX_READ_ONLY", False):
+        try:
+            _open_personal_index(_configure_clients())
+        except Exception as e:
+            logger.warning(f"Personal index unavailable, workers will use the external RAG systems: {e}")
+    os.environ["PERSONAL_INDEX_READ_ONLY"] = "true"
+
 class AIAssistantService:
     """Main service coordinator for all AI systems"""
     
-    def __init__(self):
-        """Initialize all AI services"""
+    def __init__(self, timeouts: Optional[Dict[str, float]] = None, cache: Optional[ResultCache] = None,
+                 background_init: bool = False, log_queries: bool = True):
+        """Initialize all AI services (in the background if background_init is set)"""
         # Load environment
         load_dotenv()
         self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        
+        # Per-system deadlines (seconds) for compare_all_systems
+        self.timeouts = {
+            "personal": env_float("PERSONAL_RAG_TIMEOUT", 30.0),
+            "web": env_float("WEB_SEARCH_TIMEOUT", 30.0),
+            "hybrid": env_float("HYBRID_RAG_TIMEOUT", 45.0),
+        }
+        if timeouts:
+            self.timeouts.update(timeouts)
+        
+        # Shared pool for comparison fan-out. Timed-out calls cannot be
+        # interrupted, so the pool is sized to absorb a few stragglers.
+        self._executor = ThreadPoolExecutor(
+            max_workers=env_int("COMPARE_MAX_WORKERS", 12),
+            thread_name_prefix="compare"
+        )
+        
+        # Threads that bridge the async API onto the synchronous query pipeline,
+        # so async callers share the same caches, coalescing and admission control
+        self._async_executor = ThreadPoolExecutor(
+            max_workers=env_int("API_MAX_WORKERS", 32),
+            thread_name_prefix="async-api"
+        )
+        
+        # Result cache in front of every system (pass a ResultCache to override)
+        self.cache = cache if cache is not None else self._build_result_cache()
+        
+        # Concurrent identical requests share one in-flight computation
+        self.single_flight = SingleFlight()
+        
+        # Opt-in log of answered user questions, mined by the cache pre-warmer
+        # for popular queries. It stores raw questions, so it is off by default
+        # and never used for non-user traffic such as batch runs.
+        self.query_log = None
+        if log_queries and env_bool("QUERY_LOG_ENABLED", False):
+            self.query_log = QueryLog(
+                env_str("QUERY_LOG_PATH", ".cache/query_log.jsonl"),
+                max_bytes=env_int("QUERY_LOG_MAX_BYTES", 5_000_000)
+            )
+        
+        # Background cache pre-warmer (created by start_prewarm)
+        self.prewarmer = None
+        
+        # Per-system admission control: (max concurrent, max queued) for each backend
+        self.scheduler = Scheduler(
+            {
+                "personal": (env_int("PERSONAL_RAG_CONCURRENCY", 4), env_int("PERSONAL_RAG_QUEUE", 16)),
+                "web": (env_int("WEB_SEARCH_CONCURRENCY", 4), env_int("WEB_SEARCH_QUEUE", 16)),
+                "hybrid": (env_int("HYBRID_RAG_CONCURRENCY", 2), env_int("HYBRID_RAG_QUEUE", 8)),
+            },
+            queue_timeout=env_float("SCHEDULER_QUEUE_TIMEOUT", 30.0)
+        )
         
         # Initialize services
         self.personal_rag = None
         self.web_search = None
         self.hybrid_rag = None
         
-        self._initialize_services()
+        # Query embeddings shared by the personal and hybrid retrieval paths
+        self.embedding_cache = self._build_embedding_cache()
+        
+        # Model tiers and answer cascade shared by every service
+        self.models = self._build_model_router()
+        
+        # One context packer shared by every service (None sends whole contexts). It
+        # reserves room for the longest answer any tier may write, including escalations.
+        self.context_packer = None
+        if env_bool("CONTEXT_PACKING_ENABLED", True):
+            self.context_packer = ContextPacker(
+                token_budget=env_int("CONTEXT_TOKEN_BUDGET", 4000),
+                answer_tokens=max(tier.max_tokens for tier in self.models.tiers),
+                dedupe_threshold=env_float("CONTEXT_DEDUPE_THRESHOLD", 0.8)
+            )
+        
+        # Shared personal document index used by both the personal and hybrid services
+        self.personal_index = None
+        
+        # One centrally configured client set shared by every service (pooled OpenAI or local)
+        self.clients = _configure_clients()
+        
+        # Search backend behind the web and hybrid systems, and the RAG backend behind personal and hybrid
+        self.search_backend = backends.create("search", env_str("SEARCH_BACKEND", "duckduckgo"))
+        self.rag_backend = _rag_backend()
+        
+        # Circuit breakers, deadlines and retries for every outbound call
+        self._configure_resilience()
+        
+        # Readiness per system; set once initialization succeeds or fails
+        self._ready = {name: threading.Event() for name in COMPARE_SYSTEMS}
+        self.warmup_seconds = {}
+        self.warmup_wait = env_float("WARMUP_WAIT_TIMEOUT", 120.0)
+        
+        self._initialize_services(background=background_init)
+    
+    def _configure_resilience(self):
+        """Configure outbound-call policies from environment settings.
+
+        OpenAI calls are bounded by the client timeout and retried with
+        jittered backoff by the SDK itself (OPENAI_MAX_RETRIES), so only the
+        circuit breaker is added on top. The search backend gets a hard
+        deadline, jittered retries and optional hedging.
+        """
+        resilience.configure(
+            "openai",
+            failure_threshold=env_int("OPENAI_CIRCUIT_FAILURES", 5),
+            reset_timeout=env_float("OPENAI_CIRCUIT_RESET", 30.0),
+            probe=lambda: self.clients.get_client().models.list()
+        )
+        hedge_after = env_float("SEARCH_HEDGE_AFTER", 0.0)
+        resilience.configure(
+            self.search_backend.name,
+            CallPolicy(
+                deadline=env_float("SEARCH_TIMEOUT", 10.0),
+                retries=env_int("SEARCH_RETRIES", 2),
+                base_delay=env_float("SEARCH_RETRY_BASE_DELAY", 0.5),
+                hedge_after=hedge_after or None
+            ),
+            failure_threshold=env_int("SEARCH_CIRCUIT_FAILURES", 5),
+            reset_timeout=env_float("SEARCH_CIRCUIT_RESET", 30.0)
+        )
     
-    def _initialize_services(self):
-        """Initialize individual services with error handling"""
+    def _build_result_cache(self) -> Optional[ResultCache]:
+        """Build the default result cache from environment settings"""
+        if not env_bool("RESULT_CACHE_ENABLED", True):
+            return None
         
-        # Personal RAG Service
-        try:
-            self.personal_rag = PersonalRAGService()
-            logger.info("Personal RAG Service initialized")
-        except Exception as e:
-            logger.warning(f"Personal RAG Service failed: {e}")
+        persistent_backend = None
+        cache_path = env_str("RESULT_CACHE_PATH", "")
+        if cache_path:
+            try:
+                persistent_backend = SQLiteCacheBackend(
+                    cache_path,
+                    max_entries=env_int("RESULT_CACHE_DISK_MAX_ENTRIES", 10000)
+                )
+            except Exception as e:
+                logger.warning(f"Persistent result cache unavailable, using memory only: {e}")
+        
+        return ResultCache(
+            ttls={
+                "personal": env_float("RESULT_CACHE_TTL_PERSONAL", 86400.0),
+                "web": env_float("RESULT_CACHE_TTL_WEB", 900.0),
+                "hybrid": env_float("RESULT_CACHE_TTL_HYBRID", 900.0),
+            },
+            max_entries=env_int("RESULT_CACHE_MAX_ENTRIES", 1024),
+            persistent_backend=persistent_backend
+        )
+    
+    def _build_embedding_cache(self) -> Optional[EmbeddingCache]:
+        """Build the query-embedding cache from environment settings"""
+        if not env_bool("EMBEDDING_CACHE_ENABLED", True):
+            return None
         
-        # Web Search Service
+        persistent_backend = None
+        cache_path = env_str("EMBEDDING_CACHE_PATH", "")
+        if cache_path:
+            try:
+                persistent_backend = SQLiteCacheBackend(
+                    cache_path,
+                    max_entries=env_int("EMBEDDING_CACHE_DISK_MAX_ENTRIES", 10000)
+                )
+            except Exception as e:
+                logger.warning(f"Persistent embedding cache unavailable, using memory only: {e}")
+        
+        return EmbeddingCache(
+            max_entries=env_int("EMBEDDING_CACHE_MAX_ENTRIES", 2048),
+            ttl=env_float("EMBEDDING_CACHE_TTL", 30 * 86400.0),
+            persistent_backend=persistent_backend
+        )
+    
+    def _initialize_services(self, background: bool = False):
+        """Initialize individual services concurrently with error handling"""
+        factories = {
+            "personal": lambda: backends.create("rag", self.rag_backend, self, "personal"),
+            "web": lambda: WebSearchService(
+                self.api_key, client=self.clients.get_client(), packer=self.context_packer, models=self.models,
+                search_backend=self.search_backend
+            ),
+            "hybrid": lambda: backends.create("rag", self.rag_backend, self, "hybrid"),
+        }
+        
+        init_executor = ThreadPoolExecutor(max_workers=len(factories), thread_name_prefix="warmup")
+        for name, factory in factories.items():
+            init_executor.submit(self._initialize_service, name, factory)
+        
+        # In background mode the UI starts right away and queries wait for readiness
+        init_executor.shutdown(wait=not background)
+    
+    def _load_personal_index(self) -> Optional[PersonalIndex]:
+        """Load (or incrementally refresh) the shared personal index, or None to use the external systems"""
         try:
-            self.web_search = WebSearchService(self.api_key)
-            logger.info("Web Search Service initialized")
+            self.personal_index = _open_personal_index(
+                self.clients,
+                read_only=env_bool("PERSONAL_INDEX_READ_ONLY", False),
+                query_cache=self.embedding_cache
+            )
+            return self.personal_index
         except Exception as e:
-            logger.warning(f"Web Search Service failed: {e}")
-        
-        # Hybrid RAG Service
+            logger.warning(f"Personal index unavailable, falling back to the external RAG systems: {e}")
+            return None
+    
+    def _build_personal_service(self) -> PersonalRAGService:
+        """Build the personal service over the shared index when it is available"""
+        index = self._load_personal_index()
+        if index is None:
+            return PersonalRAGService()
+        return PersonalRAGService(
+            index=index, client=self.clients.get_client(), packer=self.context_packer, models=self.models
+        )
+    
+    def _build_hybrid_service(self) -> HybridRAGService:
+        """Build the hybrid service over the shared index when it is available"""
+        index = self._load_personal_index()
+        if index is None:
+            return HybridRAGService()
+        return HybridRAGService(
+            min_context_length=env_int("HYBRID_MIN_CONTEXT_LENGTH", 300),
+            index=index,
+            client=self.clients.get_client(),
+            search_fn=self._search_web_for_hybrid,
+            packer=self.context_packer,
+            router=self._build_query_router(),
+            speculative=env_bool("HYBRID_SPECULATIVE_SEARCH", True),
+            speculation_workers=env_int("HYBRID_SPECULATION_WORKERS", 4),
+            models=self.models
+        )
+    
+    def _build_query_router(self) -> Optional[QueryRouter]:
+        """Build the hybrid pre-router from environment settings (None keeps the context-length rule)"""
+        if not env_bool("HYBRID_ROUTER_ENABLED", True):
+            return None
+        return QueryRouter(confident_score=env_float("HYBRID_ROUTER_CONFIDENT_SCORE", 0.45))
+    
+    def _build_model_router(self) -> ModelRouter:
+        """Build the model tiers and cascade from environment settings"""
+        tiers = parse_tiers(
+            env_str("MODEL_TIERS", "fast:gpt-4o-mini,strong:gpt-4o"),
+            max_tokens=env_int("MODEL_MAX_TOKENS", 500),
+            temperature=env_float("MODEL_TEMPERATURE", 0.1)
+        )
+        return ModelRouter(
+            tiers=tiers,
+            system_tiers={
+                system: env_str(f"MODEL_TIER_{system.upper()}", "fast") for system in COMPARE_SYSTEMS
+            },
+            cascade=env_bool("MODEL_CASCADE_ENABLED", False),
+            simple_max_words=env_int("MODEL_SIMPLE_MAX_WORDS", 12),
+            min_answer_chars=env_int("MODEL_MIN_ANSWER_CHARS", 80)
+        )
+    
+    def _search_web_for_hybrid(self, query: str) -> Tuple[str, List[str]]:
+        """Web search used by the hybrid pipeline (shares the web service and its search cache)"""
+        service = self._await_service("web")
+        if not service:
+            return "Search error: Web Search Service not available", []
+        return service.search_web(query)
+    
+    def _initialize_service(self, system: str, factory):
+        """Initialize one service, recording its warm-up time"""
+        started = time.monotonic()
         try:
-            self.hybrid_rag = HybridRAGService()
-            logger.info("Hybrid RAG Service initialized")
+            setattr(self, SERVICE_ATTRS[system], factory())
+            logger.info(f"{SYSTEM_LABELS[system]} Service initialized in {time.monotonic() - started:.2f}s")
         except Exception as e:
-            logger.warning(f"Hybrid RAG Service failed: {e}")
+            logger.warning(f"{SYSTEM_LABELS[system]} Service failed: {e}")
+        finally:
+            self.warmup_seconds[system] = time.monotonic() - started
+            self._ready[system].set()
+    
+    def is_ready(self, system: str) -> bool:
+        """Check whether a system has finished warming up (successfully or not)"""
+        return self._ready[system].is_set()
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until every system has finished warming up"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in self._ready.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not event.wait(remaining):
+                return False
+        return True
     
-    def query_personal_rag(self, query: str) -> Tuple[str, str]:
+    def _await_service(self, system: str):
+        """Wait for a system to warm up and return its service (None if unavailable)"""
+        self._ready[system].wait(self.warmup_wait)
+        return getattr(self, SERVICE_ATTRS[system])
+    
+    def _unavailable(self, system: str) -> Tuple[str, str]:
+        """Answer returned when a system cannot serve a query"""
+        if not self.is_ready(system):
+            return f"{SYSTEM_LABELS[system]} is still warming up, please try again shortly", "⏳ Warming up"
+        return f"{SYSTEM_LABELS[system]} Service not available", "❌ Service unavailable"
+    
+    def query_personal_rag(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Tuple[str, str]:
         """Query personal RAG system"""
-        if not self.personal_rag:
-            return "Personal RAG Service not available", "❌ Service unavailable"
+        service = self._await_service("personal")
+        if not service:
+            return self._unavailable("personal")
         
-        return self.personal_rag.query(query)
+        return self._cached_query("personal", service.query, query, priority)
     
-    def query_web_search(self, query: str) -> Tuple[str, str]:
+    def query_web_search(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Tuple[str, str]:
         """Query web search system"""
-        if not self.web_search:
-            return "Web Search Service not available", "❌ Service unavailable"
+        service = self._await_service("web")
+        if not service:
+            return self._unavailable("web")
         
-        return self.web_search.query(query)
+        return self._cached_query("web", service.query, query, priority)
     
-    def query_hybrid_rag(self, query: str) -> Tuple[str, str]:
+    def query_hybrid_rag(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Tuple[str, str]:
         """Query hybrid RAG system"""
-        if not self.hybrid_rag:
-            return "Hybrid RAG Service not available", "❌ Service unavailable"
+        service = self._await_service("hybrid")
+        if not service:
+            return self._unavailable("hybrid")
+        
+        return self._cached_query("hybrid", service.query, query, priority)
+    
+    def query_personal_rag_stream(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Iterator[Tuple[str, str]]:
+        """Stream the personal RAG answer as it is generated"""
+        if not self.is_ready("personal"):
+            yield "⏳ Personal RAG is warming up, your question will run as soon as it is ready...", "⏳ Warming up"
+        
+        service = self._await_service("personal")
+        if not service:
+            yield self._unavailable("personal")
+            return
+        
+        yield from self._cached_stream("personal", service.query_stream, query, priority)
+    
+    def query_web_search_stream(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Iterator[Tuple[str, str]]:
+        """Stream the web search answer as it is generated"""
+        if not self.is_ready("web"):
+            yield "⏳ Web Search is warming up, your question will run as soon as it is ready...", "⏳ Warming up"
+        
+        service = self._await_service("web")
+        if not service:
+            yield self._unavailable("web")
+            return
+        
+        yield from self._cached_stream("web", service.query_stream, query, priority)
+    
+    def query_hybrid_rag_stream(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Iterator[Tuple[str, str]]:
+        """Stream the hybrid RAG answer as it is generated"""
+        if not self.is_ready("hybrid"):
+            yield "⏳ Hybrid RAG is warming up, your question will run as soon as it is ready...", "⏳ Warming up"
+        
+        service = self._await_service("hybrid")
+        if not service:
+            yield self._unavailable("hybrid")
+            return
+        
+        yield from self._cached_stream("hybrid", service.query_stream, query, priority)
+    
+    def _cached_query(self, system: str, query_fn, query: str, priority: int) -> Tuple[str, str]:
+        """Serve a query from the result cache, coalescing concurrent misses into one scheduled backend call"""
+        started = time.perf_counter()
+        result = None
+        try:
+            result = self._serve_query(system, query_fn, query, priority)
+            self._log_query(system, query, priority, result)
+            return result
+        finally:
+            self._record_request(system, started, result)
+    
+    def _serve_query(self, system: str, query_fn, query: str, priority: int) -> Tuple[str, str]:
+        if self.cache:
+            cached = self.cache.get(system, query)
+            if cached:
+                return cached
+        
+        def run() -> Tuple[str, str]:
+            try:
+                with self.scheduler.slot(system, priority):
+                    result = query_fn(query)
+            except SystemBusyError as e:
+                return self._busy(system, e)
+            self._cache_result(system, query, result)
+            return result
+        
+        return self.single_flight.do(system, normalize_query(query), run)
+    
+    def _cached_stream(self, system: str, stream_fn, query: str, priority: int) -> Iterator[Tuple[str, str]]:
+        """Serve a streamed query from the result cache, coalescing concurrent misses into one scheduled stream"""
+        started = time.perf_counter()
+        result = None
+        try:
+            for result in self._serve_stream(system, stream_fn, query, priority):
+                yield result
+            self._log_query(system, query, priority, result)
+        finally:
+            self._record_request(system, started, result)
+    
+    def _serve_stream(self, system: str, stream_fn, query: str, priority: int) -> Iterator[Tuple[str, str]]:
+        if self.cache:
+            cached = self.cache.get(system, query)
+            if cached:
+                yield cached
+                return
         
-        return self.hybrid_rag.query(query)
+        def run() -> Iterator[Tuple[str, str]]:
+            try:
+                ticket = self.scheduler.submit(system, priority)
+            except SystemBusyError as e:
+                yield self._busy(system, e)
+                return
+            
+            try:
+                if not ticket.granted:
+                    ahead = self.scheduler.queue_position(ticket)
+                    yield f"⏳ {SYSTEM_LABELS[system]} is busy, you are number {ahead + 1} in line...", "⏳ Queued"
+                try:
+                    ticket.wait(self.scheduler.queue_timeout)
+                except SystemBusyError as e:
+                    yield self._busy(system, e)
+                    return
+                
+                result = None
+                for result in stream_fn(query):
+                    yield result
+                if result:
+                    self._cache_result(system, query, result)
+            finally:
+                ticket.release()
+        
+        yield from self.single_flight.do_stream(system, normalize_query(query), run)
+    
+    def _log_query(self, system: str, query: str, priority: int, result: Optional[Tuple[str, str]]):
+        """Log an answered user question for pre-warming (failures and the pre-warmer's own replays are not logged)"""
+        if self.query_log is None or priority == PRIORITY_BACKGROUND or not query.strip():
+            return
+        if result and result[0] and not result[1].startswith(UNCACHEABLE_SOURCES):
+            self.query_log.record(system, query)
+    
+    def _record_request(self, system: str, started: float, result: Optional[Tuple[str, str]]):
+        """Record end-to-end latency, counting missing or error answers as failures"""
+        metrics.observe("request", system, time.perf_counter() - started)
+        if result is None or result[1].startswith(("❌", "🚦")):
+            metrics.count_error("request", system)
+    
+    def _busy(self, system: str, error: SystemBusyError) -> Tuple[str, str]:
+        """Answer returned when admission control rejects a request"""
+        logger.warning(f"{SYSTEM_LABELS[system]} rejected a request: {error}")
+        return f"{SYSTEM_LABELS[system]} is busy right now, please try again in a moment", "🚦 Busy"
+    
+    def _cache_result(self, system: str, query: str, result: Tuple[str, str]):
+        """Cache a successful result (errors, timeouts and rejections are never cached)"""
+        answer, sources = result
+        if self.cache and answer and not sources.startswith(UNCACHEABLE_SOURCES):
+            self.cache.set(system, query, result)
     
     def compare_all_systems(self, query: str) -> Tuple[str, str, str, str, str, str]:
         """Compare responses from all three systems"""
+        results = None
+        for results in self.compare_all_systems_stream(query):
+            pass
+        return results
+    
+    def compare_all_systems_stream(self, query: str) -> Iterator[Tuple[str, str, str, str, str, str]]:
+        """Query all systems in parallel, yielding the columns as answers stream in"""
+        columns = {name: ("⏳ Waiting for response...", "⏳ Running") for name in COMPARE_SYSTEMS}
+        yield self._flatten_columns(columns)
+        
+        for name, answer, sources in self._fan_out(query):
+            columns[name] = (answer, sources)
+            yield self._flatten_columns(columns)
+    
+    def _fan_out(self, query: str) -> Iterator[Tuple[str, str, str]]:
+        """Stream every system concurrently, yielding (system, answer, sources) updates as they arrive"""
+        stream_fns = {
+            "personal": self.query_personal_rag_stream,
+            "web": self.query_web_search_stream,
+            "hybrid": self.query_hybrid_rag_stream,
+        }
+        # Compare fan-outs yield to interactive single-tab queries
+        priority = PRIORITY_COMPARE
+        updates = queue.Queue()
+        abandoned = set()
+        
+        def run(name: str):
+            try:
+                for answer, sources in stream_fns[name](query, priority=priority):
+                    if name in abandoned:
+                        return
+                    updates.put((name, answer, sources, False))
+                updates.put((name, None, None, True))
+            except Exception as e:
+                logger.error(f"{SYSTEM_LABELS[name]} comparison query failed: {e}")
+                updates.put((name, f"Error with {SYSTEM_LABELS[name]}: {str(e)}", "❌ Error", True))
         
-        # Query all systems
-        personal_answer, personal_sources = self.query_personal_rag(query)
-        web_answer, web_sources = self.query_web_search(query)
-        hybrid_answer, hybrid_sources = self.query_hybrid_rag(query)
+        started = time.monotonic()
+        deadlines = {name: started + self.timeouts[name] for name in COMPARE_SYSTEMS}
+        partial = {}
+        pending = set(COMPARE_SYSTEMS)
+        for name in COMPARE_SYSTEMS:
+            self._executor.submit(run, name)
         
-        return personal_answer, personal_sources, web_answer, web_sources, hybrid_answer, hybrid_sources
+        while pending:
+            next_deadline = min(deadlines[name] for name in pending)
+            try:
+                name, answer, sources, finished = updates.get(
+                    timeout=max(0.0, next_deadline - time.monotonic())
+                )
+            except queue.Empty:
+                name = None
+            
+            # Updates from systems that already timed out are dropped
+            if name in pending:
+                if answer is not None:
+                    partial[name] = answer
+                    yield name, answer, sources
+                if finished:
+                    pending.discard(name)
+                    logger.info(f"{SYSTEM_LABELS[name]} answered in {time.monotonic() - started:.2f}s")
+            
+            now = time.monotonic()
+            for name in [n for n in pending if now >= deadlines[n]]:
+                pending.discard(name)
+                abandoned.add(name)
+                logger.warning(f"{SYSTEM_LABELS[name]} timed out after {self.timeouts[name]:g}s")
+                marker = f"⏱️ {SYSTEM_LABELS[name]} did not respond within {self.timeouts[name]:g}s (partial results)"
+                if name in partial:
+                    marker = f"{partial[name]}\n\n{marker}"
+                yield name, marker, "⚠️ Timed out"
+    
+    @staticmethod
+    def _flatten_columns(columns: Dict[str, Tuple[str, str]]) -> Tuple[str, str, str, str, str, str]:
+        """Flatten per-system (answer, sources) pairs into the comparison tab's output order"""
+        return tuple(value for name in COMPARE_SYSTEMS for value in columns[name])
+    
+    async def _arun(self, fn: Callable, *args, **kwargs):
+        """Run a blocking query method on the async bridge pool (one thread per in-flight request)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._async_executor, partial(fn, *args, **kwargs))
+    
+    async def _astream(self, stream_fn: Callable[..., Iterator], *args, **kwargs) -> AsyncIterator:
+        """Consume a blocking stream on the async bridge pool, yielding its updates to the event loop"""
+        loop = asyncio.get_running_loop()
+        updates = asyncio.Queue()
+        finished = object()
+        cancelled = threading.Event()
+        
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(updates.put_nowait, item)
+            except RuntimeError:
+                cancelled.set()  # The event loop has gone away
+        
+        def run():
+            try:
+                for item in stream_fn(*args, **kwargs):
+                    if cancelled.is_set():
+                        return
+                    put(item)
+            except Exception as e:
+                put(e)
+            finally:
+                put(finished)
+        
+        loop.run_in_executor(self._async_executor, run)
+        try:
+            while True:
+                item = await updates.get()
+                if item is finished:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Stop the producer thread if the client disconnects
+            cancelled.set()
+    
+    async def aquery_personal_rag(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Tuple[str, str]:
+        """Async version of query_personal_rag"""
+        return await self._arun(self.query_personal_rag, query, priority)
+    
+    async def aquery_web_search(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Tuple[str, str]:
+        """Async version of query_web_search"""
+        return await self._arun(self.query_web_search, query, priority)
+    
+    async def aquery_hybrid_rag(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> Tuple[str, str]:
+        """Async version of query_hybrid_rag"""
+        return await self._arun(self.query_hybrid_rag, query, priority)
+    
+    def aquery_personal_rag_stream(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> AsyncIterator[Tuple[str, str]]:
+        """Async version of query_personal_rag_stream"""
+        return self._astream(self.query_personal_rag_stream, query, priority)
+    
+    def aquery_web_search_stream(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> AsyncIterator[Tuple[str, str]]:
+        """Async version of query_web_search_stream"""
+        return self._astream(self.query_web_search_stream, query, priority)
+    
+    def aquery_hybrid_rag_stream(self, query: str, priority: int = PRIORITY_INTERACTIVE) -> AsyncIterator[Tuple[str, str]]:
+        """Async version of query_hybrid_rag_stream"""
+        return self._astream(self.query_hybrid_rag_stream, query, priority)
+    
+    async def acompare_all_systems(self, query: str) -> Tuple[str, str, str, str, str, str]:
+        """Async version of compare_all_systems"""
+        return await self._arun(self.compare_all_systems, query)
+    
+    def acompare_all_systems_stream(self, query: str) -> AsyncIterator[Tuple[str, str, str, str, str, str]]:
+        """Async version of compare_all_systems_stream"""
+        return self._astream(self.compare_all_systems_stream, query)
+    
+    def refresh_personal_index(self) -> str:
+        """Re-scan the personal documents now (read-only workers remap the latest snapshot); returns a status line"""
+        if self.personal_index is None:
+            return "❌ Personal Index: Not in use"
+        try:
+            changes = self.personal_index.refresh()
+        except Exception as e:
+            logger.error(f"Personal index refresh failed: {e}")
+            return f"❌ Personal Index: Refresh failed ({e})"
+        if self.personal_index.read_only:
+            return "✅ Personal Index: Remapped the latest snapshot"
+        return (
+            f"✅ Personal Index: Refreshed ({len(changes['added'])} added, {len(changes['changed'])} changed, "
+            f"{len(changes['removed'])} removed)"
+        )
+    
+    def start_prewarm(self) -> Optional[CachePrewarmer]:
+        """Start warming the caches with example and popular logged questions in the background"""
+        if self.prewarmer is not None or not env_bool("PREWARM_ENABLED", True):
+            return self.prewarmer
+        
+        top_n = env_int("PREWARM_TOP_QUERIES", 20)
+        window = env_float("QUERY_LOG_WINDOW_DAYS", 7.0) * 86400.0
+        questions = {}
+        for system in COMPARE_SYSTEMS:
+            questions[system] = EXAMPLE_QUESTIONS[system] + EXAMPLE_QUESTIONS["compare"]
+            if self.query_log is not None:
+                questions[system] += self.query_log.top_queries(system, top_n, window=window)
+        
+        self.prewarmer = CachePrewarmer(
+            {
+                "personal": self.query_personal_rag,
+                "web": self.query_web_search,
+                "hybrid": self.query_hybrid_rag,
+            },
+            self.scheduler,
+            self.cache,
+            questions,
+            rate=env_float("PREWARM_RATE", 0.5),
+            idle_timeout=env_float("PREWARM_IDLE_TIMEOUT", 60.0),
+            lock_path=env_str("PREWARM_LOCK_PATH", ".cache/prewarm.lock")
+        )
+        self.prewarmer.start()
+        return self.prewarmer
     
     def get_system_status(self) -> List[str]:
         """Get status of all systems"""
         status = []
         
-        if self.personal_rag:
-            status.append("✅ Personal RAG System: Ready")
-        else:
-            status.append("❌ Personal RAG System: Not available")
+        for system in COMPARE_SYSTEMS:
+            if not self.is_ready(system):
+                status.append(f"⏳ {STATUS_NAMES[system]}: Warming up")
+            elif getattr(self, SERVICE_ATTRS[system]):
+                names = [self.search_backend.name if b == "search" else b for b in SYSTEM_BACKENDS[system]]
+                down = [b for b in names if resilience.state(b) != "closed"]
+                if down:
+                    status.append(f"🔴 {STATUS_NAMES[system]}: Backend unavailable ({', '.join(down)})")
+                else:
+                    status.append(
+                        f"✅ {STATUS_NAMES[system]}: Ready (warmed up in {self.warmup_seconds[system]:.1f}s)"
+                    )
+            else:
+                status.append(f"❌ {STATUS_NAMES[system]}: Not available")
+        
+        if self.personal_index is not None:
+            refresh = self.personal_index.last_refresh
+            status.append(
+                f"📂 Personal Index: {len(self.personal_index.files)} files, "
+                f"{self.personal_index.chunk_count()} chunks (last refresh: "
+                f"{len(refresh.get('added', []))} added, {len(refresh.get('changed', []))} changed, "
+                f"{len(refresh.get('removed', []))} removed in {refresh.get('seconds', 0):.2f}s)"
+            )
+            status.append(self.personal_index.get_status_line())
+        
+        if self.cache:
+            status.extend(self.cache.get_status_lines())
+        
+        if self.web_search and self.web_search.search_cache is not None:
+            status.extend(self.web_search.search_cache.get_status_lines())
+        
+        if self.web_search and self.web_search.page_fetcher is not None:
+            status.extend(self.web_search.page_fetcher.get_status_lines())
+        
+        if self.embedding_cache is not None:
+            status.extend(self.embedding_cache.get_status_lines())
         
-        if self.web_search:
-            status.append("✅ Web Search Agent: Ready")
-        else:
-            status.append("❌ Web Search Agent: Not available")
+        if self.context_packer is not None:
+            status.extend(self.context_packer.get_status_lines())
+        
+        if self.hybrid_rag and self.hybrid_rag.router is not None:
+            status.extend(self.hybrid_rag.router.get_status_lines())
+        
+        if self.prewarmer is not None:
+            status.extend(self.prewarmer.get_status_lines())
         
         if self.hybrid_rag:
-            status.append("✅ Hybrid RAG System: Ready")
-        else:
-            status.append("❌ Hybrid RAG System: Not available")
+            status.extend(self.hybrid_rag.get_status_lines())
+        
+        status.extend(self.models.get_status_lines())
+        status.extend(resilience.get_status_lines())
+        status.extend(self.single_flight.get_status_lines())
+        status.extend(self.scheduler.get_status_lines())
+        status.extend(metrics.get_status_lines(list(COMPARE_SYSTEMS)))
         
         return status
     
     def is_available(self) -> bool:
-        """Check if at least one system is available"""
-        return any([self.personal_rag, self.web_search, self.hybrid_rag])
\ No newline at end of file
+        """Check if at least one system is available (or still warming up)"""
+        if not all(event.is_set() for event in self._ready.values()):
+            return True
+        return any([self.personal_rag, self.web_search, self.hybrid_rag])
+
+def _index_rag_service(assistant: AIAssistantService, system: str):
+    """Personal or hybrid service over the shared in-process index"""
+    if system == "personal":
+        return assistant._build_personal_service()
+    return assistant._build_hybrid_service()
+
+def _external_rag_service(assistant: AIAssistantService, system: str):
+    """Personal or hybrid service wrapping the sibling RAG repos (imported only when selected)"""
+    return PersonalRAGService() if system == "personal" else HybridRAGService()
+
+backends.register("rag", "index", _index_rag_service)
+backends.register("rag", "external", _external_rag_service)
\ No newline at end of file
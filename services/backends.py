@@ -0,0 +1,87 @@
+import os
+import threading
+from typing import Callable, Dict, List
+import logging
+
+from .client_registry import configure_clients
+from .config import env_float, env_int, env_str
+from .local_backends import LocalClients, LocalSearch
+
+logger = logging.getLogger(__name__)
+
+# Kinds of pluggable backend: web search, LLM clients and the personal/hybrid RAG services
+BACKEND_KINDS = ("search", "llm", "rag")
+
+class DuckDuckGoSearch:
+    """Live web search through the duckduckgo_search package"""
+    
+    name = "duckduckgo"
+    label = "DuckDuckGo"
+    
+    def search(self, query: str, region: str = "wt-wt", safesearch: str = "Moderate",
+               max_results: int = 3) -> List[Dict[str, str]]:
+        """Run a live DuckDuckGo search"""
+        from duckduckgo_search import DDGS  # Imported lazily to keep startup fast
+        
+        with DDGS() as ddgs:
+            return [
+                {"title": r["title"], "href": r["href"], "body": r["body"]}
+                for r in ddgs.text(query, region=region, safesearch=safesearch, max_results=max_results)
+            ]
+
+class BackendRegistry:
+    """Named backend factories per kind, chosen from config (SEARCH_BACKEND, LLM_BACKEND, RAG_BACKEND)"""
+    
+    def __init__(self):
+        """Initialize with no factories"""
+        self._factories: Dict[str, Dict[str, Callable]] = {kind: {} for kind in BACKEND_KINDS}
+        self._lock = threading.Lock()
+    
+    def register(self, kind: str, name: str, factory: Callable):
+        """Add (or replace) the factory for a named backend"""
+        if kind not in self._factories:
+            raise ValueError(f"Unknown backend kind '{kind}' (expected one of {', '.join(BACKEND_KINDS)})")
+        with self._lock:
+            self._factories[kind][name] = factory
+    
+    def names(self, kind: str) -> List[str]:
+        """Registered backend names of one kind"""
+        with self._lock:
+            return sorted(self._factories.get(kind, {}))
+    
+    def create(self, kind: str, name: str, *args, **kwargs):
+        """Build the named backend, passing any arguments to its factory"""
+        with self._lock:
+            factory = self._factories.get(kind, {}).get(name)
+        if factory is None:
+            raise ValueError(f"Unknown {kind} backend '{name}' (available: {', '.join(self.names(kind))})")
+        logger.info(f"Using {kind} backend: {name}")
+        return factory(*args, **kwargs)
+
+def _openai_clients():
+    """Pooled OpenAI clients configured from environment settings"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    return configure_clients(
+        api_key,
+        max_connections=env_int("OPENAI_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=env_int("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 10),
+        keepalive_expiry=env_float("OPENAI_KEEPALIVE_EXPIRY", 30.0),
+        timeout=env_float("OPENAI_TIMEOUT", 60.0),
+        max_retries=env_int("OPENAI_MAX_RETRIES", 2)
+    )
+
+def _local_search():
+    """BM25 search over LOCAL_SEARCH_CORPUS (the personal documents by default)"""
+    return LocalSearch(
+        env_str("LOCAL_SEARCH_CORPUS", env_str("PERSONAL_DOCUMENTS_FOLDER", "../personal-rag-system/me")),
+        max_body_chars=env_int("LOCAL_SEARCH_MAX_BODY_CHARS", 400)
+    )
+
+# Process-wide registry; the RAG backends are registered by the assistant service
+backends = BackendRegistry()
+backends.register("search", "duckduckgo", DuckDuckGoSearch)
+backends.register("search", "local", _local_search)
+backends.register("llm", "openai", _openai_clients)
+backends.register("llm", "local", LocalClients)
\ No newline at end of file
@@ -0,0 +1,104 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Collection, Dict, Hashable, List, Optional, Set, Tuple
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words too common to say anything about relevance
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does for from has have how i in is it its me my of on or that the "
+    "their this to was what when where which who why will with you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class BM25Index:
+    """In-memory inverted index ranking documents with Okapi BM25.
+
+    Postings map each term to {doc_id: term frequency}, so a query only
+    touches the documents that contain at least one of its terms.
+    """
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize an empty index"""
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        self.lengths: Dict[Hashable, int] = {}
+        self.doc_terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.lengths)
+    
+    def add(self, doc_id: Hashable, text: str):
+        """Index a document (replacing any earlier version with the same id)"""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, count in terms.items():
+                self.postings.setdefault(term, {})[doc_id] = count
+            self.lengths[doc_id] = sum(terms.values())
+            self.doc_terms[doc_id] = tuple(terms)
+            self.total_length += self.lengths[doc_id]
+    
+    def remove(self, doc_id: Hashable):
+        """Drop a document from the index"""
+        with self._lock:
+            self._remove(doc_id)
+    
+    def _remove(self, doc_id: Hashable):
+        length = self.lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in self.doc_terms.pop(doc_id):
+            del self.postings[term][doc_id]
+            if not self.postings[term]:
+                del self.postings[term]
+    
+    def containing_all(self, query: str) -> Set[Hashable]:
+        """Documents containing every term of a query (empty for a query of only stopwords)"""
+        terms = set(tokenize(query))
+        with self._lock:
+            postings = sorted((self.postings.get(term, {}) for term in terms), key=len)
+            if not postings:
+                return set()
+            docs = set(postings[0])
+            for docs_with_term in postings[1:]:
+                docs.intersection_update(docs_with_term)
+            return docs
+    
+    def coverage(self, query: str, doc_id: Hashable) -> float:
+        """Fraction of a query's terms that occur in a document"""
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or doc_id not in self.doc_terms:
+                return 0.0
+            return len(terms.intersection(self.doc_terms[doc_id])) / len(terms)
+    
+    def search(self, query: str, k: int = 10, within: Optional[Collection[Hashable]] = None) -> List[Tuple[Hashable, float]]:
+        """Top-k (doc_id, score) pairs for a query, best first (optionally only among some documents)"""
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self.lengths)
+            if not count or not terms:
+                return []
+            average_length = self.total_length / count or 1.0
+            scores: Dict[Hashable, float] = {}
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, frequency in docs.items():
+                    if within is not None and doc_id not in within:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
\ No newline at end of file
@@ -0,0 +1,73 @@
+import threading
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class OpenAIClientRegistry:
+    """Central OpenAI client sharing one tuned, keep-alive HTTP connection pool.
+
+    One client is created lazily and reused by every service, so TLS
+    connections are reused across requests and services and max_connections
+    bounds outbound concurrency.
+    """
+    
+    embedding_model = "text-embedding-3-small"
+    
+    def __init__(self, api_key: str, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0, timeout: float = 60.0, max_retries: int = 2):
+        """Store client settings (clients are created on first use)"""
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+        self._lock = threading.Lock()
+    
+    def _limits(self):
+        import httpx  # Installed with openai
+        
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+    
+    def get_client(self):
+        """Shared synchronous OpenAI client"""
+        with self._lock:
+            if self._client is None:
+                import httpx
+                from openai import OpenAI  # Imported lazily to keep startup fast
+                
+                self._client = OpenAI(
+                    api_key=self.api_key,
+                    max_retries=self.max_retries,
+                    http_client=httpx.Client(limits=self._limits(), timeout=self.timeout)
+                )
+                logger.info(f"Created shared OpenAI client (max {self.max_connections} connections)")
+            return self._client
+    
+    def close(self):
+        """Close the shared client's connection pool"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def configure_clients(api_key: str, **settings) -> OpenAIClientRegistry:
+    """Create the process-wide client registry (first call wins)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = OpenAIClientRegistry(api_key, **settings)
+        return _registry
+
+def get_client_registry() -> Optional[OpenAIClientRegistry]:
+    """Return the process-wide client registry, if configured"""
+    return _registry
\ No newline at end of file
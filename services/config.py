@@ -0,0 +1,44 @@
+"""
+Environment-backed settings for the service layer.
+
+Every tunable knob has a default in code and can be overridden through an
+environment variable (or the .env file loaded by AIAssistantService).
+"""
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+def env_str(name: str, default: str) -> str:
+    """Read a string setting"""
+    return os.getenv(name, default)
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to the default on bad input"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Invalid value for {name}: {value!r}, using {default}")
+        return default
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to the default on bad input"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Invalid value for {name}: {value!r}, using {default}")
+        return default
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting (1/true/yes/on)"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
\ No newline at end of file
@@ -0,0 +1,167 @@
+import math
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from .llm import DEFAULT_MAX_TOKENS, DEFAULT_MODEL
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None when tiktoken is not installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.info("tiktoken not installed, estimating token counts from text length")
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Count the tokens in a text (about 4 characters per token without tiktoken)"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = DEFAULT_MODEL) -> str:
+    """Cut a text down to at most max_tokens tokens"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+def score_passages(query: str, passages: List[str]) -> List[float]:
+    """TF-IDF term-overlap relevance of each passage to the query"""
+    query_terms = set(_WORD_PATTERN.findall(query.lower()))
+    passage_terms = [_WORD_PATTERN.findall(passage.lower()) for passage in passages]
+    document_frequency = {
+        term: sum(1 for terms in passage_terms if term in terms) for term in query_terms
+    }
+    
+    scores = []
+    for terms in passage_terms:
+        counts = {}
+        for term in terms:
+            if term in query_terms:
+                counts[term] = counts.get(term, 0) + 1
+        scores.append(sum(
+            (1 + math.log(count)) * math.log(1 + len(passages) / (1 + document_frequency[term]))
+            for term, count in counts.items()
+        ))
+    return scores
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = _WORD_PATTERN.findall(text.lower())
+    return {tuple(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+
+class ContextPacker:
+    """Packs retrieved passages into a prompt token budget.
+
+    Near-duplicate passages are dropped, the rest are ranked by relevance to
+    the question and added best-first until the budget (total prompt tokens
+    minus the room reserved for the answer) is full.
+    """
+    
+    def __init__(self, token_budget: int = 4000, answer_tokens: int = DEFAULT_MAX_TOKENS,
+                 dedupe_threshold: float = 0.8, model: str = DEFAULT_MODEL, min_fragment_tokens: int = 50):
+        """Configure the budget (prompt + answer tokens) and the duplicate threshold"""
+        self.token_budget = token_budget
+        self.answer_tokens = answer_tokens
+        self.dedupe_threshold = dedupe_threshold
+        self.model = model
+        self.min_fragment_tokens = min_fragment_tokens
+        self.totals = {}
+        self._lock = threading.Lock()
+    
+    def context_budget(self, overhead: str = "") -> int:
+        """Tokens left for context once the prompt template and the answer are accounted for"""
+        return max(0, self.token_budget - self.answer_tokens - count_tokens(overhead, self.model))
+    
+    def _dedupe(self, passages: List[str]) -> List[str]:
+        """Drop passages mostly contained in an earlier one"""
+        kept, kept_shingles = [], []
+        for passage in passages:
+            shingles = _shingles(passage)
+            duplicate = any(
+                len(shingles & other) / max(1, min(len(shingles), len(other))) >= self.dedupe_threshold
+                for other in kept_shingles
+            )
+            if not duplicate:
+                kept.append(passage)
+                kept_shingles.append(shingles)
+        return kept
+    
+    def pack(self, query: str, passages: List[str], system: Optional[str] = "other", overhead: str = "",
+             budget: Optional[int] = None) -> Tuple[List[str], Dict]:
+        """Return the passages to use (best first) and packing stats (recorded unless system is None)"""
+        budget = self.context_budget(overhead) if budget is None else budget
+        passages = [p for p in passages if p.strip()]
+        token_counts = {p: count_tokens(p, self.model) for p in passages}
+        input_tokens = sum(token_counts[p] for p in passages)
+        
+        unique = self._dedupe(passages)
+        scores = score_passages(query, unique)
+        ranked = [unique[i] for i in sorted(range(len(unique)), key=lambda i: scores[i], reverse=True)]
+        
+        packed, used = [], 0
+        for passage in ranked:
+            tokens = token_counts[passage]
+            if used + tokens <= budget:
+                packed.append(passage)
+                used += tokens
+            elif budget - used >= self.min_fragment_tokens:
+                # Keep the start of a passage that only partly fits
+                fragment = truncate_to_tokens(passage, budget - used, self.model)
+                packed.append(fragment)
+                used += count_tokens(fragment, self.model)
+        
+        stats = {
+            "passages": len(passages),
+            "duplicates": len(passages) - len(unique),
+            "dropped": len(unique) - len(packed),
+            "budget": budget,
+            "input_tokens": input_tokens,
+            "packed_tokens": used,
+            "saved_tokens": max(0, input_tokens - used),
+        }
+        if system is not None:
+            self.record(system, stats)
+        return packed, stats
+    
+    def record(self, system: str, stats: Dict):
+        """Accumulate per-system savings for the status panel and /metrics"""
+        with self._lock:
+            totals = self.totals.setdefault(system, {"prompts": 0, "input_tokens": 0, "packed_tokens": 0})
+            totals["prompts"] += 1
+            totals["input_tokens"] += stats["input_tokens"]
+            totals["packed_tokens"] += stats["packed_tokens"]
+        metrics.count("context_input_tokens", system, stats["input_tokens"])
+        metrics.count("context_packed_tokens", system, stats["packed_tokens"])
+        if stats["saved_tokens"] or stats["duplicates"]:
+            logger.info(
+                f"Packed {system} context: {stats['input_tokens']} -> {stats['packed_tokens']} tokens "
+                f"({stats['duplicates']} duplicates, {stats['dropped']} dropped)"
+            )
+    
+    def get_status_lines(self) -> List[str]:
+        """Per-system token savings for the status panel"""
+        lines = [f"📦 Context Packing (budget {self.token_budget} tokens, {self.answer_tokens} for the answer):"]
+        with self._lock:
+            for system, totals in self.totals.items():
+                prompts = totals["prompts"]
+                saved = totals["input_tokens"] - totals["packed_tokens"]
+                share = saved / totals["input_tokens"] if totals["input_tokens"] else 0.0
+                lines.append(
+                    f"   • {system}: avg {totals['input_tokens'] / prompts:.0f} -> "
+                    f"{totals['packed_tokens'] / prompts:.0f} context tokens over {prompts} prompts ({share:.0%} saved)"
+                )
+        return lines
\ No newline at end of file
@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+import time
+from typing import Callable, List
+import logging
+
+from .result_cache import MemoryCacheBackend, normalize_query
+from .single_flight import SingleFlight
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Query-embedding cache keyed on (embedding model, normalized text).
+
+    Lookups go to a bounded in-memory LRU first and then to an optional
+    persistent backend. Concurrent misses for the same text (e.g. the personal
+    and hybrid columns of a comparison) share one embedding call.
+    """
+    
+    def __init__(self, max_entries: int = 2048, ttl: float = 30 * 86400.0, persistent_backend=None):
+        """Initialize the cache"""
+        self.ttl = ttl
+        self.memory = MemoryCacheBackend(max_entries)
+        self.persistent = persistent_backend
+        self.single_flight = SingleFlight()
+        self.counters = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+    
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+        metrics.count(f"embedding_cache_{counter}", "personal_index")
+    
+    def _lookup(self, key: str):
+        now = time.time()
+        for backend in (self.memory, self.persistent):
+            if backend is None:
+                continue
+            entry = backend.get(key)
+            if entry is None:
+                continue
+            value, expires_at = entry
+            if expires_at <= now:
+                backend.delete(key)
+                continue
+            if backend is not self.memory:
+                self.memory.set(key, value, expires_at)
+            return value
+        return None
+    
+    def get_or_embed(self, text: str, model: str, embed: Callable[[], List[float]]) -> List[float]:
+        """Return the cached embedding of a text, calling embed() once on a miss"""
+        key = f"{model}:{normalize_query(text)}"
+        embedding = self._lookup(key)
+        if embedding is not None:
+            self._count("hits")
+            return embedding
+        
+        embedded = False
+        
+        def compute() -> List[float]:
+            nonlocal embedded
+            embedding = self._lookup(key)  # Filled by a flight that finished after the first lookup
+            if embedding is not None:
+                return embedding
+            embedded = True
+            embedding = list(embed())
+            expires_at = time.time() + self.ttl
+            self.memory.set(key, embedding, expires_at)
+            if self.persistent is not None:
+                try:
+                    self.persistent.set(key, embedding, expires_at)
+                except sqlite3.Error as e:
+                    logger.warning(f"Persistent embedding cache write failed: {e}")
+            return embedding
+        
+        # Callers that joined another caller's flight count as hits
+        embedding = self.single_flight.do("embedding", key, compute)
+        self._count("misses" if embedded else "hits")
+        return embedding
+    
+    def get_status_lines(self) -> List[str]:
+        """Hit rate and size for the status panel"""
+        with self._lock:
+            counts = dict(self.counters)
+        total = counts["hits"] + counts["misses"]
+        hit_rate = counts["hits"] / total if total else 0.0
+        return [
+            f"🧮 Query Embedding Cache: {len(self.memory)}/{self.memory.max_entries} in memory"
+            + (f", {len(self.persistent)} on disk" if self.persistent is not None else "")
+            + f", {counts['hits']} hits / {counts['misses']} misses ({hit_rate:.0%} hit rate)"
+        ]
\ No newline at end of file
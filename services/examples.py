@@ -0,0 +1,28 @@
+# Example questions shown under each tab; the cache pre-warmer replays them at startup
+EXAMPLE_QUESTIONS = {
+    "personal": [
+        "Tell me about my background and where I'm from",
+        "What are my main technical skills?",
+        "What are my food preferences?",
+        "What is my education background?",
+    ],
+    "web": [
+        "Latest developments in AI in 2025",
+        "Current trends in renewable energy",
+        "Who is the CEO of OpenAI?",
+        "Recent breakthroughs in quantum computing",
+    ],
+    "hybrid": [
+        "Tell me about my background",
+        "Who is the CEO of OpenAI and what is their background?",
+        "What are the latest AI trends and how do they relate to my skills?",
+        "My food preferences and popular restaurants in San Francisco",
+    ],
+    # Compare runs every system, so its examples are warmed in all three
+    "compare": [
+        "Tell me about my background",
+        "Latest developments in AI",
+        "Who is the CEO of OpenAI?",
+        "My skills and current job market trends",
+    ],
+}
\ No newline at end of file
@@ -1,15 +1,52 @@
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import logging
 
+from .personal_index import PersonalIndex
+from .context_packer import ContextPacker
+from .query_router import QueryRouter
+from .model_router import ModelRouter
+from .metrics import metrics
+from .sources import Sources, hybrid_sources
+
 logger = logging.getLogger(__name__)
 
 class HybridRAGService:
     """Service wrapper for Hybrid RAG System"""
     
-    def __init__(self, documents_folder: str = "../personal-rag-system/me", min_context_length: int = 300):
-        """Initialize Hybrid RAG Service"""
+    def __init__(self, documents_folder: str = "../personal-rag-system/me", min_context_length: int = 300,
+                 index: Optional[PersonalIndex] = None, client=None,
+                 search_fn: Optional[Callable[[str], Tuple[str, List[str]]]] = None, top_k: int = 4, min_score: float = 0.3,
+                 packer: Optional[ContextPacker] = None, router: Optional[QueryRouter] = None,
+                 speculative: bool = False, speculation_workers: int = 4, models: Optional[ModelRouter] = None):
+        """Initialize Hybrid RAG Service (over a shared PersonalIndex when one is given)"""
+        self.index = index
+        self.packer = packer
+        self.router = router
+        self.models = models if models is not None else ModelRouter()
+        
+        # Speculative mode starts the web search alongside local retrieval
+        self.speculative = speculative and search_fn is not None
+        self.speculation = {"hits": 0, "discarded": 0}
+        self._speculation_lock = threading.Lock()
+        self._executor = None
+        if self.speculative:
+            self._executor = ThreadPoolExecutor(max_workers=speculation_workers, thread_name_prefix="hybrid-speculate")
+        self.client = client
+        self.search_fn = search_fn
+        self.min_context_length = min_context_length
+        self.top_k = top_k
+        self.min_score = min_score
+        self.hybrid_system = None
+        
+        if index is not None:
+            logger.info(f"Hybrid RAG Service using shared index ({index.chunk_count()} chunks)")
+            return
+        
         try:
             # Add the hybrid-rag-system directory to Python path
             current_dir = Path(__file__).parent.parent
@@ -35,31 +72,174 @@ class HybridRAGService:
             logger.error(f"Failed to initialize Hybrid RAG Service: {e}")
             raise
     
+    def _gather_context(self, query: str) -> Tuple[str, Dict]:
+        """Retrieve local context, adding web results when the router calls for them; returns (prompt, metadata)"""
+        route, reason = self.router.classify(query) if self.router is not None else ("auto", "router disabled")
+        
+        # Start the web search now unless the route says it is (almost) certainly not needed
+        speculative_search = None
+        if self.speculative and route != "local":
+            speculative_search = self._executor.submit(self.search_fn, query)
+        
+        try:
+            # Keyword routes only decide about the web: personal documents are always consulted
+            with metrics.timer("retrieval", "hybrid"):
+                chunks = [c for c in self.index.search(query, self.top_k) if c["score"] >= self.min_score]
+        except Exception:
+            if speculative_search is not None:
+                speculative_search.cancel()
+            raise
+        local_context = "\n---\n".join(f"[{chunk['file']}]\n{chunk['text']}" for chunk in chunks)
+        
+        thin_context = len(local_context) < self.min_context_length
+        use_web = thin_context
+        if self.router is not None:
+            use_web, reason = self.router.needs_web(route, chunks, len(local_context), self.min_context_length)
+        
+        speculation = self._settle_speculation(speculative_search, use_web)
+        web_context, web_urls = "", []
+        if use_web and self.search_fn:
+            if speculative_search is not None:
+                web_context, web_urls = speculative_search.result()
+            else:
+                web_context, web_urls = self.search_fn(query)
+            if "Search error" in web_context or "No results found" in web_context:
+                web_context, web_urls = "", []
+        if self.router is not None:
+            self.router.record(route, bool(use_web and self.search_fn), thin_context, reason)
+        
+        packing = {}
+        if self.packer is not None:
+            local_context, web_context, packing = self._pack_context(query, local_context, web_context)
+        
+        sources_used = []
+        if local_context:
+            sources_used.append("local")
+        if web_context:
+            sources_used.append("web")
+        
+        metadata = {
+            "sources_used": sources_used,
+            "documents": [chunk["file"] for chunk in chunks],
+            "urls": web_urls,
+            "local_context_length": len(local_context),
+            "web_context_length": len(web_context),
+            "route": route,
+            "route_reason": reason,
+            "speculation": speculation,
+            **packing,
+        }
+        return self._render_prompt(query, local_context, web_context), metadata
+    
+    def _settle_speculation(self, speculative_search, use_web: bool) -> str:
+        """Keep or drop a speculative web search; returns the outcome ("hit", "discarded" or "off")"""
+        if speculative_search is None:
+            return "off"
+        if use_web:
+            outcome = "hits"
+        else:
+            # A search already under way still finishes and warms the search cache
+            speculative_search.cancel()
+            outcome = "discarded"
+        with self._speculation_lock:
+            self.speculation[outcome] += 1
+        metrics.count("speculative_searches", "hybrid", labels={"outcome": outcome})
+        return "hit" if use_web else "discarded"
+    
+    def get_status_lines(self) -> List[str]:
+        """Speculative search outcomes for the status panel"""
+        if not self.speculative:
+            return []
+        with self._speculation_lock:
+            counts = dict(self.speculation)
+        total = counts["hits"] + counts["discarded"]
+        share = counts["hits"] / total if total else 0.0
+        return [
+            f"⚡ Speculative Search: {total} started alongside retrieval, "
+            f"{counts['hits']} used ({share:.0%}), {counts['discarded']} discarded"
+        ]
+    
+    def _pack_context(self, query: str, local_context: str, web_context: str) -> Tuple[str, str, Dict]:
+        """Fit both contexts into the token budget, personal documents first"""
+        budget = self.packer.context_budget(self._render_prompt(query, "", ""))
+        local_passages, local_stats = self.packer.pack(
+            query, local_context.split("\n---\n"), system=None, budget=budget
+        )
+        web_passages, web_stats = self.packer.pack(
+            query, web_context.split("\n---\n"), system=None,
+            budget=max(0, budget - local_stats["packed_tokens"])
+        )
+        stats = {key: local_stats[key] + web_stats[key] for key in local_stats if key != "budget"}
+        self.packer.record("hybrid", dict(stats, budget=budget))
+        packing = {"context_tokens": stats["packed_tokens"], "saved_tokens": stats["saved_tokens"]}
+        return "\n---\n".join(local_passages), "\n---\n".join(web_passages), packing
+    
+    def _render_prompt(self, query: str, local_context: str, web_context: str) -> str:
+        return f"""You are a helpful assistant with access to the user's personal documents and to web search results. Answer the question using the context below, preferring personal documents for questions about the user and citing URLs for web information.
+
+Personal Documents:
+{local_context or "(no relevant personal documents)"}
+
+Web Search Results:
+{web_context or "(web search not used)"}
+
+Question: {query}
+
+Answer:"""
+    
+    def _format_sources(self, metadata: Dict) -> Sources:
+        """Sources based on what was used (the external system reports no documents or URLs)"""
+        sources_used = metadata.get("sources_used", [])
+        return hybrid_sources(
+            metadata.get("documents", []),
+            metadata.get("urls", []),
+            metadata.get("local_context_length", 0) if "local" in sources_used else 0,
+            used_web="web" in sources_used
+        )
+    
     def query(self, query: str) -> Tuple[str, str]:
         """Query the hybrid RAG system"""
         try:
-            answer, metadata = self.hybrid_system.hybrid_query(query)
-            
-            # Format sources based on what was used
-            sources_used = metadata.get("sources_used", [])
-            local_length = metadata.get("local_context_length", 0)
-            web_length = metadata.get("web_context_length", 0)
-            
-            if "local" in sources_used and "web" in sources_used:
-                sources = f"🔄 Hybrid: Personal docs ({local_length} chars) + Web search"
-            elif "local" in sources_used:
-                sources = f"🏠 Personal documents only ({local_length} chars)"
-            elif "web" in sources_used:
-                sources = f"🌐 Web search only"
-            else:
-                sources = "❓ Unknown sources"
+            with metrics.timer("hybrid_query", "hybrid"):
+                if self.index is not None:
+                    prompt, metadata = self._gather_context(query)
+                    answer = self.models.complete(self.client, prompt, query, system="hybrid")
+                else:
+                    answer, metadata = self.hybrid_system.hybrid_query(query)
             
+            with metrics.timer("format", "hybrid"):
+                sources = self._format_sources(metadata)
             return answer, sources
             
         except Exception as e:
             logger.error(f"Hybrid RAG query failed: {e}")
             return f"Error with Hybrid RAG: {str(e)}", "❌ Error"
     
+    def query_stream(self, query: str) -> Iterator[Tuple[str, str]]:
+        """Stream the hybrid RAG answer (the external system only returns complete answers)"""
+        if self.index is None:
+            yield self.query(query)
+            return
+        
+        started = time.perf_counter()
+        try:
+            prompt, metadata = self._gather_context(query)
+            with metrics.timer("format", "hybrid"):
+                sources = self._format_sources(metadata)
+            answer = ""
+            for answer in self.models.stream(self.client, prompt, query, system="hybrid"):
+                yield answer, sources
+            
+            if not answer:
+                yield "No answer generated", sources
+                
+        except Exception as e:
+            metrics.count_error("hybrid_query", "hybrid")
+            logger.error(f"Hybrid RAG streaming query failed: {e}")
+            yield f"Error with Hybrid RAG: {str(e)}", "❌ Error"
+        finally:
+            metrics.observe("hybrid_query", "hybrid", time.perf_counter() - started)
+    
     def is_available(self) -> bool:
         """Check if the service is available"""
-        return hasattr(self, 'hybrid_system') and self.hybrid_system is not None
\ No newline at end of file
+        return self.index is not None or self.hybrid_system is not None
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Shared OpenAI helpers (chat completions and embeddings) used by every service.
+"""
+
+import time
+from typing import Iterator, List
+import logging
+
+from .metrics import metrics
+from .resilience import resilience
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_MAX_TOKENS = 500
+DEFAULT_TEMPERATURE = 0.1
+
+def _record_usage(system: str, usage):
+    """Count the prompt and completion tokens reported by the API"""
+    if usage is not None:
+        metrics.count_tokens(system, getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0))
+
+def complete(client, prompt: str, system: str = "other", model: str = DEFAULT_MODEL,
+             max_tokens: int = DEFAULT_MAX_TOKENS, temperature: float = DEFAULT_TEMPERATURE) -> str:
+    """Run a single-prompt chat completion and return the answer text"""
+    with metrics.timer("llm", system):
+        response = resilience.call("openai", lambda: client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature
+        ))
+    _record_usage(system, getattr(response, "usage", None))
+    return response.choices[0].message.content
+
+def stream_completion(client, prompt: str, system: str = "other", model: str = DEFAULT_MODEL,
+                      max_tokens: int = DEFAULT_MAX_TOKENS, temperature: float = DEFAULT_TEMPERATURE) -> Iterator[str]:
+    """Run a single-prompt chat completion, yielding the cumulative answer as tokens arrive"""
+    with metrics.timer("llm", system), resilience.guard("openai"):
+        started = time.perf_counter()
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        answer = ""
+        for chunk in stream:
+            # The final chunk carries token usage and no choices
+            _record_usage(system, getattr(chunk, "usage", None))
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not answer:
+                    metrics.observe("llm_first_token", system, time.perf_counter() - started)
+                answer += delta
+                yield answer
+
+def embed_texts(client, texts: List[str], model: str = "text-embedding-3-small") -> List[List[float]]:
+    """Embed a batch of texts"""
+    with metrics.timer("embedding", "personal_index"):
+        response = resilience.call("openai", lambda: client.embeddings.create(model=model, input=list(texts)))
+    return [item.embedding for item in response.data]
\ No newline at end of file
@@ -0,0 +1,183 @@
+import hashlib
+import re
+import types
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from .bm25 import BM25Index, tokenize
+
+logger = logging.getLogger(__name__)
+
+CORPUS_EXTENSIONS = {".md", ".txt"}
+
+_URL_LINE = re.compile(r"^(?:https?|file)://\S+$")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_QUESTION = re.compile(r"Question:\s*(.*?)\s*(?:Answer:\s*)?$", re.DOTALL)
+
+NO_ANSWER = "There is not enough information in the provided context to answer that."
+
+class LocalSearch:
+    """BM25 search over a local folder of documents, standing in for a web search API.
+
+    Every paragraph of every .md/.txt file is one result, titled after its
+    file and linked with a file:// URL, so answers can still cite sources.
+    """
+    
+    name = "local"
+    label = "Local Corpus"
+    
+    def __init__(self, corpus_folder: str, max_body_chars: int = 400):
+        """Index the corpus folder (an empty index if it does not exist)"""
+        self.corpus_folder = Path(corpus_folder)
+        self.max_body_chars = max_body_chars
+        self.index = BM25Index()
+        self.results: Dict[int, Dict[str, str]] = {}
+        self._load()
+    
+    def _load(self):
+        if not self.corpus_folder.is_dir():
+            logger.warning(f"Local search corpus {self.corpus_folder} not found; searches return no results")
+            return
+        for path in sorted(self.corpus_folder.rglob("*")):
+            if path.suffix.lower() not in CORPUS_EXTENSIONS or not path.is_file():
+                continue
+            try:
+                text = path.read_text(encoding="utf-8", errors="ignore")
+            except OSError as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+            for number, paragraph in enumerate(p.strip() for p in text.split("\n\n")):
+                if not paragraph:
+                    continue
+                doc_id = len(self.results)
+                title = path.stem.replace("_", " ").replace("-", " ").title()
+                self.results[doc_id] = {
+                    "title": title,
+                    "href": f"{path.resolve().as_uri()}#p{number + 1}",
+                    "body": paragraph[:self.max_body_chars],
+                }
+                self.index.add(doc_id, f"{title}\n{paragraph}")
+        logger.info(f"Local search indexed {len(self.results)} passages from {self.corpus_folder}")
+    
+    def search(self, query: str, region: str = "wt-wt", safesearch: str = "Moderate",
+               max_results: int = 3) -> List[Dict[str, str]]:
+        """Best-matching passages as {title, href, body} results"""
+        return [dict(self.results[doc_id]) for doc_id, _ in self.index.search(query, max_results)]
+
+def hashed_embedding(text: str, dimensions: int = 256) -> List[float]:
+    """Deterministic signed bag-of-words embedding (stable across processes, unlike hash())"""
+    vector = [0.0] * dimensions
+    for token in tokenize(text):
+        digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+        vector[digest % dimensions] += 1.0 if digest >> 63 else -1.0
+    return vector
+
+def extract_answer(prompt: str, max_words: int = 500, max_sentences: int = 3) -> str:
+    """Answer a RAG prompt with the context sentences that best match its question.
+
+    The question is the text after the last "Question:"; the context is
+    everything before it except the first paragraph (the instructions).
+    URL lines in the context are cited after the answer.
+    """
+    split = prompt.rfind("Question:")
+    if split < 0:
+        context, question = "", prompt
+    else:
+        context = prompt[:split]
+        match = _QUESTION.search(prompt[split:])
+        question = match.group(1) if match else prompt[split:]
+    paragraphs = context.split("\n\n")
+    if len(paragraphs) > 1:
+        paragraphs = paragraphs[1:]
+    
+    terms = set(tokenize(question))
+    candidates: List[Tuple[int, int, str, Optional[str]]] = []
+    url = None
+    for line in "\n".join(paragraphs).splitlines():
+        line = line.strip().strip("*").strip()
+        if _URL_LINE.match(line):
+            url = line
+            continue
+        if not line or line == "---" or line.endswith(":"):
+            continue
+        for sentence in _SENTENCE_SPLIT.split(line):
+            score = len(terms & set(tokenize(sentence)))
+            if score:
+                candidates.append((score, len(candidates), sentence, url))
+    
+    best = sorted(candidates, key=lambda c: (-c[0], c[1]))[:max_sentences]
+    if not best:
+        return NO_ANSWER
+    best.sort(key=lambda c: c[1])
+    sentences = list(dict.fromkeys(c[2] for c in best))
+    urls = list(dict.fromkeys(c[3] for c in best if c[3]))
+    answer = " ".join(" ".join(sentences).split()[:max_words])
+    if urls:
+        answer += "\n\nSources: " + ", ".join(urls)
+    return answer
+
+def _usage(prompt: str, answer: str):
+    return types.SimpleNamespace(prompt_tokens=len(prompt.split()), completion_tokens=len(answer.split()))
+
+def _chunk(content: Optional[str], usage=None):
+    if content is None:
+        return types.SimpleNamespace(choices=[], usage=usage)
+    delta = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=None)
+
+class _ExtractiveCompletions:
+    """OpenAI-compatible chat.completions answering extractively from the prompt"""
+    
+    def _answer(self, messages, max_tokens) -> Tuple[str, str]:
+        prompt = "\n\n".join(message.get("content", "") for message in messages or [])
+        return prompt, extract_answer(prompt, max_words=max_tokens or 500)
+    
+    def _response(self, prompt: str, answer: str):
+        message = types.SimpleNamespace(content=answer)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=_usage(prompt, answer))
+    
+    def create(self, model=None, messages=None, max_tokens=None, stream=False, stream_options=None, **_):
+        prompt, answer = self._answer(messages, max_tokens)
+        if not stream:
+            return self._response(prompt, answer)
+        return self._stream(prompt, answer, bool(stream_options and stream_options.get("include_usage")))
+    
+    def _stream(self, prompt: str, answer: str, include_usage: bool) -> Iterator:
+        for token in re.findall(r"\S+\s*", answer):
+            yield _chunk(token)
+        if include_usage:
+            yield _chunk(None, _usage(prompt, answer))
+
+class _HashedEmbeddings:
+    """OpenAI-compatible embeddings.create returning hashed bag-of-words vectors"""
+    
+    def create(self, model=None, input=None, **_):
+        texts = input if isinstance(input, list) else [input]
+        return types.SimpleNamespace(data=[types.SimpleNamespace(embedding=hashed_embedding(t)) for t in texts])
+
+class ExtractiveClient:
+    """In-process stand-in for the OpenAI client: extractive answers and hashed embeddings"""
+    
+    def __init__(self):
+        self.chat = types.SimpleNamespace(completions=_ExtractiveCompletions())
+        self.embeddings = _HashedEmbeddings()
+        self.models = types.SimpleNamespace(list=lambda: [])  # Health probe
+    
+    def close(self):
+        pass
+
+class LocalClients:
+    """Client registry for the local LLM backend, interchangeable with OpenAIClientRegistry"""
+    
+    embedding_model = "local-hashed-256"
+    
+    def __init__(self):
+        self._client = ExtractiveClient()
+        logger.info("Using the local extractive LLM backend (no API calls)")
+    
+    def get_client(self) -> ExtractiveClient:
+        return self._client
+    
+    def close(self):
+        pass
\ No newline at end of file
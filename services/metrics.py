@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class _Histogram:
+    """Cumulative-bucket latency histogram plus a window of recent samples for percentiles"""
+    
+    def __init__(self, window: int = 1000):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+    
+    def observe(self, seconds: float):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+    
+    def percentile(self, fraction: float) -> float:
+        samples = sorted(self.recent)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+class MetricsRegistry:
+    """Per-stage latency histograms, token counters and error counters.
+
+    Stages are labelled with the system they ran for, e.g. ("llm", "web") or
+    ("retrieval", "personal"); the "request" stage is end-to-end latency.
+    """
+    
+    def __init__(self):
+        """Initialize empty metrics"""
+        self._latency = {}
+        self._errors = {}
+        self._tokens = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, stage: str, system: str, seconds: float):
+        """Record one stage latency"""
+        with self._lock:
+            histogram = self._latency.get((stage, system))
+            if histogram is None:
+                histogram = self._latency[(stage, system)] = _Histogram()
+            histogram.observe(seconds)
+    
+    def count_error(self, stage: str, system: str):
+        """Record one stage failure"""
+        with self._lock:
+            self._errors[(stage, system)] = self._errors.get((stage, system), 0) + 1
+    
+    def count_tokens(self, system: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        """Record LLM token usage"""
+        with self._lock:
+            for kind, value in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+                if value:
+                    self._tokens[(system, kind)] = self._tokens.get((system, kind), 0) + value
+    
+    def count(self, name: str, system: str, value: int = 1, labels: Optional[Dict[str, str]] = None):
+        """Add to a named counter (exported as rag_<name>_total), optionally split by extra labels"""
+        key = (name, system, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    @contextmanager
+    def timer(self, stage: str, system: str):
+        """Time a block, counting an error if it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count_error(stage, system)
+            raise
+        finally:
+            self.observe(stage, system, time.perf_counter() - started)
+    
+    def percentiles(self, stage: str, system: str) -> Tuple[int, float, float, float]:
+        """(count, p50, p95, p99) for a stage over the recent window"""
+        with self._lock:
+            histogram = self._latency.get((stage, system))
+            if histogram is None:
+                return 0, 0.0, 0.0, 0.0
+            return (histogram.count, histogram.percentile(0.50),
+                    histogram.percentile(0.95), histogram.percentile(0.99))
+    
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP rag_stage_latency_seconds Latency of each pipeline stage",
+            "# TYPE rag_stage_latency_seconds histogram",
+        ]
+        with self._lock:
+            for (stage, system), histogram in sorted(self._latency.items()):
+                labels = f'stage="{stage}",system="{system}"'
+                for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                    lines.append(f'rag_stage_latency_seconds_bucket{{{labels},le="{bound:g}"}} {count}')
+                lines.append(f'rag_stage_latency_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"rag_stage_latency_seconds_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"rag_stage_latency_seconds_count{{{labels}}} {histogram.count}")
+            
+            lines.append("# HELP rag_stage_errors_total Failures of each pipeline stage")
+            lines.append("# TYPE rag_stage_errors_total counter")
+            for (stage, system), count in sorted(self._errors.items()):
+                lines.append(f'rag_stage_errors_total{{stage="{stage}",system="{system}"}} {count}')
+            
+            lines.append("# HELP rag_llm_tokens_total LLM tokens used")
+            lines.append("# TYPE rag_llm_tokens_total counter")
+            for (system, kind), count in sorted(self._tokens.items()):
+                lines.append(f'rag_llm_tokens_total{{system="{system}",kind="{kind}"}} {count}')
+            
+            for name in sorted({name for name, _, _ in self._counters}):
+                lines.append(f"# TYPE rag_{name}_total counter")
+                for (counter, system, extra), count in sorted(self._counters.items()):
+                    if counter == name:
+                        labels = "".join(f',{key}="{value}"' for key, value in extra)
+                        lines.append(f'rag_{name}_total{{system="{system}"{labels}}} {count}')
+        return "\n".join(lines) + "\n"
+    
+    def get_status_lines(self, systems: List[str]) -> List[str]:
+        """Live end-to-end latency summary per system for the status panel"""
+        lines = ["⏱️ Latency (recent requests):"]
+        for system in systems:
+            count, p50, p95, p99 = self.percentiles("request", system)
+            with self._lock:
+                errors = self._errors.get(("request", system), 0)
+                tokens = {kind: self._tokens.get((system, kind), 0) for kind in ("prompt", "completion")}
+            lines.append(
+                f"   • {system}: p50 {p50:.2f}s / p95 {p95:.2f}s / p99 {p99:.2f}s over {count} requests, "
+                f"{errors} errors, {tokens['prompt']} prompt + {tokens['completion']} completion tokens"
+            )
+        return lines
+    
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 for every recorded (stage, system), keyed "stage/system" """
+        with self._lock:
+            keys = list(self._latency)
+        summary = {}
+        for stage, system in sorted(keys):
+            count, p50, p95, p99 = self.percentiles(stage, system)
+            summary[f"{stage}/{system}"] = {"count": count, "p50": p50, "p95": p95, "p99": p99}
+        return summary
+
+# Process-wide registry shared by every service
+metrics = MetricsRegistry()
\ No newline at end of file
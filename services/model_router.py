@@ -0,0 +1,171 @@
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+import logging
+
+from .llm import DEFAULT_MAX_TOKENS, DEFAULT_MODEL, DEFAULT_TEMPERATURE, complete, stream_completion
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Wording that marks a question as more than a quick lookup
+COMPLEX_CUES = re.compile(
+    r"\b(compare|comparison|versus|vs|explain|why|analy[sz]e|evaluate|pros and cons|trade-?offs?|"
+    r"difference|differences|step by step|plan|strategy|recommend|summari[sz]e)\b",
+    re.IGNORECASE
+)
+
+# Openings of answers that decline instead of answering
+REFUSAL_PATTERNS = re.compile(
+    r"^\s*(i'?m sorry|sorry|i (can ?not|can't|am unable|'m unable|do not|don't) (help|answer|find|have|provide|know))"
+    r"|\b(not enough information|no (relevant )?information (is )?(available|provided))\b",
+    re.IGNORECASE
+)
+
+_URL_PATTERN = re.compile(r"(?:https?|file)://")
+
+class ModelTier:
+    """One model in the cascade and the settings it is called with"""
+    
+    def __init__(self, name: str, model: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 temperature: float = DEFAULT_TEMPERATURE):
+        self.name = name
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+
+def parse_tiers(spec: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+                temperature: float = DEFAULT_TEMPERATURE) -> List[ModelTier]:
+    """Parse "fast:gpt-4o-mini,strong:gpt-4o" into tiers, fastest first"""
+    tiers = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, model = item.strip().partition(":")
+        tiers.append(ModelTier(name.strip(), (model or name).strip(), max_tokens, temperature))
+    return tiers
+
+class ModelRouter:
+    """Chooses the model for each answer and escalates along a cascade when a cheap check fails.
+
+    Tiers are ordered fastest first. Short, simple questions start on the
+    first tier; other questions start on the system's configured tier. With
+    the cascade enabled, an answer that refuses, cites no URL (web answers),
+    or is too short for a non-simple, non-personal question is regenerated on
+    the next tier up. Short factual answers to simple or personal questions
+    are fine as they are.
+    """
+    
+    def __init__(self, tiers: Optional[List[ModelTier]] = None, system_tiers: Optional[Dict[str, str]] = None,
+                 cascade: bool = False, simple_max_words: int = 12, min_answer_chars: int = 80):
+        """Configure the tiers (default: the single built-in model) and the cascade"""
+        self.tiers = tiers or [ModelTier("default", DEFAULT_MODEL)]
+        self.system_tiers = {
+            system: self._tier_index(name) for system, name in (system_tiers or {}).items()
+        }
+        self.cascade = cascade
+        self.simple_max_words = simple_max_words
+        self.min_answer_chars = min_answer_chars
+        self.stats = {tier.name: {"calls": 0, "seconds": 0.0, "escalations": 0} for tier in self.tiers}
+        self.answers = 0
+        self._lock = threading.Lock()
+    
+    def _tier_index(self, name: str) -> int:
+        for i, tier in enumerate(self.tiers):
+            if tier.name == name:
+                return i
+        logger.warning(f"Unknown model tier '{name}', using '{self.tiers[0].name}'")
+        return 0
+    
+    def is_simple(self, query: str) -> bool:
+        """Short questions without analysis or comparison wording"""
+        return len(query.split()) <= self.simple_max_words and not COMPLEX_CUES.search(query)
+    
+    def start_tier(self, query: str, system: str) -> int:
+        """Index of the first tier to try for a question"""
+        if self.is_simple(query):
+            return 0
+        return self.system_tiers.get(system, 0)
+    
+    def check_answer(self, answer: str, system: str, query: str = "") -> Optional[str]:
+        """Why an answer should be escalated, or None if it passes"""
+        if system != "personal" and not self.is_simple(query):
+            # Shorter than the question itself (or min_answer_chars, if less) is suspect
+            if len(answer.strip()) < min(self.min_answer_chars, len(query.strip())):
+                return "too short"
+        if REFUSAL_PATTERNS.search(answer[:300]):
+            return "refusal"
+        if system == "web" and not _URL_PATTERN.search(answer):
+            return "no citations"
+        return None
+    
+    def _next_tier(self, tier: int, answer: str, system: str, query: str) -> Optional[int]:
+        """The tier to escalate to, or None to keep the answer"""
+        if not self.cascade or tier + 1 >= len(self.tiers):
+            return None
+        reason = self.check_answer(answer, system, query)
+        if reason is None:
+            return None
+        logger.info(f"Escalating {system} answer from {self.tiers[tier].name} to {self.tiers[tier + 1].name} ({reason})")
+        with self._lock:
+            self.stats[self.tiers[tier].name]["escalations"] += 1
+        metrics.count("model_escalations", system)
+        return tier + 1
+    
+    def _record(self, tier: ModelTier, system: str, seconds: float):
+        with self._lock:
+            self.stats[tier.name]["calls"] += 1
+            self.stats[tier.name]["seconds"] += seconds
+        metrics.observe(f"llm_{tier.name}", system, seconds)
+    
+    def complete(self, client, prompt: str, query: str, system: str = "other") -> str:
+        """Answer a prompt, escalating along the cascade while the answer fails the check"""
+        tier = self.start_tier(query, system)
+        with self._lock:
+            self.answers += 1
+        while True:
+            settings = self.tiers[tier]
+            started = time.perf_counter()
+            answer = complete(client, prompt, system=system, model=settings.model,
+                              max_tokens=settings.max_tokens, temperature=settings.temperature)
+            self._record(settings, system, time.perf_counter() - started)
+            next_tier = self._next_tier(tier, answer or "", system, query)
+            if next_tier is None:
+                return answer
+            tier = next_tier
+    
+    def stream(self, client, prompt: str, query: str, system: str = "other") -> Iterator[str]:
+        """Stream the cumulative answer; an escalated answer restarts the text from scratch"""
+        tier = self.start_tier(query, system)
+        with self._lock:
+            self.answers += 1
+        while True:
+            settings = self.tiers[tier]
+            started = time.perf_counter()
+            answer = ""
+            for answer in stream_completion(client, prompt, system=system, model=settings.model,
+                                             max_tokens=settings.max_tokens, temperature=settings.temperature):
+                yield answer
+            self._record(settings, system, time.perf_counter() - started)
+            next_tier = self._next_tier(tier, answer, system, query)
+            if next_tier is None:
+                return
+            tier = next_tier
+    
+    def get_status_lines(self) -> List[str]:
+        """Calls, average latency and escalation rate per tier for the status panel"""
+        with self._lock:
+            stats = {name: dict(counts) for name, counts in self.stats.items()}
+            answers = self.answers
+        escalations = sum(counts["escalations"] for counts in stats.values())
+        rate = escalations / answers if answers else 0.0
+        lines = [f"🧠 Model Routing ({'cascade' if self.cascade else 'no cascade'}): {answers} answers, {rate:.0%} escalated"]
+        for tier in self.tiers:
+            counts = stats[tier.name]
+            average = counts["seconds"] / counts["calls"] if counts["calls"] else 0.0
+            lines.append(
+                f"   • {tier.name} ({tier.model}): {counts['calls']} calls, avg {average:.2f}s, "
+                f"{counts['escalations']} escalated"
+            )
+        return lines
\ No newline at end of file
@@ -0,0 +1,257 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+import logging
+
+from .personal_index import chunk_text
+from .context_packer import score_passages
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text is never part of the main content
+SKIPPED_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe", "template"}
+
+# Elements that end a paragraph
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "br", "h1", "h2", "h3", "h4", "h5", "h6",
+              "blockquote", "pre", "tr", "td", "th", "dd", "dt"}
+
+class _TextExtractor(HTMLParser):
+    """Collects visible paragraph text, separately for <article>/<main> and the whole page"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.main_depth = 0
+        self.paragraphs = []
+        self.main_paragraphs = []
+        self.current = []
+    
+    def _flush(self):
+        text = " ".join("".join(self.current).split())
+        self.current = []
+        if len(text) >= 30:  # Drop menu items, buttons and other fragments
+            self.paragraphs.append(text)
+            if self.main_depth:
+                self.main_paragraphs.append(text)
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        if tag in ("article", "main"):
+            self.main_depth += 1
+    
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        if tag in ("article", "main"):
+            self.main_depth = max(0, self.main_depth - 1)
+    
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.current.append(data)
+
+def extract_main_text(html: str) -> str:
+    """Extract the readable main text of an HTML page, preferring <article>/<main> content"""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:  # Malformed markup: keep whatever was parsed
+        logger.debug(f"HTML parsing stopped early: {e}")
+    parser._flush()
+    
+    main_text = "\n\n".join(parser.main_paragraphs)
+    return main_text if len(main_text) >= 500 else "\n\n".join(parser.paragraphs)
+
+def select_chunks(query: str, pages: Dict[str, str], max_chunks: int = 4,
+                  chunk_size: int = 800) -> List[Tuple[str, str]]:
+    """Pick the (url, chunk) pairs that best match the query by TF-IDF term overlap"""
+    chunks = [
+        (url, chunk)
+        for url, text in pages.items()
+        for chunk in chunk_text(text, chunk_size=chunk_size, overlap=0)
+    ]
+    scores = score_passages(query, [chunk for _, chunk in chunks])
+    ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+    return [chunks[i] for i in ranked[:max_chunks]]
+
+class PageCache:
+    """SQLite cache of extracted page text keyed by URL, revalidated with ETag / Last-Modified"""
+    
+    def __init__(self, path: str, ttl: float = 86400.0, max_entries: int = 2000, prune_every: int = 100):
+        """Open (or create) the page cache database"""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0}
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_cache ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "text TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """Return {text, etag, last_modified, is_fresh} for a URL, or None if not cached"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, etag, last_modified, fetched_at FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "text": row[0],
+            "etag": row[1],
+            "last_modified": row[2],
+            "is_fresh": time.time() - row[3] <= self.ttl,
+        }
+    
+    def set(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store (or refresh) the extracted text of a page"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_cache (url, etag, last_modified, text, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, text, time.time())
+            )
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                self._conn.execute(
+                    "DELETE FROM page_cache WHERE rowid IN ("
+                    "SELECT rowid FROM page_cache ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+    
+    def count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM page_cache").fetchone()[0]
+
+class PageFetcher:
+    """Fetches search result pages concurrently under hard per-page and total deadlines.
+
+    Pages still loading when the total deadline passes are left behind (they
+    finish in the background and land in the cache for next time), so one
+    slow site never holds up an answer.
+    """
+    
+    def __init__(self, cache: Optional[PageCache] = None, client=None, page_timeout: float = 3.0,
+                 total_timeout: float = 5.0, max_workers: int = 8, max_bytes: int = 2_000_000):
+        """Configure the fetcher (the pooled HTTP client is created on first use)"""
+        self.cache = cache
+        self.page_timeout = page_timeout
+        self.total_timeout = total_timeout
+        self.max_bytes = max_bytes
+        self.failures = 0
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="page-fetch")
+    
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                import httpx  # Installed with openai
+                
+                self._client = httpx.Client(
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                    timeout=self.page_timeout,
+                    follow_redirects=True,
+                    headers={"User-Agent": "Mozilla/5.0 (compatible; AIPersonalAssistant/1.0)"}
+                )
+            return self._client
+    
+    def fetch_pages(self, urls: List[str]) -> Dict[str, str]:
+        """Return {url: main text} for the pages that arrived within the total deadline"""
+        with metrics.timer("fetch_pages", "web"):
+            futures = {self._executor.submit(self.fetch_page, url): url for url in dict.fromkeys(urls)}
+            done, not_done = wait(futures, timeout=self.total_timeout)
+            if not_done:
+                logger.info(f"Deep search skipped {len(not_done)} slow pages")
+            
+            pages = {}
+            for future in done:
+                text = future.result()
+                if text:
+                    pages[futures[future]] = text
+            return pages
+    
+    def fetch_page(self, url: str) -> str:
+        """Fetch and extract one page, using the cache and conditional requests ("" on failure)"""
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached and cached["is_fresh"]:
+            self.cache.count("hits")
+            return cached["text"]
+        
+        headers = {}
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+        
+        try:
+            status, response_headers, body = self._download(url, headers)
+        except Exception as e:
+            self.failures += 1
+            metrics.count_error("fetch_page", "web")
+            logger.debug(f"Fetching {url} failed: {e}")
+            return cached["text"] if cached else ""
+        
+        if status == 304 and cached:
+            self.cache.count("revalidated")
+            self.cache.set(url, cached["text"], cached["etag"], cached["last_modified"])
+            return cached["text"]
+        if status != 200 or body is None:
+            self.failures += 1
+            return cached["text"] if cached else ""
+        
+        text = extract_main_text(body)
+        if self.cache is not None:
+            self.cache.count("misses")
+            if text:
+                self.cache.set(url, text, response_headers.get("etag"), response_headers.get("last-modified"))
+        return text
+    
+    def _download(self, url: str, headers: Dict[str, str]) -> Tuple[int, Mapping[str, str], Optional[str]]:
+        """Stream a page under a hard deadline, returning (status, headers, html or None)"""
+        deadline = time.monotonic() + self.page_timeout
+        with self._get_client().stream("GET", url, headers=headers) as response:
+            content_type = response.headers.get("content-type", "")
+            if response.status_code != 200 or "html" not in content_type:
+                return response.status_code, response.headers, None
+            
+            body = bytearray()
+            for block in response.iter_bytes():
+                body.extend(block)
+                if len(body) >= self.max_bytes or time.monotonic() > deadline:
+                    break  # Keep what arrived in time
+            encoding = response.encoding or "utf-8"
+            return response.status_code, response.headers, body.decode(encoding, errors="ignore")
+    
+    def get_status_lines(self) -> List[str]:
+        """Page cache counters for the status panel"""
+        if self.cache is None:
+            return [f"📄 Deep Search: page cache disabled, {self.failures} fetch failures"]
+        counts = dict(self.cache.counters)
+        return [
+            f"📄 Deep Search: {len(self.cache)} cached pages, {counts['hits']} hits / "
+            f"{counts['revalidated']} revalidated / {counts['misses']} fetched, {self.failures} fetch failures"
+        ]
\ No newline at end of file
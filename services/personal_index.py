@@ -0,0 +1,479 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+from .vector_store import MappedVectors, write_vectors
+from .vector_index import VectorIndex, numpy_available
+from .embedding_cache import EmbeddingCache
+from .bm25 import BM25Index
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Document types the index can read
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".pdf")
+
+SNAPSHOT_VERSION = 2
+
+# "vector" ranks by cosine similarity, "lexical" by BM25, "hybrid" fuses both
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+def read_document(path: Path) -> str:
+    """Read the text of a personal document"""
+    if path.suffix.lower() == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            logger.warning(f"Skipping {path.name}: install pypdf to index PDF files")
+            return ""
+        return "\n".join(page.extract_text() or "" for page in PdfReader(str(path)).pages)
+    return path.read_text(encoding="utf-8", errors="ignore")
+
+def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> List[str]:
+    """Split text into overlapping chunks, preferring paragraph boundaries"""
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    chunks = []
+    current = ""
+    for paragraph in paragraphs:
+        while len(paragraph) > chunk_size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:chunk_size])
+            paragraph = paragraph[chunk_size - overlap:]
+        if current and len(current) + len(paragraph) + 2 > chunk_size:
+            chunks.append(current)
+            current = current[-overlap:] + "\n\n" + paragraph if overlap else paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class DocumentManifest:
+    """Record of indexed files (mtime, size, sha256) used to detect changes"""
+    
+    def __init__(self, entries: Optional[Dict[str, Dict]] = None):
+        self.entries = entries or {}
+    
+    @classmethod
+    def scan(cls, folder: Path, previous: Optional["DocumentManifest"] = None) -> "DocumentManifest":
+        """Scan a folder, reusing previous hashes for files whose mtime and size are unchanged"""
+        previous_entries = previous.entries if previous else {}
+        entries = {}
+        for path in sorted(folder.rglob("*")):
+            if not path.is_file() or path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            relative = path.relative_to(folder).as_posix()
+            stat = path.stat()
+            known = previous_entries.get(relative)
+            if known and known["mtime"] == stat.st_mtime and known["size"] == stat.st_size:
+                entries[relative] = dict(known)
+            else:
+                entries[relative] = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": _file_hash(path)}
+        return cls(entries)
+    
+    def diff(self, other: "DocumentManifest") -> Dict[str, List[str]]:
+        """Files added, changed or removed going from this manifest to another"""
+        added = [p for p in other.entries if p not in self.entries]
+        removed = [p for p in self.entries if p not in other.entries]
+        changed = [
+            p for p in other.entries
+            if p in self.entries and self.entries[p]["sha256"] != other.entries[p]["sha256"]
+        ]
+        return {"added": added, "changed": changed, "removed": removed}
+
+class PersonalIndex:
+    """Persisted, incrementally updated chunk + embedding index over personal documents.
+
+    A snapshot of every file's chunks is stored next to the manifest, with the
+    embeddings in a flat float32 file, so a restart only re-chunks and
+    re-embeds files whose content actually changed. A read-only index (one
+    per worker process) memory-maps the embeddings of an existing snapshot
+    instead of loading or rebuilding them. With numpy installed, searches run
+    as one vectorized matrix product (optionally over int8-quantized rows).
+    
+    A BM25 inverted index over the same chunks is kept up to date file by
+    file. In lexical and hybrid modes a query whose terms all occur in no
+    more than k chunks (exact names, employers, places) is answered from
+    those chunks without embedding it; otherwise hybrid mode fuses the BM25
+    and vector rankings with reciprocal rank fusion.
+    
+    start_auto_refresh() re-runs refresh() periodically, so documents added,
+    changed or removed while the app runs are picked up (and read-only
+    workers remap each new snapshot). Changed files are embedded outside the
+    search lock, so searches keep being served during a refresh.
+    """
+    
+    def __init__(self, documents_folder: str, index_dir: str, embed_fn: EmbedFn,
+                 embedding_model: str = "text-embedding-3-small", chunk_size: int = 800,
+                 chunk_overlap: int = 100, read_only: bool = False, quantize: bool = False,
+                 query_cache: Optional[EmbeddingCache] = None, retrieval_mode: str = "vector",
+                 exact_match: bool = True, rrf_k: int = 60):
+        """Initialize the index (call refresh() to load it)"""
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{retrieval_mode}' (expected one of {', '.join(RETRIEVAL_MODES)})")
+        self.documents_folder = Path(documents_folder)
+        self.snapshot_path = Path(index_dir) / "snapshot.json"
+        self.embed_fn = embed_fn
+        self.embedding_model = embedding_model
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.read_only = read_only
+        self.quantize = quantize
+        self.query_cache = query_cache
+        self.retrieval_mode = retrieval_mode
+        self.exact_match = exact_match
+        self.rrf_k = rrf_k
+        self.lexical = BM25Index()
+        self.retrievals = {"exact": 0, "hybrid": 0, "vector": 0, "lexical": 0}
+        self.manifest = DocumentManifest()
+        self.files = {}
+        self.last_refresh = {}
+        self._vectors = None
+        self._matrix = None
+        self._rows = []
+        self._snapshot_mtime = None
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._stop_refresh = threading.Event()
+        self._refresher = None
+    
+    def _read_snapshot(self) -> Optional[Dict]:
+        """Parse the persisted snapshot if it exists and matches the current settings"""
+        if not self.snapshot_path.exists():
+            return None
+        try:
+            snapshot = json.loads(self.snapshot_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable personal index snapshot: {e}")
+            return None
+        settings = (SNAPSHOT_VERSION, self.embedding_model, self.chunk_size, self.chunk_overlap)
+        stored = (snapshot.get("version"), snapshot.get("embedding_model"),
+                  snapshot.get("chunk_size"), snapshot.get("chunk_overlap"))
+        if stored != settings:
+            logger.info("Personal index settings changed, rebuilding from scratch")
+            return None
+        return snapshot
+    
+    def _load_snapshot(self):
+        """Load the persisted snapshot (chunks and embeddings) into memory"""
+        snapshot = self._read_snapshot()
+        if snapshot is None:
+            return
+        try:
+            vectors = MappedVectors(self.snapshot_path.parent / snapshot["vectors"])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring personal index snapshot with unreadable vectors: {e}")
+            return
+        
+        row = 0
+        self.files = {}
+        for relative, texts in snapshot["files"].items():
+            self.files[relative] = [
+                {"text": text, "embedding": list(vectors.row(row + i))} for i, text in enumerate(texts)
+            ]
+            row += len(texts)
+        vectors.close()
+        self.manifest = DocumentManifest(snapshot["manifest"])
+        self._update_lexical({"added": list(self.files), "changed": [], "removed": []}, {})
+    
+    def _map_snapshot(self) -> bool:
+        """Memory-map the current snapshot (read-only mode); returns True if a new one was loaded"""
+        try:
+            mtime = self.snapshot_path.stat().st_mtime_ns
+        except OSError:
+            raise FileNotFoundError(f"No personal index snapshot at {self.snapshot_path}; build it first")
+        if mtime == self._snapshot_mtime:
+            return False
+        
+        snapshot = self._read_snapshot()
+        if snapshot is None:
+            raise ValueError(f"Personal index snapshot at {self.snapshot_path} is unusable; rebuild it")
+        vectors = MappedVectors(self.snapshot_path.parent / snapshot["vectors"])
+        
+        # Chunk texts stay in process memory; only the embeddings are mapped
+        previous_counts = {relative: len(chunks) for relative, chunks in self.files.items()}
+        self.files = {relative: [{"text": text} for text in texts] for relative, texts in snapshot["files"].items()}
+        self._rows = self._chunk_rows()
+        self._vectors = vectors  # The previous mapping is released once no search holds it
+        self._matrix = VectorIndex.from_mapped(vectors, self.quantize) if numpy_available() else None
+        manifest = DocumentManifest(snapshot["manifest"])
+        self._update_lexical(self.manifest.diff(manifest), previous_counts)
+        self.manifest = manifest
+        self._snapshot_mtime = mtime
+        return True
+    
+    def _save_snapshot(self):
+        """Atomically persist the manifest and chunks, with the embeddings in a new vector file"""
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        vectors_name = f"vectors-{time.time_ns():x}.f32"
+        write_vectors(
+            self.snapshot_path.parent / vectors_name,
+            [chunk["embedding"] for chunks in self.files.values() for chunk in chunks]
+        )
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "embedding_model": self.embedding_model,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "manifest": self.manifest.entries,
+            "files": {relative: [chunk["text"] for chunk in chunks] for relative, chunks in self.files.items()},
+            "vectors": vectors_name,
+        }
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(snapshot))
+        os.replace(tmp_path, self.snapshot_path)
+        
+        # Workers still mapping an old file keep it alive until they reload
+        for old_path in self.snapshot_path.parent.glob("vectors-*.f32"):
+            if old_path.name != vectors_name:
+                try:
+                    old_path.unlink()
+                except OSError as e:  # Still mapped on platforms that lock mapped files
+                    logger.debug(f"Keeping old vector file {old_path.name}: {e}")
+    
+    def _index_file(self, relative: str) -> List[Dict]:
+        """Chunk and embed one document"""
+        chunks = chunk_text(
+            read_document(self.documents_folder / relative),
+            chunk_size=self.chunk_size,
+            overlap=self.chunk_overlap
+        )
+        embeddings = []
+        for start in range(0, len(chunks), 64):
+            embeddings.extend(self.embed_fn(chunks[start:start + 64]))
+        return [{"text": text, "embedding": embedding} for text, embedding in zip(chunks, embeddings)]
+    
+    def refresh(self) -> Dict[str, List[str]]:
+        """Bring the index up to date with the documents folder, embedding only what changed"""
+        with self._refresh_lock:
+            started = time.monotonic()
+            if self.read_only:
+                with self._lock:
+                    changed = self._map_snapshot()
+                if changed:
+                    self.last_refresh = {"added": [], "changed": [], "removed": [],
+                                         "seconds": round(time.monotonic() - started, 3)}
+                    logger.info(f"Personal index mapped read-only: {len(self.files)} files, {self.chunk_count()} chunks")
+                return {"added": [], "changed": [], "removed": []}
+            
+            first_refresh = not self.last_refresh
+            if not self.files:
+                with self._lock:
+                    self._load_snapshot()
+            if not self.documents_folder.is_dir():
+                raise FileNotFoundError(f"Personal documents folder not found: {self.documents_folder}")
+            
+            current = DocumentManifest.scan(self.documents_folder, previous=self.manifest)
+            changes = self.manifest.diff(current)
+            
+            # Embed outside the search lock; only this (serialized) refresh mutates the index
+            indexed = {relative: self._index_file(relative) for relative in changes["added"] + changes["changed"]}
+            
+            with self._lock:
+                previous_counts = {relative: len(chunks) for relative, chunks in self.files.items()}
+                for relative in changes["removed"]:
+                    self.files.pop(relative, None)
+                self.files.update(indexed)
+                self._update_lexical(changes, previous_counts)
+                manifest_changed = current.entries != self.manifest.entries
+                self.manifest = current
+                if any(changes.values()) or len(self._rows) != self.chunk_count():
+                    self._build_matrix()
+            
+            if manifest_changed or not self.snapshot_path.exists():
+                self._save_snapshot()
+            
+            # Periodic refreshes that find nothing new keep the last real refresh on display
+            if first_refresh or any(changes.values()):
+                self.last_refresh = dict(changes, seconds=round(time.monotonic() - started, 3))
+                logger.info(
+                    f"Personal index ready: {len(self.files)} files, {self.chunk_count()} chunks "
+                    f"({len(changes['added'])} added, {len(changes['changed'])} changed, "
+                    f"{len(changes['removed'])} removed) in {self.last_refresh['seconds']:.2f}s"
+                )
+            return changes
+    
+    def start_auto_refresh(self, interval: float):
+        """Call refresh() every interval seconds in a daemon thread (no-op if interval <= 0 or already running)"""
+        with self._lock:
+            if interval <= 0 or self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._auto_refresh, args=(interval,),
+                                               name="personal-index-refresh", daemon=True)
+        self._refresher.start()
+    
+    def _auto_refresh(self, interval: float):
+        while not self._stop_refresh.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Personal index refresh failed: {e}")
+    
+    def stop_auto_refresh(self):
+        """Stop the periodic refresh"""
+        self._stop_refresh.set()
+    
+    def _chunk_rows(self) -> List[Tuple[str, int, str]]:
+        """(file, position, text) of every chunk, in embedding row order"""
+        return [
+            (relative, position, chunk["text"])
+            for relative, chunks in self.files.items() for position, chunk in enumerate(chunks)
+        ]
+    
+    def _update_lexical(self, changes: Dict[str, List[str]], previous_counts: Dict[str, int]):
+        """Re-tokenize only the chunks of files that were added, changed or removed"""
+        for relative in changes["removed"] + changes["changed"]:
+            for position in range(previous_counts.get(relative, 0)):
+                self.lexical.remove((relative, position))
+        for relative in changes["added"] + changes["changed"]:
+            for position, chunk in enumerate(self.files.get(relative, [])):
+                self.lexical.add((relative, position), chunk["text"])
+    
+    def _build_matrix(self):
+        """Pack the in-memory embeddings into one contiguous array for vectorized search"""
+        self._rows = self._chunk_rows()
+        if not numpy_available():
+            return
+        self._matrix = VectorIndex.from_vectors(
+            [chunk["embedding"] for chunks in self.files.values() for chunk in chunks], quantize=self.quantize
+        )
+    
+    def chunk_count(self) -> int:
+        """Number of indexed chunks"""
+        return sum(len(chunks) for chunks in self.files.values())
+    
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query, through the shared query-embedding cache when one is set"""
+        if self.query_cache is None:
+            return self.embed_fn([query])[0]
+        return self.query_cache.get_or_embed(query, self.embedding_model, lambda: self.embed_fn([query])[0])
+    
+    def _vector_top(self, query_embedding: List[float], n: int) -> List[Tuple[Tuple[str, int, str], float]]:
+        """Top-n (row, cosine score) pairs"""
+        with self._lock:
+            matrix, vectors, rows = self._matrix, self._vectors, self._rows
+        if matrix is not None:
+            return [(rows[i], score) for i, score in matrix.top_k(query_embedding, n)]
+        if self.read_only:
+            scores = vectors.cosine_scores(query_embedding)
+            top = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:n]
+            return [(rows[i], scores[i]) for i in top]
+        
+        query_norm = math.sqrt(sum(v * v for v in query_embedding)) or 1.0
+        
+        with self._lock:
+            scored = []
+            for relative, chunks in self.files.items():
+                for position, chunk in enumerate(chunks):
+                    embedding = chunk["embedding"]
+                    norm = math.sqrt(sum(v * v for v in embedding)) or 1.0
+                    score = sum(a * b for a, b in zip(query_embedding, embedding)) / (norm * query_norm)
+                    scored.append(((relative, position, chunk["text"]), score))
+        
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:n]
+    
+    def _lexical_chunk(self, doc_id: Tuple[str, int], score: float, match: str) -> Dict:
+        relative, position = doc_id
+        return {"text": self.files[relative][position]["text"], "file": relative, "score": score, "match": match}
+    
+    def _exact_matches(self, query: str, k: int) -> List[Dict]:
+        """Chunks containing every query term, when no more than k do (BM25 order)"""
+        docs = self.lexical.containing_all(query)
+        if not docs or len(docs) > k:
+            return []
+        with self._lock:
+            return [self._lexical_chunk(doc_id, 1.0, "exact") for doc_id, _ in self.lexical.search(query, k, within=docs)]
+    
+    def _count(self, kind: str):
+        with self._lock:
+            self.retrievals[kind] += 1
+        metrics.count(f"retrieval_{kind}", "personal_index")
+    
+    def search(self, query: str, k: int = 4) -> List[Dict]:
+        """Return the top-k chunks as {text, file, score, match} dicts.
+
+        score is the cosine similarity for vector matches; lexical matches
+        score the fraction of query terms they contain (1.0 for exact matches).
+        """
+        if self.retrieval_mode != "vector" and self.exact_match:
+            exact = self._exact_matches(query, k)
+            if exact:
+                self._count("exact")
+                return exact
+        
+        if self.retrieval_mode == "lexical":
+            self._count("lexical")
+            with self._lock:
+                return [
+                    self._lexical_chunk(doc_id, self.lexical.coverage(query, doc_id), "lexical")
+                    for doc_id, _ in self.lexical.search(query, k)
+                ]
+        
+        query_embedding = self.embed_query(query)
+        if self.retrieval_mode == "vector":
+            self._count("vector")
+            return [
+                {"text": row[2], "file": row[0], "score": score, "match": "vector"}
+                for row, score in self._vector_top(query_embedding, k)
+            ]
+        
+        # Reciprocal rank fusion over deeper candidate lists from both rankings
+        self._count("hybrid")
+        depth = max(k * 5, 20)
+        fused, chunks = {}, {}
+        for rank, (row, score) in enumerate(self._vector_top(query_embedding, depth)):
+            key = (row[0], row[1])
+            fused[key] = 1.0 / (self.rrf_k + rank + 1)
+            chunks[key] = {"text": row[2], "file": row[0], "score": score, "match": "vector"}
+        with self._lock:
+            for rank, (key, _) in enumerate(self.lexical.search(query, depth)):
+                fused[key] = fused.get(key, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+                coverage = self.lexical.coverage(query, key)
+                if key in chunks:
+                    chunks[key].update(score=max(chunks[key]["score"], coverage), match="hybrid")
+                else:
+                    chunks[key] = self._lexical_chunk(key, coverage, "lexical")
+        top = sorted((key for key in fused if key in chunks), key=fused.__getitem__, reverse=True)[:k]
+        return [chunks[key] for key in top]
+    
+    def get_status_line(self) -> str:
+        """Retrieval mode and how often each path answered, for the status panel"""
+        with self._lock:
+            counts = dict(self.retrievals)
+        used = ", ".join(f"{counts[kind]} {kind}" for kind in ("exact", "hybrid", "vector", "lexical") if counts[kind])
+        return f"🔎 Personal Retrieval ({self.retrieval_mode}, {len(self.lexical)} chunks in BM25): {used or 'no searches yet'}"
+
+_shared_indexes = {}
+_shared_lock = threading.Lock()
+
+def get_shared_index(documents_folder: str, index_dir: str, embed_fn: EmbedFn, **kwargs) -> PersonalIndex:
+    """Return the process-wide index for a documents folder, loading it on first use"""
+    key = str(Path(documents_folder).resolve())
+    with _shared_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = PersonalIndex(documents_folder, index_dir, embed_fn, **kwargs)
+            _shared_indexes[key] = index
+    # Refresh outside the registry lock; the index's own lock makes concurrent
+    # callers wait for the first load instead of embedding twice
+    if not index.manifest.entries:
+        index.refresh()
+    return index
\ No newline at end of file
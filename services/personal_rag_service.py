@@ -1,15 +1,34 @@
 import sys
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 
+from .personal_index import PersonalIndex
+from .context_packer import ContextPacker
+from .model_router import ModelRouter
+from .metrics import metrics
+from .sources import Sources, personal_sources
+
 logger = logging.getLogger(__name__)
 
 class PersonalRAGService:
     """Service wrapper for Personal RAG System"""
     
-    def __init__(self, documents_folder: str = "../personal-rag-system/me"):
-        """Initialize Personal RAG Service"""
+    def __init__(self, documents_folder: str = "../personal-rag-system/me",
+                 index: Optional[PersonalIndex] = None, client=None, top_k: int = 4,
+                 packer: Optional[ContextPacker] = None, models: Optional[ModelRouter] = None):
+        """Initialize Personal RAG Service (over a shared PersonalIndex when one is given)"""
+        self.index = index
+        self.client = client
+        self.top_k = top_k
+        self.packer = packer
+        self.models = models if models is not None else ModelRouter()
+        self.rag_system = None
+        
+        if index is not None:
+            logger.info(f"Personal RAG Service using shared index ({index.chunk_count()} chunks)")
+            return
+        
         try:
             # Add the personal-rag-system directory to Python path
             current_dir = Path(__file__).parent.parent
@@ -33,30 +52,85 @@ class PersonalRAGService:
             logger.error(f"Failed to initialize Personal RAG Service: {e}")
             raise
     
+    def _retrieve(self, query: str) -> List[Dict]:
+        """Retrieve the top-k chunks from the shared index"""
+        with metrics.timer("retrieval", "personal"):
+            return self.index.search(query, self.top_k)
+    
+    def _build_prompt(self, query: str, chunks: List[Dict]) -> str:
+        """Build the answer prompt from retrieved personal document chunks, packed into the token budget"""
+        passages = [f"[{chunk['file']}]\n{chunk['text']}" for chunk in chunks]
+        if self.packer is not None:
+            passages, _ = self.packer.pack(
+                query, passages, system="personal", overhead=self._render_prompt(query, "")
+            )
+        return self._render_prompt(query, "\n---\n".join(passages))
+    
+    def _render_prompt(self, query: str, context: str) -> str:
+        return f"""You are a personal assistant. Based on the personal documents below, answer the user's question about themselves. If the documents do not contain the answer, say so.
+
+Personal Documents:
+{context}
+
+Question: {query}
+
+Answer:"""
+    
+    def _format_index_sources(self, chunks: List[Dict]) -> Sources:
+        """Sources for the files behind retrieved chunks, best match first"""
+        return personal_sources([chunk["file"] for chunk in chunks])
+    
     def query(self, query: str) -> Tuple[str, str]:
         """Query the personal RAG system"""
+        if self.index is not None:
+            try:
+                chunks = self._retrieve(query)
+                with metrics.timer("format", "personal"):
+                    prompt = self._build_prompt(query, chunks)
+                    sources = self._format_index_sources(chunks)
+                answer = self.models.complete(self.client, prompt, query, system="personal")
+                return answer, sources
+            except Exception as e:
+                logger.error(f"Personal RAG query failed: {e}")
+                return f"Error with Personal RAG: {str(e)}", "❌ Error"
+        
         try:
-            result = self.rag_system.query_personal_info(query)
+            with metrics.timer("retrieval", "personal"):
+                result = self.rag_system.query_personal_info(query)
             
             # Extract answer and sources
             answer = result.get("answer", "No answer generated")
             sources = result.get("sources", [])
             files = result.get("files", [])
             
-            # Format sources
-            if sources and files:
-                source_info = f"📚 Personal Documents: {', '.join(sources)} from {', '.join(set(files))}"
-            elif sources:
-                source_info = f"📚 Personal Documents: {', '.join(sources)}"
-            else:
-                source_info = "📚 Personal Documents"
-            
-            return answer, source_info
+            return answer, personal_sources(files, sections=sources)
             
         except Exception as e:
             logger.error(f"Personal RAG query failed: {e}")
             return f"Error with Personal RAG: {str(e)}", "❌ Error"
     
+    def query_stream(self, query: str) -> Iterator[Tuple[str, str]]:
+        """Stream the personal RAG answer (the external system only returns complete answers)"""
+        if self.index is None:
+            yield self.query(query)
+            return
+        
+        try:
+            chunks = self._retrieve(query)
+            with metrics.timer("format", "personal"):
+                prompt = self._build_prompt(query, chunks)
+                sources = self._format_index_sources(chunks)
+            answer = ""
+            for answer in self.models.stream(self.client, prompt, query, system="personal"):
+                yield answer, sources
+            
+            if not answer:
+                yield "No answer generated", sources
+                
+        except Exception as e:
+            logger.error(f"Personal RAG streaming query failed: {e}")
+            yield f"Error with Personal RAG: {str(e)}", "❌ Error"
+    
     def is_available(self) -> bool:
         """Check if the service is available"""
-        return hasattr(self, 'rag_system') and self.rag_system is not None
\ No newline at end of file
+        return self.index is not None or self.rag_system is not None
\ No newline at end of file
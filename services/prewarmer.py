@@ -0,0 +1,149 @@
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+from .result_cache import ResultCache, normalize_query
+from .scheduler import PRIORITY_BACKGROUND, Scheduler
+
+logger = logging.getLogger(__name__)
+
+# Sources prefixes of answers that did not warm anything
+FAILURE_SOURCES = ("❌", "⚠️", "⏳", "🚦")
+
+QueryFn = Callable[[str, int], Tuple[str, str]]
+
+class CachePrewarmer:
+    """Replays example and popular logged questions through each system after startup.
+
+    Answers land in the result cache, and the runs fill the search, page and
+    query-embedding caches on the way. One background thread sends at most
+    `rate` questions per second at background priority, and only when a
+    system has a free slot and no queue, so users never wait behind it.
+    Questions already in the result cache are skipped.
+    """
+    
+    def __init__(self, query_fns: Dict[str, QueryFn], scheduler: Scheduler, cache: Optional[ResultCache],
+                 questions: Dict[str, List[str]], rate: float = 0.5, idle_timeout: float = 60.0,
+                 lock_path: Optional[str] = None):
+        """Plan the questions per system (round-robin across systems, duplicates dropped)"""
+        self.query_fns = query_fns
+        self.scheduler = scheduler
+        self.cache = cache
+        self.rate = rate
+        self.idle_timeout = idle_timeout
+        self.lock_path = Path(lock_path) if lock_path else None
+        self.plan = self._plan(questions)
+        self.counters = {"warmed": 0, "cached": 0, "deferred": 0, "failed": 0}
+        self.state = "idle"
+        self.seconds = 0.0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._thread = None
+    
+    def _plan(self, questions: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+        plan, seen = [], set()
+        queues = {system: list(items) for system, items in questions.items() if system in self.query_fns}
+        while any(queues.values()):
+            for system, items in queues.items():
+                if not items:
+                    continue
+                query = items.pop(0)
+                key = (system, normalize_query(query))
+                if key not in seen:
+                    seen.add(key)
+                    plan.append((system, query))
+        return plan
+    
+    def start(self):
+        """Start warming in a daemon thread"""
+        if self._thread is not None or not self.plan:
+            return
+        self._thread = threading.Thread(target=self._run, name="cache-prewarm", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop after the question in flight"""
+        self._stop.set()
+    
+    def _claim(self) -> bool:
+        """Take the cross-process lock so only one API worker pre-warms the shared caches"""
+        if self.lock_path is None:
+            return True
+        try:
+            import fcntl
+        except ImportError:  # No flock on Windows; every process warms
+            return True
+        try:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            self._lock_file = open(self.lock_path, "w")
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            return False
+    
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+    
+    def _wait_idle(self, system: str) -> bool:
+        """Wait for a free slot with nobody queued; False if the system stays busy"""
+        deadline = time.monotonic() + self.idle_timeout
+        while not self.scheduler.idle(system):
+            if time.monotonic() >= deadline or self._stop.wait(0.25):
+                return False
+        return True
+    
+    def _run(self):
+        if not self._claim():
+            self.state = "skipped"
+            logger.info("Another process is pre-warming the caches; skipping")
+            return
+        
+        self.state = "running"
+        started = time.monotonic()
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        logger.info(f"Pre-warming caches with {len(self.plan)} questions")
+        try:
+            for system, query in self.plan:
+                if self._stop.is_set():
+                    break
+                if self.cache is not None and self.cache.get(system, query, count=False):
+                    self._count("cached")
+                    continue
+                if not self._wait_idle(system):
+                    self._count("deferred")
+                    continue
+                
+                sent = time.monotonic()
+                try:
+                    _, sources = self.query_fns[system](query, PRIORITY_BACKGROUND)
+                    self._count("failed" if str(sources).startswith(FAILURE_SOURCES) else "warmed")
+                except Exception as e:
+                    logger.warning(f"Pre-warming {system} with '{query}' failed: {e}")
+                    self._count("failed")
+                self._stop.wait(max(0.0, interval - (time.monotonic() - sent)))
+        finally:
+            self.seconds = time.monotonic() - started
+            self.state = "stopped" if self._stop.is_set() else "done"
+            if self._lock_file is not None:
+                self._lock_file.close()
+            logger.info(f"Cache pre-warm {self.state} in {self.seconds:.1f}s: {self.counters}")
+    
+    def get_status_lines(self) -> List[str]:
+        """Progress for the status panel"""
+        with self._lock:
+            counts = dict(self.counters)
+        done = sum(counts.values())
+        line = (
+            f"🔥 Cache Pre-warm ({self.state}): {done}/{len(self.plan)} questions, {counts['warmed']} warmed, "
+            f"{counts['cached']} already cached, {counts['deferred']} deferred (busy), {counts['failed']} failed"
+        )
+        if self.state in ("done", "stopped"):
+            line += f" in {self.seconds:.1f}s"
+        return [line]
\ No newline at end of file
@@ -0,0 +1,111 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+import logging
+
+from .result_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+class QueryLog:
+    """Append-only JSONL log of user questions, mined for the most frequent recent ones.
+
+    Each line is {"ts", "system", "query"}. record() only enqueues; a
+    background writer appends in batches, so request threads never touch the
+    file. Once the file passes max_bytes the writer rewrites it with its
+    newest half, so it never grows without bound.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 5_000_000, max_pending: int = 10_000):
+        """Initialize the log (the file is created on the first write)"""
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+    
+    def record(self, system: str, query: str):
+        """Queue one question for the writer (dropped, never blocking, when the queue is full)"""
+        self._start_writer()
+        try:
+            self._pending.put_nowait({"ts": round(time.time(), 3), "system": system, "query": query})
+        except queue.Full:
+            self.dropped += 1
+    
+    def _start_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="query-log", daemon=True)
+                self._writer.start()
+    
+    def _write_loop(self):
+        while True:
+            entries = [self._pending.get()]
+            while True:
+                try:
+                    entries.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._append(entries)
+            except OSError as e:
+                logger.warning(f"Query log write failed: {e}")
+            finally:
+                for _ in entries:
+                    self._pending.task_done()
+    
+    def _append(self, entries: List[dict]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            size = f.tell()
+        if size > self.max_bytes:
+            self._truncate()
+    
+    def _truncate(self):
+        """Keep the newest half of the log"""
+        lines = self.path.read_text(encoding="utf-8").splitlines(keepends=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text("".join(lines[len(lines) // 2:]), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued question is written; False if the timeout passed first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def top_queries(self, system: str, n: int, window: float = 7 * 86400.0) -> List[str]:
+        """The n most frequent questions asked of a system within the window, most frequent first"""
+        if n <= 0 or not self.path.exists():
+            return []
+        since = time.time() - window
+        counts = Counter()
+        latest = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by a concurrent truncation
+                    if entry.get("system") != system or entry.get("ts", 0) < since:
+                        continue
+                    key = normalize_query(entry["query"])
+                    counts[key] += 1
+                    latest[key] = entry["query"]
+        except OSError as e:
+            logger.warning(f"Query log read failed: {e}")
+            return []
+        return [latest[key] for key, _ in counts.most_common(n)]
\ No newline at end of file
@@ -0,0 +1,107 @@
+import re
+import threading
+from typing import Dict, List, Tuple
+import logging
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Words that point at the user's own documents (bare pronouns are not cues: "How do I cook pasta?")
+PERSONAL_CUES = (
+    "about me", "about myself", "background", "resume", "cv", "experience", "education", "skills", "hobbies",
+    "projects", "goals", "career", "portfolio", "strengths", "achievements",
+)
+
+# Words that point at current or public information
+WEB_CUES = (
+    "latest", "news", "today", "current", "currently", "recent", "recently", "now", "this week",
+    "this year", "trend", "trends", "price", "stock", "weather", "release", "released",
+    "announced", "who is", "ceo", "president", "market", "job market", "update", "updates",
+)
+
+_YEAR_PATTERN = re.compile(r"\b20\d\d\b")
+
+# First-person words: not a cue on their own, but they turn a web cue into "both" ("What is my current job?")
+_FIRST_PERSON_PATTERN = re.compile(r"\b(i|me|my|mine|myself)\b", re.IGNORECASE)
+
+ROUTES = ("local", "web", "both", "auto")
+
+def _cue_pattern(cues: Tuple[str, ...]) -> re.Pattern:
+    return re.compile(r"\b(" + "|".join(re.escape(cue) for cue in cues) + r")\b", re.IGNORECASE)
+
+class QueryRouter:
+    """Keyword pre-router deciding whether a hybrid query needs personal documents, the web or both.
+
+    classify() runs before any network call. Queries with no clear cue are
+    routed "auto" and settled by needs_web() from the local retrieval scores.
+    Personal cues only lower that bar: a "local" query still searches the web
+    when its local context is both short and a weak match. A route only adds
+    the web; personal documents are retrieved for every route.
+    """
+    
+    def __init__(self, confident_score: float = 0.45):
+        """Configure the retrieval score above which "auto" queries stay local"""
+        self.confident_score = confident_score
+        self.counters = {route: 0 for route in ROUTES}
+        self.counters.update({"web_searches": 0, "web_searches_avoided": 0, "web_searches_added": 0})
+        self._personal = _cue_pattern(PERSONAL_CUES)
+        self._web = _cue_pattern(WEB_CUES)
+        self._lock = threading.Lock()
+    
+    def classify(self, query: str) -> Tuple[str, str]:
+        """Return (route, reason) from query keywords alone"""
+        personal = self._personal.findall(query)
+        web = self._web.findall(query) + _YEAR_PATTERN.findall(query)
+        if personal and web:
+            return "both", f"personal cue '{personal[0].lower()}' and web cue '{web[0].lower()}'"
+        first_person = _FIRST_PERSON_PATTERN.findall(query)
+        if first_person and web:
+            return "both", f"first-person '{first_person[0].lower()}' and web cue '{web[0].lower()}'"
+        if personal:
+            return "local", f"personal cue '{personal[0].lower()}'"
+        if web:
+            return "web", f"web cue '{web[0].lower()}'"
+        return "auto", "no keyword cue"
+    
+    def needs_web(self, route: str, chunks: List[Dict], local_context_length: int,
+                  min_context_length: int) -> Tuple[bool, str]:
+        """Decide whether to search the web once local retrieval is known"""
+        if route in ("web", "both"):
+            return True, f"routed {route}"
+        
+        top_score = max((chunk["score"] for chunk in chunks), default=0.0)
+        enough_context = local_context_length >= min_context_length
+        if route == "local":
+            if enough_context or (local_context_length and top_score >= self.confident_score):
+                return False, f"routed local ({top_score:.2f})"
+            return True, f"routed local, weak personal context ({top_score:.2f})"
+        
+        if top_score >= self.confident_score and enough_context:
+            return False, f"confident local match ({top_score:.2f})"
+        return True, f"weak local match ({top_score:.2f})"
+    
+    def record(self, route: str, used_web: bool, legacy_would_search: bool, reason: str):
+        """Count a routing decision against what the length-only rule would have done"""
+        with self._lock:
+            self.counters[route] += 1
+            self.counters["web_searches"] += used_web
+            self.counters["web_searches_avoided"] += legacy_would_search and not used_web
+            self.counters["web_searches_added"] += used_web and not legacy_would_search
+        metrics.count("router_decisions", "hybrid", labels={"route": route})
+        if legacy_would_search and not used_web:
+            metrics.count("router_web_searches_avoided", "hybrid")
+        logger.info(f"Hybrid router: {route} ({reason}), web search {'used' if used_web else 'skipped'}")
+    
+    def get_status_lines(self) -> List[str]:
+        """Routing mix and web searches avoided for the status panel"""
+        with self._lock:
+            counts = dict(self.counters)
+        total = sum(counts[route] for route in ROUTES)
+        avoided = counts["web_searches_avoided"]
+        share = avoided / total if total else 0.0
+        return [
+            f"🧭 Hybrid Router: {total} queries ({counts['local']} local, {counts['web']} web, "
+            f"{counts['both']} both, {counts['auto']} auto), {counts['web_searches']} web searches, "
+            f"{avoided} avoided ({share:.0%}), {counts['web_searches_added']} added"
+        ]
\ No newline at end of file
@@ -0,0 +1,271 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+import logging
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose circuit breaker is open"""
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call does not finish within its deadline"""
+
+def is_backend_failure(error: Exception) -> bool:
+    """Whether an error says the backend is unhealthy (client errors such as a 400 do not)"""
+    status = getattr(error, "status_code", None)
+    return status is None or status >= 500 or status == 429
+
+class CircuitBreaker:
+    """Per-backend failure memory: closed -> open after consecutive failures -> closed again once healthy.
+
+    While open, calls fail fast. With a probe the breaker checks the backend
+    in the background (backing off between probes) and closes as soon as a
+    probe succeeds; without one it lets a single trial call through once
+    reset_timeout has passed (half-open).
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 probe: Optional[Callable[[], object]] = None):
+        """Configure the breaker (probe is called with no arguments and raises on failure)"""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.counters = {"failures": 0, "rejected": 0, "opened": 0}
+        self.last_error = ""
+        self._next_check = 0.0
+        self._trial_in_flight = False
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.probe is None and time.monotonic() >= self._next_check:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.counters["rejected"] += 1
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Circuit for {self.name} closed: backend healthy again")
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.counters["failures"] += 1
+            self.last_error = str(error)[:200]
+            self._trial_in_flight = False
+            if self.state == "half_open" or (
+                self.state == "closed" and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = "open"
+                self._next_check = time.monotonic() + self.reset_timeout
+                self.counters["opened"] += 1
+                logger.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} failures: {error}")
+                start_probe = self.probe is not None and not self._probing
+                self._probing = self._probing or start_probe
+            else:
+                start_probe = False
+        if start_probe:
+            threading.Thread(target=self._probe_loop, name=f"probe-{self.name}", daemon=True).start()
+    
+    def _probe_loop(self):
+        """Probe the backend until it answers, backing off up to ten reset intervals"""
+        delay = self.reset_timeout
+        while True:
+            time.sleep(delay)
+            try:
+                self.probe()
+            except Exception as e:
+                delay = min(delay * 2, self.reset_timeout * 10)
+                logger.info(f"Probe of {self.name} failed, next probe in {delay:.0f}s: {e}")
+                with self._lock:
+                    self._next_check = time.monotonic() + delay
+                    self.last_error = str(e)[:200]
+                continue
+            with self._lock:
+                self._probing = False
+            self.record_success()
+            return
+    
+    def retry_in(self) -> float:
+        """Seconds until the next probe or trial call (0 when closed)"""
+        if self.state == "closed":
+            return 0.0
+        return max(0.0, self._next_check - time.monotonic())
+
+class CallPolicy:
+    """Deadline, retry and hedging settings for one backend"""
+    
+    def __init__(self, deadline: Optional[float] = None, retries: int = 0, base_delay: float = 0.2,
+                 max_delay: float = 2.0, hedge_after: Optional[float] = None):
+        self.deadline = deadline
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+    
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt + 1"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class Resilience:
+    """Circuit breakers and call policies for every outbound backend (openai, duckduckgo, ...)"""
+    
+    def __init__(self, max_workers: int = 32):
+        """Initialize with no policies (calls go straight through until configured)"""
+        self.breakers = {}
+        self.policies = {}
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def configure(self, backend: str, policy: Optional[CallPolicy] = None, failure_threshold: int = 5,
+                  reset_timeout: float = 30.0, probe: Optional[Callable[[], object]] = None):
+        """Set a backend's call policy and circuit breaker (replacing earlier settings)"""
+        with self._lock:
+            self.policies[backend] = policy or CallPolicy()
+            previous = self.breakers.get(backend)
+            self.breakers[backend] = CircuitBreaker(
+                backend, failure_threshold, reset_timeout, probe or (previous.probe if previous else None)
+            )
+    
+    def set_probe(self, backend: str, probe: Callable[[], object]):
+        """Register the health check used while a backend's circuit is open"""
+        self.breaker(backend).probe = probe
+    
+    def breaker(self, backend: str) -> CircuitBreaker:
+        with self._lock:
+            if backend not in self.breakers:
+                self.breakers[backend] = CircuitBreaker(backend)
+            return self.breakers[backend]
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="resilience")
+            return self._executor
+    
+    def _admit(self, backend: str) -> CircuitBreaker:
+        breaker = self.breaker(backend)
+        if not breaker.allow():
+            metrics.count("circuit_rejections", backend)
+            raise CircuitOpenError(f"{backend} is unavailable (circuit open, retrying in {breaker.retry_in():.0f}s)")
+        return breaker
+    
+    def call(self, backend: str, fn: Callable[[], object]):
+        """Call a backend under its deadline, retry, hedging and circuit-breaker policy"""
+        policy = self.policies.get(backend) or CallPolicy()
+        for attempt in range(policy.retries + 1):
+            breaker = self._admit(backend)
+            try:
+                result = self._attempt(backend, fn, policy)
+            except Exception as e:
+                if not is_backend_failure(e):
+                    breaker.record_success()  # The backend answered; the request was at fault
+                    raise
+                breaker.record_failure(e)
+                metrics.count("backend_failures", backend)
+                if attempt == policy.retries:
+                    raise
+                delay = policy.backoff(attempt)
+                logger.info(f"{backend} call failed ({e}), retry {attempt + 1}/{policy.retries} in {delay:.2f}s")
+                metrics.count("backend_retries", backend)
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+    
+    def _attempt(self, backend: str, fn: Callable[[], object], policy: CallPolicy):
+        """One attempt, bounded by the deadline and hedged with a duplicate call if it is slow"""
+        if policy.deadline is None and not policy.hedge_after:
+            return fn()
+        
+        started = time.monotonic()
+        futures = [self._get_executor().submit(fn)]
+        if policy.hedge_after:
+            done, _ = wait(futures, timeout=policy.hedge_after)
+            if not done:
+                metrics.count("hedged_requests", backend)
+                futures.append(self._get_executor().submit(fn))
+        
+        error = None
+        pending = set(futures)
+        while pending:
+            remaining = None if policy.deadline is None else policy.deadline - (time.monotonic() - started)
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        metrics.count("hedged_wins", backend)
+                    return future.result()
+                error = error or future.exception()
+        if error is not None and not pending:
+            raise error
+        # Calls past their deadline are abandoned; they finish (or time out) in the background
+        raise DeadlineExceeded(f"{backend} call exceeded its {policy.deadline:.1f}s deadline")
+    
+    @contextmanager
+    def guard(self, backend: str):
+        """Circuit-breaker bookkeeping for calls that manage their own deadlines (e.g. token streams)"""
+        breaker = self._admit(backend)
+        try:
+            yield
+        except Exception as e:
+            if is_backend_failure(e):
+                breaker.record_failure(e)
+                metrics.count("backend_failures", backend)
+            else:
+                breaker.record_success()
+            raise
+        except BaseException:  # A stream abandoned by its consumer: the backend was answering
+            breaker.record_success()
+            raise
+        breaker.record_success()
+    
+    def state(self, backend: str) -> str:
+        """"closed", "open" or "half_open" ("closed" for backends never called)"""
+        with self._lock:
+            breaker = self.breakers.get(backend)
+        return breaker.state if breaker is not None else "closed"
+    
+    def get_status_lines(self) -> List[str]:
+        """Live health of every backend for the status panel"""
+        with self._lock:
+            breakers = sorted(self.breakers.items())
+        if not breakers:
+            return []
+        icons = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+        lines = ["🩺 Backend Health:"]
+        for name, breaker in breakers:
+            line = (
+                f"   • {icons[breaker.state]} {name}: {breaker.state.replace('_', '-')}, "
+                f"{breaker.counters['failures']} failures, {breaker.counters['rejected']} rejected"
+            )
+            if breaker.state != "closed":
+                line += f" (next check in {breaker.retry_in():.0f}s; last error: {breaker.last_error})"
+            lines.append(line)
+        return lines
+
+# Process-wide registry used by the LLM helpers and the service wrappers
+resilience = Resilience()
\ No newline at end of file
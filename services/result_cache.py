@@ -0,0 +1,226 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from .sources import dump_sources, load_sources
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache keys (case, punctuation and whitespace insensitive)"""
+    query = _PUNCTUATION.sub(" ", query.lower())
+    return _WHITESPACE.sub(" ", query).strip()
+
+class MemoryCacheBackend:
+    """Bounded in-memory LRU store of (value, expires_at) entries"""
+    
+    def __init__(self, max_entries: int = 1024):
+        """Initialize the LRU store"""
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Tuple[object, float]]:
+        """Return (value, expires_at) and mark the entry as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def set(self, key: str, value: object, expires_at: float):
+        """Store an entry, evicting the least recently used ones when full"""
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: str):
+        """Remove an entry if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteCacheBackend:
+    """On-disk LRU store so cached results survive restarts"""
+    
+    def __init__(self, path: str, max_entries: int = 10000):
+        """Open (or create) the cache database"""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS result_cache_accessed ON result_cache (accessed_at)"
+        )
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Tuple[object, float]]:
+        """Return (value, expires_at) and mark the entry as recently used"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE result_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return json.loads(row[0]), row[1]
+    
+    def set(self, key: str, value: object, expires_at: float):
+        """Store an entry, evicting the least recently used ones when full"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, time.time())
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+            if count > self.max_entries:
+                # Drop expired entries first, then the least recently used
+                self._conn.execute("DELETE FROM result_cache WHERE expires_at <= ?", (time.time(),))
+                removed = self._conn.execute(
+                    "DELETE FROM result_cache WHERE key IN ("
+                    "SELECT key FROM result_cache ORDER BY accessed_at ASC LIMIT "
+                    "MAX(0, (SELECT COUNT(*) FROM result_cache) - ?))",
+                    (self.max_entries,)
+                ).rowcount
+                self.evictions += max(0, removed)
+            self._conn.commit()
+    
+    def delete(self, key: str):
+        """Remove an entry if present"""
+        with self._lock:
+            self._conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM result_cache")
+            self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+
+class ResultCache:
+    """Namespaced (answer, sources) cache with per-namespace TTLs.
+
+    Lookups go to a bounded in-memory LRU first and then to an optional
+    persistent backend, whose hits are promoted back into memory.
+    """
+    
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 3600.0,
+                 max_entries: int = 1024, persistent_backend=None):
+        """Initialize the cache"""
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.memory = MemoryCacheBackend(max_entries)
+        self.persistent = persistent_backend
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+    
+    def _key(self, namespace: str, query: str) -> str:
+        return f"{namespace}:{normalize_query(query)}"
+    
+    def _count(self, namespace: str, field: str):
+        with self._stats_lock:
+            stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+            stats[field] += 1
+    
+    def get(self, namespace: str, query: str, count: bool = True) -> Optional[Tuple[str, str]]:
+        """Return the cached (answer, sources) for a query, or None (count=False leaves the hit rate alone)"""
+        key = self._key(namespace, query)
+        now = time.time()
+        
+        for backend in (self.memory, self.persistent):
+            if backend is None:
+                continue
+            entry = backend.get(key)
+            if entry is None:
+                continue
+            value, expires_at = entry
+            if expires_at <= now:
+                backend.delete(key)
+                continue
+            if backend is not self.memory:
+                value = [value[0], load_sources(value[1])]
+                self.memory.set(key, value, expires_at)
+            if count:
+                self._count(namespace, "hits")
+            return tuple(value)
+        
+        if count:
+            self._count(namespace, "misses")
+        return None
+    
+    def set(self, namespace: str, query: str, value: Tuple[str, str]):
+        """Cache an (answer, sources) result under the namespace's TTL"""
+        key = self._key(namespace, query)
+        expires_at = time.time() + self.ttls.get(namespace, self.default_ttl)
+        self.memory.set(key, list(value), expires_at)
+        if self.persistent is not None:
+            try:
+                # Structured sources are stored as dicts so they survive the JSON round trip
+                self.persistent.set(key, [value[0], dump_sources(value[1])], expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent result cache write failed: {e}")
+    
+    def clear(self):
+        """Remove every cached result"""
+        self.memory.clear()
+        if self.persistent is not None:
+            self.persistent.clear()
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per namespace"""
+        with self._stats_lock:
+            return {namespace: dict(counts) for namespace, counts in self._stats.items()}
+    
+    def get_status_lines(self) -> List[str]:
+        """Human-readable cache counters for the status panel"""
+        evictions = self.memory.evictions
+        if self.persistent is not None:
+            evictions += self.persistent.evictions
+        lines = [
+            f"🗄️ Result Cache: {len(self.memory)}/{self.memory.max_entries} in memory"
+            + (f", {len(self.persistent)} on disk" if self.persistent is not None else "")
+            + f", {evictions} evictions"
+        ]
+        for namespace, counts in sorted(self.stats().items()):
+            total = counts["hits"] + counts["misses"]
+            rate = counts["hits"] / total * 100 if total else 0.0
+            lines.append(
+                f"   • {namespace}: {counts['hits']} hits / {counts['misses']} misses ({rate:.0f}% hit rate)"
+            )
+        return lines
\ No newline at end of file
@@ -0,0 +1,156 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_COMPARE = 1
+PRIORITY_BACKGROUND = 2
+
+class SystemBusyError(Exception):
+    """Raised when a system's queue is full or a queued request waits too long"""
+
+class Ticket:
+    """A request's place in a system's admission queue"""
+    
+    def __init__(self, scheduler: "Scheduler", system: str, priority: int):
+        self.scheduler = scheduler
+        self.system = system
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+        self.released = False
+        self._event = threading.Event()
+    
+    def wait(self, timeout: Optional[float] = None):
+        """Block until a slot is granted, raising SystemBusyError on timeout"""
+        self._event.wait(timeout)
+        self.scheduler._settle(self)
+    
+    def release(self):
+        """Give the slot back (no-op if it was never granted)"""
+        self.scheduler._release(self)
+
+class _Lane:
+    """Concurrency cap, bounded priority queue and counters for one system"""
+    
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = []
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.recent_waits = deque(maxlen=200)
+
+class Scheduler:
+    """Per-system admission control with a concurrency cap, a bounded queue and priorities.
+
+    Interactive single-tab queries are served ahead of Compare fan-outs, and
+    requests are rejected immediately once a system's queue is full.
+    """
+    
+    def __init__(self, limits: Dict[str, Tuple[int, int]], queue_timeout: float = 30.0):
+        """Create lanes from {system: (max_concurrency, max_queue)}"""
+        self.lanes = {system: _Lane(*limit) for system, limit in limits.items()}
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+    
+    def idle(self, system: str) -> bool:
+        """Whether a system has a free slot and nobody waiting (background work only runs then)"""
+        lane = self.lanes[system]
+        with self._lock:
+            return lane.active < lane.max_concurrency and lane.queued == 0
+    
+    def submit(self, system: str, priority: int = PRIORITY_INTERACTIVE) -> Ticket:
+        """Take a slot now or join the queue; raises SystemBusyError if the queue is full"""
+        ticket = Ticket(self, system, priority)
+        lane = self.lanes[system]
+        with self._lock:
+            if lane.active < lane.max_concurrency and lane.queued == 0:
+                lane.active += 1
+                self._grant(lane, ticket)
+                return ticket
+            if lane.queued >= lane.max_queue:
+                lane.rejected += 1
+                raise SystemBusyError(f"{system} queue is full ({lane.queued} waiting)")
+            heapq.heappush(lane.waiting, (priority, next(self._sequence), ticket))
+            lane.queued += 1
+        return ticket
+    
+    def _grant(self, lane: _Lane, ticket: Ticket):
+        """Mark a ticket as holding a slot (caller holds the lock)"""
+        ticket.granted = True
+        lane.admitted += 1
+        lane.recent_waits.append(time.monotonic() - ticket.enqueued_at)
+        ticket._event.set()
+    
+    def _settle(self, ticket: Ticket):
+        """Resolve a wait: keep the slot if granted, otherwise leave the queue and fail"""
+        lane = self.lanes[ticket.system]
+        with self._lock:
+            if ticket.granted:
+                return
+            ticket.cancelled = True
+            lane.queued -= 1
+            lane.rejected += 1
+        raise SystemBusyError(f"{ticket.system} did not free up within {self.queue_timeout:g}s")
+    
+    def _release(self, ticket: Ticket):
+        """Hand the slot to the highest-priority waiter, or free it"""
+        lane = self.lanes[ticket.system]
+        with self._lock:
+            if not ticket.granted or ticket.released:
+                return
+            ticket.released = True
+            while lane.waiting:
+                _, _, waiter = heapq.heappop(lane.waiting)
+                if waiter.cancelled:
+                    continue
+                lane.queued -= 1
+                self._grant(lane, waiter)
+                return
+            lane.active -= 1
+    
+    @contextmanager
+    def slot(self, system: str, priority: int = PRIORITY_INTERACTIVE):
+        """Hold a slot for the duration of a block, waiting in the queue if needed"""
+        ticket = self.submit(system, priority)
+        try:
+            ticket.wait(self.queue_timeout)
+            yield ticket
+        finally:
+            ticket.release()
+    
+    def queue_position(self, ticket: Ticket) -> int:
+        """Number of requests ahead of a queued ticket"""
+        lane = self.lanes[ticket.system]
+        with self._lock:
+            return sum(
+                1 for priority, _, waiter in lane.waiting
+                if not waiter.cancelled and waiter is not ticket and priority <= ticket.priority
+            )
+    
+    def get_status_lines(self) -> List[str]:
+        """Queue depth and wait times per system for the status panel"""
+        lines = ["🚦 Scheduler:"]
+        with self._lock:
+            for system, lane in self.lanes.items():
+                waits = list(lane.recent_waits)
+                average = sum(waits) / len(waits) if waits else 0.0
+                lines.append(
+                    f"   • {system}: {lane.active}/{lane.max_concurrency} active, "
+                    f"{lane.queued}/{lane.max_queue} queued, avg wait {average:.2f}s "
+                    f"(max {max(waits, default=0.0):.2f}s), {lane.rejected} rejected"
+                )
+        return lines
\ No newline at end of file
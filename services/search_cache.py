@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from .result_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+class SearchCache:
+    """SQLite-backed cache of raw web search results.
+
+    Entries younger than fresh_ttl are served as-is. Older entries are still
+    served (flagged as stale) until max_stale, so the caller can refresh them
+    in the background; anything older is pruned in bulk.
+    """
+    
+    def __init__(self, path: str, fresh_ttl: float = 3600.0, max_stale: float = 86400.0,
+                 max_entries: int = 5000, prune_every: int = 100):
+        """Open (or create) the search cache database"""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fresh_ttl = fresh_ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self.counters = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "pruned": 0}
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            "query TEXT NOT NULL, region TEXT NOT NULL, safesearch TEXT NOT NULL, "
+            "max_results INTEGER NOT NULL, results TEXT NOT NULL, fetched_at REAL NOT NULL, "
+            "PRIMARY KEY (query, region, safesearch, max_results))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_cache_fetched ON search_cache (fetched_at)"
+        )
+        self._conn.commit()
+    
+    def get(self, query: str, region: str, safesearch: str,
+            max_results: int) -> Optional[Tuple[List[Dict[str, str]], bool]]:
+        """Return (results, is_fresh) for a search, or None if not cached"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, fetched_at FROM search_cache "
+                "WHERE query = ? AND region = ? AND safesearch = ? AND max_results = ?",
+                (normalize_query(query), region, safesearch, max_results)
+            ).fetchone()
+            
+            age = time.time() - row[1] if row else None
+            if row is None or age > self.fresh_ttl + self.max_stale:
+                self.counters["misses"] += 1
+                return None
+            
+            is_fresh = age <= self.fresh_ttl
+            self.counters["fresh_hits" if is_fresh else "stale_hits"] += 1
+        return json.loads(row[0]), is_fresh
+    
+    def set(self, query: str, region: str, safesearch: str, max_results: int,
+            results: List[Dict[str, str]]):
+        """Store the results of a live search"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache "
+                "(query, region, safesearch, max_results, results, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_query(query), region, safesearch, max_results,
+                 json.dumps(results), time.time())
+            )
+            self._conn.commit()
+            self._writes += 1
+            should_prune = self._writes % self.prune_every == 0
+        
+        if should_prune:
+            self.prune()
+    
+    def prune(self) -> int:
+        """Delete expired entries and trim the table to max_entries, oldest first"""
+        with self._lock:
+            cutoff = time.time() - self.fresh_ttl - self.max_stale
+            removed = self._conn.execute(
+                "DELETE FROM search_cache WHERE fetched_at < ?", (cutoff,)
+            ).rowcount
+            removed += self._conn.execute(
+                "DELETE FROM search_cache WHERE rowid IN ("
+                "SELECT rowid FROM search_cache ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+            self._conn.commit()
+            self.counters["pruned"] += removed
+        
+        if removed:
+            logger.info(f"Pruned {removed} search cache entries")
+        return removed
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+    
+    def get_status_lines(self) -> List[str]:
+        """Human-readable cache counters for the status panel"""
+        counts = dict(self.counters)
+        return [
+            f"🔎 Search Cache: {len(self)} entries, {counts['fresh_hits']} fresh / "
+            f"{counts['stale_hits']} stale hits, {counts['misses']} misses, {counts['pruned']} pruned"
+        ]
\ No newline at end of file
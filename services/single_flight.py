@@ -0,0 +1,128 @@
+import threading
+from typing import Callable, Dict, Iterator, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    """State shared by every caller waiting on one in-flight computation"""
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.latest = None
+        self.version = 0
+        self.done = False
+        self.error = None
+
+class SingleFlight:
+    """Coalesce concurrent identical requests into one in-flight computation.
+
+    The first caller for a (namespace, key) pair runs the work; callers that
+    arrive while it is running wait for and share its result.
+    """
+    
+    def __init__(self):
+        """Initialize the flight table and counters"""
+        self._calls = {}
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._counters = {}
+    
+    def _join(self, table: dict, namespace: str, key: str):
+        """Return (flight, is_leader) for a key, registering a new flight if none is running"""
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {"executed": 0, "coalesced": 0})
+            flight = table.get((namespace, key))
+            if flight is not None:
+                counters["coalesced"] += 1
+                return flight, False
+            
+            flight = _Flight()
+            table[(namespace, key)] = flight
+            counters["executed"] += 1
+            return flight, True
+    
+    def _finish(self, table: dict, namespace: str, key: str, flight: _Flight, error: Exception = None):
+        """Mark a flight complete and wake every waiter"""
+        with self._lock:
+            table.pop((namespace, key), None)
+        with flight.condition:
+            flight.done = True
+            flight.error = error
+            flight.condition.notify_all()
+    
+    def do(self, namespace: str, key: str, fn: Callable):
+        """Run fn once for concurrent identical calls and return its result to all of them"""
+        flight, is_leader = self._join(self._calls, namespace, key)
+        
+        if is_leader:
+            try:
+                flight.latest = fn()
+            except Exception as e:
+                self._finish(self._calls, namespace, key, flight, e)
+                raise
+            self._finish(self._calls, namespace, key, flight)
+            return flight.latest
+        
+        with flight.condition:
+            while not flight.done:
+                flight.condition.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.latest
+    
+    def do_stream(self, namespace: str, key: str, stream_fn: Callable[[], Iterator]) -> Iterator:
+        """Share one stream between concurrent identical calls.
+
+        Items must be cumulative (each one supersedes the previous), so late
+        joiners start from the latest item and slow readers may skip some.
+        The stream runs on its own thread so it completes for the remaining
+        callers even if one of them stops reading.
+        """
+        flight, is_leader = self._join(self._streams, namespace, key)
+        
+        if is_leader:
+            def produce():
+                try:
+                    for item in stream_fn():
+                        with flight.condition:
+                            flight.latest = item
+                            flight.version += 1
+                            flight.condition.notify_all()
+                except Exception as e:
+                    logger.error(f"Coalesced {namespace} stream failed: {e}")
+                    self._finish(self._streams, namespace, key, flight, e)
+                    return
+                self._finish(self._streams, namespace, key, flight)
+            
+            threading.Thread(target=produce, name=f"single-flight-{namespace}", daemon=True).start()
+        
+        seen = 0
+        while True:
+            with flight.condition:
+                while flight.version == seen and not flight.done:
+                    flight.condition.wait()
+                item, version, done, error = flight.latest, flight.version, flight.done, flight.error
+            
+            if version != seen:
+                seen = version
+                yield item
+            if done:
+                if error is not None:
+                    raise error
+                return
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Executed/coalesced counters per namespace"""
+        with self._lock:
+            return {namespace: dict(counts) for namespace, counts in self._counters.items()}
+    
+    def get_status_lines(self) -> List[str]:
+        """Human-readable coalescing counters for the status panel"""
+        stats = self.stats()
+        executed = sum(counts["executed"] for counts in stats.values())
+        coalesced = sum(counts["coalesced"] for counts in stats.values())
+        lines = [f"🔗 Request Coalescing: {coalesced} duplicate requests shared {executed} executions"]
+        for namespace, counts in sorted(stats.items()):
+            lines.append(f"   • {namespace}: {counts['coalesced']} coalesced / {counts['executed']} executed")
+        return lines
\ No newline at end of file
@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, List, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Status implied by the leading marker of a sources string
+STATUS_MARKERS = (
+    ("❌", "error"),
+    ("⚠️", "timeout"),
+    ("⏳", "pending"),
+    ("🚦", "busy"),
+)
+
+class Sources(str):
+    """Display sources string (e.g. "📚 Personal Documents: cv.md") carrying the structured sources behind it.
+
+    Services build it from the documents and search-result URLs they used and
+    the emoji text is rendered from that structure, so the UI keeps showing a
+    plain string while the API reads the structure directly.
+    """
+    
+    def __new__(cls, text: str, kinds: Iterable[str] = (), documents: Iterable[str] = (),
+                urls: Iterable[str] = (), local_context_chars: Optional[int] = None):
+        sources = super().__new__(cls, text)
+        sources.kinds = list(kinds)
+        sources.documents = list(dict.fromkeys(documents))
+        sources.urls = list(dict.fromkeys(urls))
+        sources.local_context_chars = local_context_chars
+        return sources
+    
+    def to_dict(self) -> Dict:
+        """Structure and display text, e.g. for JSON storage"""
+        return {
+            "kinds": self.kinds,
+            "documents": self.documents,
+            "urls": self.urls,
+            "local_context_chars": self.local_context_chars,
+            "text": str(self),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Sources":
+        return cls(
+            data["text"], data.get("kinds", ()), data.get("documents", ()), data.get("urls", ()),
+            data.get("local_context_chars")
+        )
+
+def personal_sources(documents: List[str], sections: Optional[List[str]] = None) -> Sources:
+    """Personal documents used for an answer (the external RAG system also names sections)"""
+    documents = list(dict.fromkeys(documents))
+    if sections and documents:
+        text = f"📚 Personal Documents: {', '.join(sections)} from {', '.join(documents)}"
+    elif sections or documents:
+        text = f"📚 Personal Documents: {', '.join(sections or documents)}"
+    else:
+        text = "📚 Personal Documents"
+    return Sources(text, kinds=["personal_documents"], documents=documents)
+
+def web_sources(label: str, urls: List[str]) -> Sources:
+    """Search results an answer was based on"""
+    return Sources(f"🌐 Web Search ({label})", kinds=["web"], urls=urls)
+
+def hybrid_sources(documents: List[str], urls: List[str], local_context_chars: int, used_web: bool) -> Sources:
+    """Personal documents and/or search results a hybrid answer was based on"""
+    kinds = []
+    if local_context_chars:
+        kinds.append("personal_documents")
+    if used_web:
+        kinds.append("web")
+    
+    if local_context_chars and used_web:
+        text = f"🔄 Hybrid: Personal docs ({local_context_chars} chars) + Web search"
+    elif local_context_chars:
+        text = f"🏠 Personal documents only ({local_context_chars} chars)"
+    elif used_web:
+        text = "🌐 Web search only"
+    else:
+        text = "❓ Unknown sources"
+    return Sources(
+        text, kinds=kinds, documents=documents if local_context_chars else [], urls=urls if used_web else [],
+        local_context_chars=local_context_chars
+    )
+
+def dump_sources(sources: str) -> Union[str, Dict]:
+    """JSON-serializable form that keeps the structure of a Sources value"""
+    return sources.to_dict() if isinstance(sources, Sources) else sources
+
+def load_sources(data: Union[str, Dict]) -> str:
+    """Inverse of dump_sources"""
+    return Sources.from_dict(data) if isinstance(data, dict) else data
+
+def describe_sources(sources: str) -> Dict:
+    """Structured description of an answer's sources for the API"""
+    status = next((name for marker, name in STATUS_MARKERS if sources.startswith(marker)), "ok")
+    if isinstance(sources, Sources):
+        return {"status": status, **sources.to_dict()}
+    
+    # Status messages (errors, timeouts, queue updates) have no structure behind them
+    return {
+        "status": status,
+        "kinds": [],
+        "documents": [],
+        "urls": [],
+        "local_context_chars": None,
+        "text": sources,
+    }
\ No newline at end of file
@@ -0,0 +1,85 @@
+from typing import List, Sequence, Tuple
+import logging
+
+from .vector_store import MappedVectors
+
+try:
+    import numpy as np  # Installed with gradio
+except ImportError:  # Optional: callers fall back to pure-Python scoring
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per block when the matrix is int8, bounding the float32 scratch copy
+QUANTIZED_BLOCK_ROWS = 8192
+
+def numpy_available() -> bool:
+    return np is not None
+
+class VectorIndex:
+    """Contiguous float32 (or int8-quantized) embedding matrix with vectorized cosine top-k.
+
+    Scores are raw dot products divided by precomputed row norms, so a matrix
+    mapped from a vector file is searched in place without being copied.
+    int8 quantization (symmetric, one scale per row) cuts memory four-fold at
+    a small cost in score precision.
+    """
+    
+    def __init__(self, matrix, norms, quantize: bool = False):
+        """Index an (n, dim) float32 matrix with its row norms"""
+        if np is None:
+            raise ImportError("numpy is required for VectorIndex")
+        norms = np.asarray(norms, dtype=np.float32)
+        norms[norms == 0] = 1.0
+        self.quantized = quantize
+        if quantize:
+            scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.ones(0, dtype=np.float32)
+            scales[scales == 0] = 1.0
+            self.matrix = np.round(matrix / scales[:, None]).astype(np.int8)
+            self.row_weights = (scales / norms).astype(np.float32)
+        else:
+            self.matrix = matrix
+            self.row_weights = (1.0 / norms).astype(np.float32)
+    
+    @classmethod
+    def from_vectors(cls, vectors: Sequence[Sequence[float]], dim: int = 0, quantize: bool = False) -> "VectorIndex":
+        """Build from in-memory embeddings (copied into one contiguous array)"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:  # No vectors
+            matrix = matrix.reshape(0, dim)
+        return cls(matrix, np.linalg.norm(matrix, axis=1), quantize)
+    
+    @classmethod
+    def from_mapped(cls, vectors: MappedVectors, quantize: bool = False) -> "VectorIndex":
+        """Wrap a memory-mapped vector file without copying it (unless quantizing)"""
+        matrix = np.frombuffer(vectors.vectors, dtype=np.float32).reshape(vectors.rows, vectors.dim)
+        return cls(matrix, np.frombuffer(vectors.norms, dtype=np.float32).copy(), quantize)
+    
+    def __len__(self) -> int:
+        return len(self.matrix)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.row_weights.nbytes
+    
+    def scores(self, query: Sequence[float]):
+        """Cosine similarity of the query with every row"""
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        if not self.quantized:
+            return (self.matrix @ query) * self.row_weights
+        dots = np.empty(len(self.matrix), dtype=np.float32)
+        for start in range(0, len(self.matrix), QUANTIZED_BLOCK_ROWS):
+            block = self.matrix[start:start + QUANTIZED_BLOCK_ROWS]
+            dots[start:start + len(block)] = block.astype(np.float32) @ query
+        return dots * self.row_weights
+    
+    def top_k(self, query: Sequence[float], k: int = 4) -> List[Tuple[int, float]]:
+        """(row, score) pairs of the k most similar rows, best first"""
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
\ No newline at end of file
@@ -0,0 +1,67 @@
+import math
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Sequence
+
+# File layout: header, rows x dim float32 vectors, then one float32 norm per row
+MAGIC = b"PIV1"
+HEADER = struct.Struct("<4sII")
+
+def write_vectors(path: Path, vectors: Sequence[Sequence[float]], dim: int = 0):
+    """Atomically write embeddings (and their norms) as a flat float32 file"""
+    dim = len(vectors[0]) if vectors else dim
+    flat = array("f")
+    norms = array("f")
+    for vector in vectors:
+        flat.extend(vector)
+        norms.append(math.sqrt(sum(v * v for v in vector)) or 1.0)
+    
+    path = Path(path)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(vectors), dim))
+        flat.tofile(f)
+        norms.tofile(f)
+    os.replace(tmp_path, path)
+
+class MappedVectors:
+    """Read-only, memory-mapped view of a vector file.
+
+    Every process mapping the same file shares its pages through the OS page
+    cache, so the embeddings are held in memory once however many workers
+    search them.
+    """
+    
+    def __init__(self, path: Path):
+        """Map a file written by write_vectors"""
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.dim = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a vector file: {self.path}")
+        
+        self._floats = memoryview(self._mmap)[HEADER.size:].cast("f")
+        self.vectors = self._floats[:self.rows * self.dim]
+        self.norms = self._floats[self.rows * self.dim:self.rows * (self.dim + 1)]
+    
+    def row(self, i: int) -> memoryview:
+        """The i-th vector (a zero-copy view)"""
+        return self.vectors[i * self.dim:(i + 1) * self.dim]
+    
+    def cosine_scores(self, query: Sequence[float]) -> List[float]:
+        """Cosine similarity of the query with every row"""
+        query_norm = math.sqrt(sum(v * v for v in query)) or 1.0
+        return [
+            sum(a * b for a, b in zip(query, self.row(i))) / (self.norms[i] * query_norm)
+            for i in range(self.rows)
+        ]
+    
+    def close(self):
+        for view in (self.vectors, self.norms, self._floats):
+            view.release()
+        self._mmap.close()
\ No newline at end of file
@@ -1,45 +1,187 @@
-from duckduckgo_search import DDGS
-from openai import OpenAI
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+import threading
 import logging
 
+from .search_cache import SearchCache
+from .page_fetcher import PageCache, PageFetcher, select_chunks
+from .context_packer import ContextPacker
+from .model_router import ModelRouter
+from .backends import DuckDuckGoSearch
+from .config import env_bool, env_float, env_int, env_str
+from .metrics import metrics
+from .resilience import resilience
+from .sources import web_sources
+
 logger = logging.getLogger(__name__)
 
+# Query the health probe sends while the search backend's circuit is open
+PROBE_QUERY = "weather"
+
 class WebSearchService:
     """Service wrapper for Web Search functionality"""
     
-    def __init__(self, api_key: str):
-        """Initialize Web Search Service"""
+    def __init__(self, api_key: str, search_cache: Optional[SearchCache] = None, client=None,
+                 page_fetcher: Optional[PageFetcher] = None, packer: Optional[ContextPacker] = None,
+                 models: Optional[ModelRouter] = None, search_backend=None):
+        """Initialize Web Search Service (with a shared OpenAI client when one is given)"""
         try:
-            self.client = OpenAI(api_key=api_key)
+            if client is None:
+                from openai import OpenAI  # Imported lazily to keep startup fast
+                
+                client = OpenAI(api_key=api_key)
+            self.client = client
             logger.info("Web Search Service initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Web Search Service: {e}")
             raise
+        
+        # Where results come from: live DuckDuckGo unless another search backend is given
+        self.search_backend = search_backend if search_backend is not None else DuckDuckGoSearch()
+        
+        self.search_cache = search_cache if search_cache is not None else self._build_search_cache()
+        
+        # Deep mode enriches the snippets with extracts from the result pages
+        self.page_fetcher = page_fetcher if page_fetcher is not None else self._build_page_fetcher()
+        self.deep_max_chunks = env_int("DEEP_SEARCH_MAX_CHUNKS", 4)
+        
+        # Packs search results into the prompt token budget (None sends them all)
+        self.packer = packer
+        
+        # Picks the model per question and escalates weak answers (defaults to the single built-in model)
+        self.models = models if models is not None else ModelRouter()
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        
+        # While the search backend's circuit is open, a one-result search checks whether it is back
+        resilience.set_probe(
+            self.search_backend.name, lambda: self._fetch_results(PROBE_QUERY, "wt-wt", "Moderate", 1)
+        )
     
-    def search_web(self, query: str) -> str:
-        """Perform web search using DuckDuckGo"""
+    def _build_search_cache(self) -> Optional[SearchCache]:
+        """Build the default search cache from environment settings"""
+        if not env_bool("SEARCH_CACHE_ENABLED", True):
+            return None
         try:
-            results = []
-            with DDGS() as ddgs:
-                for r in ddgs.text(query, region='wt-wt', safesearch='Moderate', max_results=3):
-                    results.append(f"**{r['title']}**\n{r['href']}\n{r['body']}\n")
-            return "\n---\n".join(results) if results else "No results found."
+            return SearchCache(
+                env_str("SEARCH_CACHE_PATH", ".cache/search_cache.sqlite3"),
+                fresh_ttl=env_float("SEARCH_CACHE_FRESH_TTL", 3600.0),
+                max_stale=env_float("SEARCH_CACHE_MAX_STALE", 86400.0),
+                max_entries=env_int("SEARCH_CACHE_MAX_ENTRIES", 5000)
+            )
         except Exception as e:
-            logger.error(f"Web search failed: {e}")
-            return f"Search error: {str(e)}"
+            logger.warning(f"Search cache unavailable, searching live: {e}")
+            return None
     
-    def query(self, query: str) -> Tuple[str, str]:
-        """Query with web search and AI analysis"""
-        try:
-            # Get web search results
-            web_results = self.search_web(query)
-            
-            if "Search error" in web_results or "No results found" in web_results:
-                return web_results, "❌ Web search failed"
-            
-            # Process with AI
-            prompt = f"""You are a research assistant. Based on the web search results below, provide a comprehensive answer to the user's question. Always cite your sources with URLs when available.
+    def _build_page_fetcher(self) -> Optional[PageFetcher]:
+        """Build the deep-mode page fetcher from environment settings (None when deep mode is off)"""
+        if not env_bool("DEEP_SEARCH_ENABLED", False):
+            return None
+        
+        page_cache = None
+        if env_bool("PAGE_CACHE_ENABLED", True):
+            try:
+                page_cache = PageCache(
+                    env_str("PAGE_CACHE_PATH", ".cache/page_cache.sqlite3"),
+                    ttl=env_float("PAGE_CACHE_TTL", 86400.0),
+                    max_entries=env_int("PAGE_CACHE_MAX_ENTRIES", 2000)
+                )
+            except Exception as e:
+                logger.warning(f"Page cache unavailable, fetching pages live: {e}")
+        
+        return PageFetcher(
+            cache=page_cache,
+            page_timeout=env_float("DEEP_SEARCH_PAGE_TIMEOUT", 3.0),
+            total_timeout=env_float("DEEP_SEARCH_TOTAL_TIMEOUT", 5.0),
+            max_workers=env_int("DEEP_SEARCH_MAX_WORKERS", 8)
+        )
+    
+    def search_web(self, query: str) -> Tuple[str, List[str]]:
+        """Perform a web search with the configured search backend; returns (prompt context, result URLs)"""
+        with metrics.timer("search_web", "web"):
+            try:
+                results = self.search_results(query)
+                if not results:
+                    return "No results found.", []
+                
+                formatted = "\n---\n".join(self._format_result(r) for r in results)
+                if self.page_fetcher is not None:
+                    formatted += self._page_extracts(query, results)
+                return formatted, [r["href"] for r in results if r.get("href")]
+            except Exception as e:
+                metrics.count_error("search_web", "web")
+                logger.error(f"Web search failed: {e}")
+                return f"Search error: {str(e)}", []
+    
+    def search_results(self, query: str, region: str = 'wt-wt', safesearch: str = 'Moderate',
+                       max_results: int = 3) -> List[Dict[str, str]]:
+        """Return raw search results, served from the cache when possible"""
+        if self.search_cache is not None:
+            cached = self.search_cache.get(query, region, safesearch, max_results)
+            if cached:
+                results, is_fresh = cached
+                if not is_fresh:
+                    self._refresh_in_background(query, region, safesearch, max_results)
+                return results
+        
+        results = resilience.call(
+            self.search_backend.name, lambda: self._fetch_results(query, region, safesearch, max_results)
+        )
+        if self.search_cache is not None and results:
+            self.search_cache.set(query, region, safesearch, max_results, results)
+        return results
+    
+    def _fetch_results(self, query: str, region: str, safesearch: str, max_results: int) -> List[Dict[str, str]]:
+        """Run an uncached search on the search backend"""
+        return self.search_backend.search(query, region=region, safesearch=safesearch, max_results=max_results)
+    
+    def _refresh_in_background(self, query: str, region: str, safesearch: str, max_results: int):
+        """Refresh a stale cache entry without blocking the caller"""
+        key = (query, region, safesearch, max_results)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                results = resilience.call(
+                    self.search_backend.name, lambda: self._fetch_results(query, region, safesearch, max_results)
+                )
+                if results:
+                    self.search_cache.set(query, region, safesearch, max_results, results)
+            except Exception as e:
+                logger.warning(f"Background search refresh failed, keeping stale results: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        threading.Thread(target=refresh, name="search-refresh", daemon=True).start()
+    
+    def _page_extracts(self, query: str, results: List[Dict[str, str]]) -> str:
+        """Most relevant passages from the result pages that loaded within the deadline"""
+        pages = self.page_fetcher.fetch_pages([r["href"] for r in results if r.get("href")])
+        with metrics.timer("format", "web"):
+            chunks = select_chunks(query, pages, max_chunks=self.deep_max_chunks)
+        if not chunks:
+            return ""
+        return "".join(f"\n---\n[{url}]\n{chunk}" for url, chunk in chunks)
+    
+    @staticmethod
+    def _format_result(result: Dict[str, str]) -> str:
+        """Format one search result for the LLM prompt"""
+        return f"**{result['title']}**\n{result['href']}\n{result['body']}\n"
+    
+    def _build_prompt(self, query: str, web_results: str) -> str:
+        """Build the research prompt from search results, packed into the token budget"""
+        if self.packer is not None:
+            passages, _ = self.packer.pack(
+                query, web_results.split("\n---\n"), system="web", overhead=self._render_prompt(query, "")
+            )
+            web_results = "\n---\n".join(passages)
+        return self._render_prompt(query, web_results)
+    
+    def _render_prompt(self, query: str, web_results: str) -> str:
+        return f"""You are a research assistant. Based on the web search results below, provide a comprehensive answer to the user's question. Always cite your sources with URLs when available.
 
 Web Search Results:
 {web_results}
@@ -47,23 +189,53 @@ Web Search Results:
 Question: {query}
 
 Answer:"""
+    
+    def query(self, query: str) -> Tuple[str, str]:
+        """Query with web search and AI analysis"""
+        try:
+            # Get web search results
+            web_results, urls = self.search_web(query)
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=500,
-                temperature=0.1
-            )
+            if "Search error" in web_results or "No results found" in web_results:
+                return web_results, "❌ Web search failed"
             
-            answer = response.choices[0].message.content
-            sources = "🌐 Web Search (DuckDuckGo)"
+            # Process with AI
+            with metrics.timer("format", "web"):
+                prompt = self._build_prompt(query, web_results)
             
-            return answer, sources
+            answer = self.models.complete(self.client, prompt, query, system="web")
+            return answer, web_sources(self.search_backend.label, urls)
             
         except Exception as e:
             logger.error(f"Web search query failed: {e}")
             return f"Error processing web search: {str(e)}", "❌ Error"
     
+    def query_stream(self, query: str) -> Iterator[Tuple[str, str]]:
+        """Query with web search and AI analysis, yielding the answer as tokens arrive"""
+        try:
+            # Get web search results
+            web_results, urls = self.search_web(query)
+            
+            if "Search error" in web_results or "No results found" in web_results:
+                yield web_results, "❌ Web search failed"
+                return
+            
+            # Stream the AI analysis
+            with metrics.timer("format", "web"):
+                prompt = self._build_prompt(query, web_results)
+            
+            sources = web_sources(self.search_backend.label, urls)
+            answer = ""
+            for answer in self.models.stream(self.client, prompt, query, system="web"):
+                yield answer, sources
+            
+            if not answer:
+                yield "No answer generated", sources
+                
+        except Exception as e:
+            logger.error(f"Web search streaming query failed: {e}")
+            yield f"Error processing web search: {str(e)}", "❌ Error"
+    
     def is_available(self) -> bool:
         """Check if the service is available"""
         return hasattr(self, 'client') and self.client is not None
\ No newline at end of file
@@ -30,16 +30,19 @@ This package contains service wrappers for each AI system:
 - personal_rag_service: Personal RAG System wrapper
 - web_search_service: Web Search Agent wrapper
 - hybrid_rag_service: Hybrid RAG System wrapper
+- result_cache: LRU + TTL answer cache used by the coordinator
 """
 
 from .ai_assistant import AIAssistantService
 from .personal_rag_service import PersonalRAGService
 from .web_search_service import WebSearchService
 from .hybrid_rag_service import HybridRAGService
+from .result_cache import ResultCache
 
 __all__ = [
     'AIAssistantService',
     'PersonalRAGService',
     'WebSearchService', 
-    'HybridRAGService'
+    'HybridRAGService',
+    'ResultCache'
 ]
\ No newline at end of file